@@ -1,21 +1,28 @@
+import gzip
 import io
 import json
+import tempfile
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import zstandard
 from datetime import timedelta
 
-from django.test import TestCase, RequestFactory, mock
+from django.test import TestCase, RequestFactory, mock, override_settings
 from django.contrib.auth import get_user_model
 from django.core import exceptions
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 
 from rest_framework import exceptions
 
 from accounts.factories import UserFactory
 
 from core.utilities import null_values_list
+from core.utilities.tests import TemporaryDirectoryMixin
 
 import dataset.constants as constants
+from dataset import snapshots
 from dataset.utilities import publish_dataset
 from dataset.models import scoreset, experimentset
 from dataset.factories import (
@@ -514,12 +521,208 @@ class TestFormatResponse(TestCase):
             self.assertEqual(df.score.where(np.isnan).size, variant_count)
             handle.close()
 
+    def test_orders_rows_by_variant_number(self):
+        self.instance.dataset_columns = {
+            constants.score_columns: ["score"],
+            constants.count_columns: [],
+        }
+        self.instance.save()
+        Variant.bulk_create(
+            self.instance,
+            [
+                {
+                    "data": {
+                        constants.variant_score_data: {"score": i},
+                        constants.variant_count_data: {},
+                    }
+                }
+                for i in range(11)
+            ],
+        )
+        response = views.format_response(
+            self.response, self.instance, dtype="scores"
+        )
+        lines = response.content.decode().splitlines()
+        accessions = [
+            line.split(",")[0]
+            for line in lines
+            if line.startswith(self.instance.urn)
+        ]
+        self.assertListEqual(
+            accessions,
+            ["{}#{}".format(self.instance.urn, i + 1) for i in range(11)],
+        )
+
+    def test_snapshot_download_matches_variant_table(self):
+        self.instance.dataset_columns = {
+            constants.score_columns: ["score", "se"],
+            constants.count_columns: [],
+        }
+        self.instance.save()
+        Variant.bulk_create(
+            self.instance,
+            [
+                {
+                    constants.hgvs_nt_column: "c.{}A>G".format(i + 1),
+                    "data": {
+                        constants.variant_score_data: {
+                            "score": i,
+                            "se": None if i % 2 else i / 3,
+                        },
+                        constants.variant_count_data: {},
+                    },
+                }
+                for i in range(12)
+            ],
+        )
+
+        def download():
+            response = views.format_response(
+                HttpResponse(content_type="text/csv"),
+                self.instance,
+                dtype="scores",
+            )
+            lines = response.content.decode().splitlines()
+            return [line for line in lines if not line.startswith("#")]
+
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(VARIANT_SNAPSHOT_DIR=directory):
+                expected = download()
+                snapshots.write_snapshot(self.instance)
+                with mock.patch("api.views.format_csv_rows") as patch:
+                    self.assertListEqual(download(), expected)
+                patch.assert_not_called()
+
+    @mock.patch.object(views, "CSV_CHUNK_SIZE", 2)
+    def test_streams_rows_a_chunk_at_a_time(self):
+        self.instance.dataset_columns = {
+            constants.score_columns: ["score"],
+            constants.count_columns: [],
+        }
+        self.instance.save()
+        for i in range(5):
+            data = {
+                constants.variant_score_data: {"score": i},
+                constants.variant_count_data: {},
+            }
+            VariantFactory(scoreset=self.instance, data=data)
+
+        expected = views.format_response(
+            self.response, self.instance, dtype="scores"
+        ).content.decode()
+        with mock.patch(
+            "api.views.format_csv_rows", wraps=views.format_csv_rows
+        ) as patch:
+            response = views.format_response(
+                StreamingHttpResponse(content_type="text/csv"),
+                self.instance,
+                dtype="scores",
+            )
+            patch.assert_not_called()
+            content = b"".join(response.streaming_content).decode()
+        self.assertEqual(patch.call_count, 3)
+
+        def rows(text):
+            return [
+                line for line in text.splitlines() if not line.startswith("#")
+            ]
+
+        self.assertListEqual(rows(content), rows(expected))
+        self.assertEqual(len(rows(content)), 6)
+
+
+class TestFormatTable(TestCase):
+    def setUp(self):
+        self.instance = ScoreSetFactory(
+            private=False,
+            data_usage_policy="Use freely.",
+            dataset_columns={
+                constants.score_columns: ["score", "se"],
+                constants.count_columns: [],
+            },
+        )
+        Variant.bulk_create(
+            self.instance,
+            [
+                {
+                    "data": {
+                        constants.variant_score_data: {
+                            "score": i / 2,
+                            "se": None,
+                        },
+                        constants.variant_count_data: {},
+                    }
+                }
+                for i in range(3)
+            ],
+        )
+        self.instance.refresh_from_db()
+
+    def test_columns_match_csv_download(self):
+        table = views.format_table(self.instance, "scores")
+        self.assertListEqual(
+            table.schema.names, ["accession"] + self.instance.score_columns
+        )
+        self.assertListEqual(
+            table.column("accession").to_pylist(),
+            ["{}#{}".format(self.instance.urn, i + 1) for i in range(3)],
+        )
+
+    def test_keeps_value_types_and_nulls(self):
+        table = views.format_table(self.instance, "scores")
+        self.assertListEqual(
+            table.column("score").to_pylist(), [0.0, 0.5, 1.0]
+        )
+        self.assertListEqual(
+            table.column("se").to_pylist(), [None, None, None]
+        )
+
+    def test_stores_header_lines_in_metadata(self):
+        metadata = views.format_table(self.instance, "scores").schema.metadata
+        self.assertEqual(metadata[b"accession"], self.instance.urn.encode())
+        self.assertEqual(
+            metadata[b"licence"], self.instance.licence.long_name.encode()
+        )
+        self.assertEqual(metadata[b"data_usage_policy"], b"Use freely.")
+
+    @mock.patch.object(views, "CSV_CHUNK_SIZE", 2)
+    def test_ndjson_rows_match_table_a_chunk_at_a_time(self):
+        chunks = list(views.iter_ndjson_chunks(self.instance, "scores"))
+        self.assertEqual(len(chunks), 3)
+
+        lines = "".join(chunks).splitlines()
+        metadata = json.loads(lines[0])["metadata"]
+        self.assertEqual(metadata["accession"], self.instance.urn)
+        self.assertEqual(
+            metadata["licence"], self.instance.licence.long_name
+        )
+        self.assertEqual(metadata["data_usage_policy"], "Use freely.")
+        table = views.format_table(self.instance, "scores").to_pydict()
+        self.assertListEqual(
+            [json.loads(line) for line in lines[1:]],
+            [dict(zip(table, row)) for row in zip(*table.values())],
+        )
+
+    def test_ndjson_rows_read_from_snapshot_match_database(self):
+        expected = "".join(views.iter_ndjson_chunks(self.instance, "scores"))
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(VARIANT_SNAPSHOT_DIR=directory):
+                snapshots.write_snapshot(self.instance)
+                with mock.patch.object(views, "iter_chunks") as patch:
+                    content = "".join(
+                        views.iter_ndjson_chunks(self.instance, "scores")
+                    )
+        patch.assert_not_called()
+        self.assertEqual(content, expected)
+
 
-class TestScoreSetAPIViews(TestCase):
+class TestScoreSetAPIViews(TemporaryDirectoryMixin, TestCase):
     factory = ScoreSetFactory
     url = "scoresets"
+    temporary_directory_settings = ["VARIANT_SNAPSHOT_DIR"]
 
     def setUp(self):
+        super().setUp()
         Variant.objects.all().delete()
         scoreset.ScoreSet.objects.all().delete()
 
@@ -634,6 +837,273 @@ class TestScoreSetAPIViews(TestCase):
         response = self.client.get("/api/scoresets/dddd/")
         self.assertEqual(response.status_code, 404)
 
+    def test_streams_downloads(self):
+        instance = self.factory(private=False)
+        for dtype in ("scores", "counts"):
+            response = self.client.get(
+                "/api/scoresets/{}/{}/".format(instance.urn, dtype)
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.streaming)
+            content = b"".join(response.streaming_content).decode()
+            self.assertIn("# Accession: {}".format(instance.urn), content)
+
+    def cached_download(self, url, **kwargs):
+        # Public downloads are written to disk while the first is read.
+        b"".join(self.client.get(url).streaming_content)
+        return self.client.get(url, **kwargs)
+
+    def test_caches_public_downloads(self):
+        instance = self.factory(private=False)
+        url = "/api/scoresets/{}/scores/".format(instance.urn)
+        first = self.client.get(url)
+        self.assertNotIn("ETag", first)
+        content = b"".join(first.streaming_content)
+        with mock.patch(
+            "api.views.format_response", wraps=views.format_response
+        ) as patch:
+            second = self.client.get(url)
+        patch.assert_not_called()
+        self.assertIn("ETag", second)
+        self.assertIn("Last-Modified", second)
+        self.assertEqual(content, b"".join(second.streaming_content))
+
+    def test_does_not_cache_download_closed_before_the_end(self):
+        instance = self.factory(private=False)
+        url = "/api/scoresets/{}/scores/".format(instance.urn)
+        response = self.client.get(url)
+        next(iter(response.streaming_content))
+        response.close()
+        self.assertNotIn("ETag", self.client.get(url))
+
+    def test_returns_not_modified_for_matching_etag(self):
+        instance = self.factory(private=False)
+        url = "/api/scoresets/{}/scores/".format(instance.urn)
+        etag = self.cached_download(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        instance.data_usage_policy = "Use freely."
+        instance.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        b"".join(response.streaming_content)
+        self.assertNotEqual(self.client.get(url)["ETag"], etag)
+
+    def test_sends_compressed_download_for_accepted_encoding(self):
+        instance = self.factory(private=False)
+        url = "/api/scoresets/{}/scores/".format(instance.urn)
+        plain = b"".join(self.client.get(url).streaming_content)
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        body = b"".join(response.streaming_content)
+        self.assertEqual(gzip.decompress(body), plain)
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, zstd")
+        self.assertEqual(response["Content-Encoding"], "zstd")
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="zstd;q=0")
+        self.assertNotIn("Content-Encoding", response)
+
+    def test_compression_parameter_sends_compressed_file(self):
+        instance = self.factory(private=False)
+        url = "/api/scoresets/{}/scores/".format(instance.urn)
+        plain = b"".join(self.client.get(url).streaming_content)
+
+        response = self.client.get(url + "?compression=zstd")
+        self.assertEqual(response["Content-Type"], "application/zstd")
+        self.assertNotIn("Content-Encoding", response)
+        self.assertIn(".csv.zst", response["Content-Disposition"])
+        body = b"".join(response.streaming_content)
+        self.assertEqual(
+            zstandard.ZstdDecompressor().decompressobj().decompress(body),
+            plain,
+        )
+
+        response = self.client.get(
+            url + "?compression=none", HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertEqual(b"".join(response.streaming_content), plain)
+
+    def test_unknown_compression_is_a_bad_request(self):
+        instance = self.factory(private=False)
+        response = self.client.get(
+            "/api/scoresets/{}/scores/?compression=br".format(instance.urn)
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_format_parameter_sends_binary_and_ndjson_downloads(self):
+        instance = self.factory(
+            private=False,
+            dataset_columns={
+                constants.score_columns: ["score"],
+                constants.count_columns: [],
+            },
+        )
+        Variant.bulk_create(
+            instance,
+            [
+                {
+                    "data": {
+                        constants.variant_score_data: {"score": i / 2},
+                        constants.variant_count_data: {},
+                    }
+                }
+                for i in range(3)
+            ],
+        )
+        url = "/api/scoresets/{}/scores/".format(instance.urn)
+        accessions = ["{}#{}".format(instance.urn, i + 1) for i in range(3)]
+
+        response = self.client.get(url + "?format=parquet")
+        self.assertEqual(
+            response["Content-Type"], "application/vnd.apache.parquet"
+        )
+        self.assertIn(".parquet", response["Content-Disposition"])
+        table = pq.read_table(
+            pa.BufferReader(b"".join(response.streaming_content))
+        )
+        self.assertListEqual(table.column("accession").to_pylist(), accessions)
+        self.assertListEqual(
+            table.column("score").to_pylist(), [0.0, 0.5, 1.0]
+        )
+        self.assertEqual(
+            table.schema.metadata[b"accession"], instance.urn.encode()
+        )
+
+        response = self.client.get(url + "?format=arrow")
+        body = b"".join(response.streaming_content)
+        table = pa.ipc.open_file(pa.BufferReader(body)).read_all()
+        self.assertListEqual(table.column("accession").to_pylist(), accessions)
+
+        response = self.client.get(url + "?format=ndjson")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(rows[0]["metadata"]["accession"], instance.urn)
+        rows = rows[1:]
+        self.assertListEqual([row["accession"] for row in rows], accessions)
+        self.assertListEqual([row["score"] for row in rows], [0.0, 0.5, 1.0])
+
+    def test_does_not_compress_parquet_and_arrow_downloads(self):
+        instance = self.factory(private=False)
+        for fmt in ("parquet", "arrow"):
+            url = "/api/scoresets/{}/scores/?format={}".format(
+                instance.urn, fmt
+            )
+            response = self.cached_download(url, HTTP_ACCEPT_ENCODING="gzip")
+            self.assertNotIn("Content-Encoding", response)
+            response = self.client.get(url + "&compression=gzip")
+            self.assertEqual(response.status_code, 400)
+
+    def test_unknown_format_is_a_bad_request(self):
+        instance = self.factory(private=False)
+        response = self.client.get(
+            "/api/scoresets/{}/scores/?format=xlsx".format(instance.urn)
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def make_variants(self, instance, n):
+        Variant.bulk_create(
+            instance,
+            [
+                {
+                    constants.hgvs_nt_column: "c.{}A>G".format(i + 1),
+                    constants.hgvs_pro_column: "p.Leu{}Val".format(i + 1),
+                    "data": {
+                        constants.variant_score_data: {"score": i / 2},
+                        constants.variant_count_data: {},
+                    },
+                }
+                for i in range(n)
+            ],
+        )
+
+    def test_pages_variants_by_number(self):
+        instance = self.factory(
+            private=False,
+            dataset_columns={
+                constants.score_columns: ["score"],
+                constants.count_columns: [],
+            },
+        )
+        self.make_variants(instance, 5)
+        url = "/api/scoresets/{}/variants/".format(instance.urn)
+
+        page = self.client.get(url + "?limit=2").json()
+        self.assertListEqual(
+            [v["urn"] for v in page["results"]],
+            ["{}#{}".format(instance.urn, i) for i in (1, 2)],
+        )
+        self.assertEqual(page["results"][0]["scores"], {"score": 0.0})
+        self.assertEqual(page["results"][0]["hgvs_nt"], "c.1A>G")
+        self.assertIn("after=2", page["next"])
+
+        page = self.client.get(page["next"]).json()
+        page = self.client.get(page["next"]).json()
+        self.assertListEqual(
+            [v["urn"] for v in page["results"]],
+            ["{}#5".format(instance.urn)],
+        )
+        self.assertIsNone(page["next"])
+
+    def test_filters_variants_on_hgvs_and_position(self):
+        instance = self.factory(
+            private=False,
+            dataset_columns={
+                constants.score_columns: ["score"],
+                constants.count_columns: [],
+            },
+        )
+        self.make_variants(instance, 5)
+        url = "/api/scoresets/{}/variants/".format(instance.urn)
+
+        def hgvs(query):
+            page = self.client.get(url + query).json()
+            return [v["hgvs_pro"] for v in page["results"]]
+
+        self.assertListEqual(hgvs("?hgvs_nt=c.2A>G"), ["p.Leu2Val"])
+        self.assertListEqual(hgvs("?hgvs_pro=p.Leu4Val"), ["p.Leu4Val"])
+        self.assertListEqual(
+            hgvs("?start=2&end=3"), ["p.Leu2Val", "p.Leu3Val"]
+        )
+        self.assertListEqual(hgvs("?start=5"), ["p.Leu5Val"])
+
+    def test_bad_variant_parameters_are_a_bad_request(self):
+        instance = self.factory(private=False)
+        url = "/api/scoresets/{}/variants/".format(instance.urn)
+        for query in ("?after=x", "?limit=0", "?start=-1"):
+            response = self.client.get(url + query)
+            self.assertEqual(response.status_code, 400)
+
+    def test_403_private_variants(self):
+        instance = self.factory(private=True)
+        url = "/api/scoresets/{}/variants/".format(instance.urn)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        user = UserFactory()
+        user.profile.generate_token()
+        instance.add_viewers(user)
+        response = self.client.get(
+            url, HTTP_AUTHORIZATION=user.profile.auth_token
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_does_not_cache_private_downloads(self):
+        instance = self.factory(private=True)
+        user = UserFactory()
+        user.profile.generate_token()
+        instance.add_viewers(user)
+        response = self.client.get(
+            "/api/scoresets/{}/scores/".format(instance.urn),
+            HTTP_AUTHORIZATION=user.profile.auth_token,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+
     @mock.patch("api.views.format_response")
     def test_calls_format_response_with_dtype_scores(self, patch):
         request = RequestFactory().get("/")
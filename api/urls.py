@@ -33,6 +33,11 @@ scoreset_urls = [
         views.scoreset_count_data,
         name="api_download_count_data",
     ),
+    url(
+        r"^scoresets/(?P<urn>{})/variants/$".format(scoreset_url_pattern),
+        views.scoreset_variants,
+        name="api_scoreset_variants",
+    ),
     url(
         r"^scoresets/(?P<urn>{})/metadata/$".format(scoreset_url_pattern),
         views.scoreset_metadata,
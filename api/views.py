@@ -1,16 +1,25 @@
 import csv
+import itertools
+import json
+import os
 import re
 from datetime import datetime
 
+import pyarrow as pa
+import pyarrow.parquet as pq
 from django.contrib.auth import get_user_model
-from django.http import HttpResponse, JsonResponse
+from django.db.models import BigIntegerField, Func, Value
+from django.db.models.functions import Cast, Coalesce
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from rest_framework import viewsets, exceptions
 
 from accounts.filters import UserFilter
 from accounts.models import AUTH_TOKEN_RE, Profile
 from accounts.serializers import UserSerializer
-from core.utilities import is_null
-from dataset import models, filters, constants
+from core.utilities import is_null, iter_chunks
+from dataset import models, filters, constants, downloads, snapshots
 from dataset.mixins import DatasetPermissionMixin
 from dataset.serializers import (
     ExperimentSetSerializer,
@@ -26,6 +35,30 @@ ScoreSet = models.scoreset.ScoreSet
 
 words_re = re.compile(r"\w+|[^\w\s]", flags=re.IGNORECASE)
 
+# Rows formatted and sent at a time when streaming a CSV download.
+CSV_CHUNK_SIZE = 1000
+# Media types of downloads compressed with the `compression` parameter.
+COMPRESSED_MEDIA_TYPES = {
+    "zstd": "application/zstd",
+    "gzip": "application/gzip",
+}
+# Media types of each of `dataset.downloads.FORMATS`.
+FORMAT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+    "ndjson": "application/x-ndjson",
+}
+# Variants returned by default and at most in each page of the variants
+# endpoint.
+VARIANT_PAGE_SIZE = 100
+MAX_VARIANT_PAGE_SIZE = 1000
+# Captures the first position of a HGVS string, skipping a multi-variant
+# bracket and the reference amino acid of protein variants. Matched by the
+# database, so written in the syntax shared by Python and PostgreSQL.
+HGVS_POSITION_PATTERN = r"^[cgmnop]\.\[?\(?(?:[A-Z][a-z]{2})?([0-9]+)"
+qvalue_re = re.compile(r"q=([01](?:\.[0-9]{0,3})?)")
+
 
 def authenticate(request):
     user, token = None, request.META.get("HTTP_AUTHORIZATION", None)
@@ -225,11 +258,40 @@ def format_csv_rows(variants, columns, dtype, na_rep="NA"):
     return rowdicts
 
 
-def urn_number(variant):
-    number = variant.urn.split("#")[-1]
-    if not str.isdigit(number):
-        return 0
-    return int(number)
+def format_snapshot_rows(table, urn, columns, na_rep="NA"):
+    """
+    Formats the rows of a score set snapshot the same way as
+    `format_csv_rows`, a column at a time.
+
+    Parameters
+    ----------
+    table : `pyarrow.Table`
+        Snapshot returned by `dataset.snapshots.read_snapshot`.
+    urn : str
+        URN of the scoreset.
+    columns : list[str]
+        Columns to serialize.
+    na_rep : str
+        String to represent null values.
+
+    Returns
+    -------
+    Iterator[tuple]
+    """
+    values = []
+    for column_key in columns:
+        if column_key == "accession":
+            numbers = table.column(snapshots.NUMBER_COLUMN).to_pylist()
+            values.append(["{}#{}".format(urn, n) for n in numbers])
+            continue
+        column = []
+        for value in table.column(column_key).to_pylist():
+            value = str(value)
+            if is_null(value):
+                value = na_rep
+            column.append(value)
+        values.append(column)
+    return zip(*values)
 
 
 def format_policy(policy, line_wrap_len=77):
@@ -255,14 +317,29 @@ def format_policy(policy, line_wrap_len=77):
     return lines
 
 
+class Echo:
+    """
+    File-like object returning what is written to it instead of storing it,
+    so that `csv.writer` formats rows for a streaming response.
+    """
+
+    def write(self, value):
+        return value
+
+
 def format_response(response, scoreset, dtype):
     """
     Writes the CSV response by formatting each variant into a row including
     the columns `hgvs_nt`, `hgvs_pro`, `urn` and other uploaded columns.
 
+    The comment lines are formatted straight away. If `response` is a
+    `StreamingHttpResponse` the rows are formatted as the response is sent,
+    `CSV_CHUNK_SIZE` variants at a time, otherwise they are written to
+    `response` before returning.
+
     Parameters
     ----------
-    response : `HttpResponse`
+    response : `HttpResponse` | `StreamingHttpResponse`
         Reponse object to write to.
     scoreset : `dataset.models.scoreset.ScoreSet`
         The scoreset requested.
@@ -271,16 +348,14 @@ def format_response(response, scoreset, dtype):
 
     Returns
     -------
-    `HttpResponse`
-    """
-    response.writelines(
-        [
-            "# Accession: {}\n".format(scoreset.urn),
-            "# Downloaded (UTC): {}\n".format(datetime.utcnow()),
-            "# Licence: {}\n".format(scoreset.licence.long_name),
-            "# Licence URL: {}\n".format(scoreset.licence.link or str(None)),
-        ]
-    )
+    `HttpResponse` | `StreamingHttpResponse`
+    """
+    lines = [
+        "# Accession: {}\n".format(scoreset.urn),
+        "# Downloaded (UTC): {}\n".format(datetime.utcnow()),
+        "# Licence: {}\n".format(scoreset.licence.long_name),
+        "# Licence URL: {}\n".format(scoreset.licence.link or str(None)),
+    ]
 
     # Append data usage policy
     if (
@@ -290,56 +365,517 @@ def format_response(response, scoreset, dtype):
         policy = "Data usage policy: {}".format(
             scoreset.data_usage_policy.strip()
         )
-        lines = format_policy(policy)
-        response.writelines(lines)
-
-    variants = sorted(scoreset.children.all(), key=lambda v: urn_number(v))
+        lines.extend(format_policy(policy))
 
     if dtype == "scores":
         columns = ["accession"] + scoreset.score_columns
-        type_column = constants.variant_score_data
     elif dtype == "counts":
         columns = ["accession"] + scoreset.count_columns
-        type_column = constants.variant_count_data
     else:
         raise ValueError(
             "Unknown variant dtype {}. Expected "
             "either 'scores' or 'counts'.".format(dtype)
         )
 
+    content = itertools.chain(lines, iter_csv_chunks(scoreset, columns, dtype))
+    if response.streaming:
+        response.streaming_content = content
+    else:
+        response.writelines(content)
+    return response
+
+
+def iter_csv_chunks(scoreset, columns, dtype):
+    """
+    Yields the CSV header and rows of the `dtype` data of `scoreset` as
+    strings of at most `CSV_CHUNK_SIZE` rows. Rows are read from the
+    snapshot of `scoreset` if it is current, otherwise variants are read from
+    the database a chunk at a time with `QuerySet.iterator`, which uses a
+    server-side cursor on PostgreSQL.
+
+    Parameters
+    ----------
+    scoreset : `dataset.models.scoreset.ScoreSet`
+        The scoreset requested.
+    columns : list[str]
+        Columns to serialize.
+    dtype : str
+        The type of data requested. Either 'scores' or 'counts'.
+
+    Returns
+    -------
+    Iterator[str]
+    """
     # 'hgvs_nt', 'hgvs_splice', 'hgvs_pro', 'urn' are present by default
-    if not variants or len(columns) <= 4:
-        return response
+    if len(columns) <= 4:
+        return
+
+    writer = csv.writer(Echo(), quoting=csv.QUOTE_MINIMAL)
+    table = snapshots.read_snapshot(scoreset, dtype)
+    if table is not None:
+        if not table.num_rows:
+            return
+        yield writer.writerow(columns)
+        for start in range(0, table.num_rows, CSV_CHUNK_SIZE):
+            rows = format_snapshot_rows(
+                table.slice(start, CSV_CHUNK_SIZE), scoreset.urn, columns
+            )
+            yield "".join(writer.writerow(row) for row in rows)
+        return
+
+    variants = scoreset.children.order_by("number", "id").only(
+        "urn", *snapshots.hgvs_fields, "data"
+    )
+    if not variants.exists():
+        return
 
-    rows = format_csv_rows(variants, columns=columns, dtype=type_column)
+    type_column = snapshots.data_keys[dtype]
+    yield writer.writerow(columns)
     writer = csv.DictWriter(
-        response, fieldnames=columns, quoting=csv.QUOTE_MINIMAL
+        Echo(), fieldnames=columns, quoting=csv.QUOTE_MINIMAL
     )
-    writer.writeheader()
-    writer.writerows(rows)
-    return response
+    for chunk in iter_chunks(variants.iterator(), CSV_CHUNK_SIZE):
+        rows = format_csv_rows(chunk, columns=columns, dtype=type_column)
+        yield "".join(writer.writerow(row) for row in rows)
+
+
+def format_table(scoreset, dtype):
+    """
+    Returns the `dtype` data of `scoreset` as a `pyarrow.Table` with the
+    columns of the CSV download. Values keep their types, with nulls in
+    place of 'NA', and the accession, licence and data usage policy written
+    in the CSV comment lines are stored in the schema metadata instead.
+
+    Parameters
+    ----------
+    scoreset : `dataset.models.scoreset.ScoreSet`
+        The scoreset requested.
+    dtype : str
+        The type of data requested. Either 'scores' or 'counts'.
+
+    Returns
+    -------
+    `pyarrow.Table`
+    """
+    table = snapshots.read_snapshot(scoreset, dtype)
+    if table is None:
+        table = snapshots.build_tables(scoreset)[dtype]
+
+    index = table.schema.get_field_index(snapshots.NUMBER_COLUMN)
+    numbers = table.column(index).to_pylist()
+    accessions = pa.array(
+        ["{}#{}".format(scoreset.urn, n) for n in numbers], type=pa.string()
+    )
+    table = table.set_column(index, "accession", accessions)
+    return table.replace_schema_metadata(download_metadata(scoreset))
+
+
+def download_metadata(scoreset):
+    """
+    Returns the accession, licence and data usage policy of `scoreset`
+    written in the comment lines of the CSV download, for formats without
+    comments.
+    """
+    policy = (scoreset.data_usage_policy or "").strip()
+    return {
+        "accession": scoreset.urn,
+        "licence": scoreset.licence.long_name,
+        "licence_url": scoreset.licence.link or str(None),
+        "data_usage_policy": policy or "Not specified",
+    }
+
+
+def format_table_file(table, fmt):
+    """
+    Writes `table` as a Parquet file or an Arrow IPC file depending on `fmt`
+    and returns its bytes.
+    """
+    sink = pa.BufferOutputStream()
+    if fmt == "parquet":
+        pq.write_table(table, sink)
+    elif fmt == "arrow":
+        writer = pa.ipc.new_file(sink, table.schema)
+        writer.write_table(table)
+        writer.close()
+    else:
+        raise ValueError(
+            "Unknown table format {}. Expected "
+            "either 'parquet' or 'arrow'.".format(fmt)
+        )
+    return sink.getvalue().to_pybytes()
+
+
+def iter_ndjson_chunks(scoreset, dtype):
+    """
+    Yields the `dtype` data of `scoreset` as JSON objects, one per line, in
+    strings of at most `CSV_CHUNK_SIZE` rows. The first line holds the
+    `download_metadata` of `scoreset` under the key 'metadata'. Each row has
+    the columns of `format_table`, read from the snapshot of `scoreset` if
+    it is current, otherwise from the database a chunk at a time with
+    `QuerySet.iterator`.
+
+    Parameters
+    ----------
+    scoreset : `dataset.models.scoreset.ScoreSet`
+        The scoreset requested.
+    dtype : str
+        The type of data requested. Either 'scores' or 'counts'.
+
+    Returns
+    -------
+    Iterator[str]
+    """
+    columns = snapshots.snapshot_columns(scoreset, dtype)
+    names = ["accession"] + columns[1:]
+    yield json.dumps({"metadata": download_metadata(scoreset)}) + "\n"
+
+    table = snapshots.read_snapshot(scoreset, dtype)
+    if table is not None:
+        for start in range(0, table.num_rows, CSV_CHUNK_SIZE):
+            values = table.slice(start, CSV_CHUNK_SIZE).to_pydict()
+            rows = zip(*(values[column] for column in columns))
+            yield format_ndjson_rows(rows, scoreset.urn, names)
+        return
+
+    variants = scoreset.children.order_by("number", "id").values_list(
+        "number", *snapshots.hgvs_fields, "data"
+    )
+    data_key = snapshots.data_keys[dtype]
+    data_columns = columns[len(snapshots.hgvs_fields) + 1 :]
+    for chunk in iter_chunks(variants.iterator(), CSV_CHUNK_SIZE):
+        rows = []
+        for (number, *hgvs, data) in chunk:
+            values = data.get(data_key, {})
+            rows.append(
+                [number, *hgvs]
+                + [values.get(column, None) for column in data_columns]
+            )
+        yield format_ndjson_rows(rows, scoreset.urn, names)
+
+
+def format_ndjson_rows(rows, urn, names):
+    """
+    Formats rows starting with the urn number of each variant as JSON
+    objects with the keys `names`, one per line.
+    """
+    lines = []
+    for (number, *values) in rows:
+        accession = "{}#{}".format(urn, number)
+        lines.append(json.dumps(dict(zip(names, [accession] + values))))
+    return "".join(line + "\n" for line in lines)
+
+
+def download_content(scoreset, dtype, fmt):
+    """
+    Returns the `fmt` download of the `dtype` data of `scoreset` as an
+    iterable of strings or bytes. CSV and NDJSON downloads are formatted as
+    they are read.
+
+    Parameters
+    ----------
+    scoreset : `dataset.models.scoreset.ScoreSet`
+        The scoreset requested.
+    dtype : str
+        The type of data requested. Either 'scores' or 'counts'.
+    fmt : str
+        One of `dataset.downloads.FORMATS`.
+
+    Returns
+    -------
+    Iterable[str | bytes]
+    """
+    if fmt == "csv":
+        response = format_response(
+            StreamingHttpResponse(), scoreset, dtype=dtype
+        )
+        return response.streaming_content
+    if fmt == "ndjson":
+        return iter_ndjson_chunks(scoreset, dtype)
+    return [format_table_file(format_table(scoreset, dtype), fmt)]
+
+
+def select_format(request):
+    """
+    Returns the download format from the `format` query parameter, one of
+    `dataset.downloads.FORMATS`, defaulting to 'csv'.
+
+    Raises
+    ------
+    `ParseError`
+        Unknown `format` parameter.
+    """
+    fmt = request.GET.get("format", "csv").lower()
+    if fmt not in downloads.FORMATS:
+        raise exceptions.ParseError(
+            "Unknown format '{}'. Expected one of {}.".format(
+                fmt, ", ".join(downloads.FORMATS)
+            )
+        )
+    return fmt
+
+
+def select_encoding(request, fmt="csv"):
+    """
+    Returns the content coding to compress a `fmt` download with, or `None`,
+    and whether it was chosen with the `compression` query parameter.
+
+    The parameter takes one of `dataset.downloads.encodings(fmt)` or 'none'
+    for clients unable to set headers. Otherwise the coding is negotiated
+    from the `Accept-Encoding` header, preferring the order of `ENCODINGS`
+    for codings of equal weight. Formats compressed within the file are
+    never compressed again.
+
+    Raises
+    ------
+    `ParseError`
+        Unknown `compression` parameter.
+    """
+    compression = request.GET.get("compression", None)
+    if compression is not None:
+        compression = compression.lower()
+        if compression == "none":
+            return None, True
+        if compression not in downloads.encodings(fmt):
+            raise exceptions.ParseError(
+                "Unknown compression '{}' for {} downloads. "
+                "Expected one of {}.".format(
+                    compression,
+                    fmt,
+                    ", ".join(downloads.encodings(fmt) + ["none"]),
+                )
+            )
+        return compression, True
+
+    weights = {}
+    header = request.META.get("HTTP_ACCEPT_ENCODING", "")
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        match = qvalue_re.search(params)
+        weights[coding.strip().lower()] = float(match.group(1)) if match else 1
+    encoding, weight = None, 0
+    for coding in downloads.encodings(fmt):
+        coding_weight = weights.get(coding, weights.get("*", 0))
+        if coding_weight > weight:
+            encoding, weight = coding, coding_weight
+    return encoding, False
+
+
+def download_response(request, scoreset, dtype):
+    """
+    Returns the download of the `dtype` data of `scoreset` in the format
+    from `select_format`. Downloads of public score sets are streamed while
+    `dataset.downloads` writes them to disk on the first request, and then
+    sent from the file with an `ETag` and `Last-Modified` header, answering
+    conditional requests for an unchanged file with `304 Not Modified`.
+    Downloads of private score sets are streamed without being written.
+
+    Downloads are compressed with the content coding from `select_encoding`,
+    sending the pre-compressed copy of cached downloads. A coding chosen
+    with the `compression` parameter is sent as a compressed file instead
+    of with a `Content-Encoding` header.
+
+    Parameters
+    ----------
+    request : object
+        Incoming request object.
+    scoreset : `dataset.models.scoreset.ScoreSet`
+        The scoreset requested.
+    dtype : str
+        The type of data requested. Either 'scores' or 'counts'.
+
+    Returns
+    -------
+    `FileResponse` | `StreamingHttpResponse` | `HttpResponseNotModified`
+    """
+    try:
+        fmt = select_format(request)
+        encoding, explicit = select_encoding(request, fmt)
+    except exceptions.ParseError as e:
+        return JsonResponse({"detail": e.detail}, status=e.status_code)
+
+    filename = "{}_{}{}".format(scoreset.urn, dtype, downloads.FORMATS[fmt])
+    content_type = FORMAT_MEDIA_TYPES[fmt]
+    if encoding and explicit:
+        filename += downloads.ENCODINGS[encoding]
+        content_type = COMPRESSED_MEDIA_TYPES[encoding]
+
+    def set_headers(response):
+        response["Content-Disposition"] = 'attachment; filename="{}"'.format(
+            filename
+        )
+        response["Vary"] = "Accept-Encoding"
+        if encoding and not explicit:
+            response["Content-Encoding"] = encoding
+        return response
+
+    download = None
+    if not scoreset.private:
+        download = downloads.open_download(scoreset, dtype, encoding, fmt=fmt)
+
+    if download is None:
+        content = download_content(scoreset, dtype, fmt)
+        if not scoreset.private:
+            content = downloads.stream_download(
+                scoreset, dtype, content, encoding, fmt=fmt
+            )
+        elif encoding:
+            content = downloads.compress(content, encoding)
+        return set_headers(
+            StreamingHttpResponse(content, content_type=content_type)
+        )
+
+    stat = os.fstat(download.fileno())
+    etag = downloads.download_etag(download)
+    response = set_headers(FileResponse(download, content_type=content_type))
+    response["Content-Length"] = stat.st_size
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    conditional = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(stat.st_mtime),
+        response=response,
+    )
+    if conditional is not response:
+        response.close()
+    return conditional
 
 
 def scoreset_score_data(request, urn):
-    response = HttpResponse(content_type="text/csv")
-    response[
-        "Content-Disposition"
-    ] = 'attachment; filename="{}_scores.csv"'.format(urn)
     scoreset = validate_request(request, urn)
     if not isinstance(scoreset, ScoreSet):
         return scoreset  # Invalid request, return response.
-    return format_response(response, scoreset, dtype="scores")
+    return download_response(request, scoreset, dtype="scores")
 
 
 def scoreset_count_data(request, urn):
-    response = HttpResponse(content_type="text/csv")
-    response[
-        "Content-Disposition"
-    ] = 'attachment; filename="{}_counts.csv"'.format(urn)
     scoreset = validate_request(request, urn)
     if not isinstance(scoreset, ScoreSet):
         return scoreset  # Invalid request, return response.
-    return format_response(response, scoreset, dtype="counts")
+    return download_response(request, scoreset, dtype="counts")
+
+
+def int_parameter(request, name, default=None, minimum=0):
+    """
+    Returns the query parameter `name` as an integer of at least `minimum`,
+    or `default` if it is not given.
+
+    Raises
+    ------
+    `ParseError`
+        The parameter is not an integer of at least `minimum`.
+    """
+    value = request.GET.get(name, None)
+    if value is None or value == "":
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        value = None
+    if value is None or value < minimum:
+        raise exceptions.ParseError(
+            "'{}' must be an integer of at least {}.".format(name, minimum)
+        )
+    return value
+
+
+def filter_variants(scoreset, request):
+    """
+    Returns the variants of `scoreset` selected by the query parameters of
+    `request`, ordered by urn number.
+
+    Variants are filtered on an exact `hgvs_nt` or `hgvs_pro` and on a
+    `start` and `end` position, both inclusive, parsed from the nucleotide
+    HGVS string of each variant or from its protein HGVS string if it has no
+    nucleotide variant.
+
+    Raises
+    ------
+    `ParseError`
+        Invalid `start` or `end` parameter.
+    """
+    variants = scoreset.children.order_by("number")
+    for field in (constants.hgvs_nt_column, constants.hgvs_pro_column):
+        value = request.GET.get(field, None)
+        if value:
+            variants = variants.filter(**{field: value})
+
+    start = int_parameter(request, "start", minimum=1)
+    end = int_parameter(request, "end", minimum=1)
+    if start is not None or end is not None:
+        position = Func(
+            Coalesce(constants.hgvs_nt_column, constants.hgvs_pro_column),
+            Value(HGVS_POSITION_PATTERN),
+            function="substring",
+        )
+        variants = variants.annotate(
+            position=Cast(position, BigIntegerField())
+        )
+        if start is not None:
+            variants = variants.filter(position__gte=start)
+        if end is not None:
+            variants = variants.filter(position__lte=end)
+    return variants
+
+
+def scoreset_variants(request, urn):
+    """
+    Returns a page of the variants of a scoreset as JSON, with the urn, HGVS
+    strings, scores and counts of each variant.
+
+    Pages are selected by urn number rather than by offset so that each
+    page costs the same however deep it is: `after` gives the number of the
+    last variant already seen and `limit` the number of variants to return.
+    The `next` link holds the parameters of the following page, or is null
+    on the last page. See `filter_variants` for the other parameters.
+
+    Parameters
+    ----------
+    request : object
+        Incoming request object.
+    urn : str
+        URN of the scoreset.
+
+    Returns
+    -------
+    `JsonResponse`
+    """
+    scoreset = validate_request(request, urn)
+    if not isinstance(scoreset, ScoreSet):
+        return scoreset  # Invalid request, return response.
+
+    try:
+        after = int_parameter(request, "after", default=0)
+        limit = int_parameter(
+            request, "limit", default=VARIANT_PAGE_SIZE, minimum=1
+        )
+        variants = filter_variants(scoreset, request)
+    except exceptions.ParseError as e:
+        return JsonResponse({"detail": e.detail}, status=e.status_code)
+
+    limit = min(limit, MAX_VARIANT_PAGE_SIZE)
+    # One more variant than returned tells whether there is another page.
+    rows = list(
+        variants.filter(number__gt=after).values_list(
+            "number", "urn", *snapshots.hgvs_fields, "data"
+        )[: limit + 1]
+    )
+    results = []
+    for (number, variant_urn, *hgvs, data) in rows[:limit]:
+        result = {"urn": variant_urn}
+        result.update(zip(snapshots.hgvs_fields, hgvs))
+        result["scores"] = data.get(constants.variant_score_data, {})
+        result["counts"] = data.get(constants.variant_count_data, {})
+        results.append(result)
+
+    next_url = None
+    if len(rows) > limit:
+        params = request.GET.copy()
+        params["after"] = rows[limit - 1][0]
+        next_url = "{}?{}".format(
+            request.build_absolute_uri(request.path), params.urlencode()
+        )
+    return JsonResponse({"next": next_url, "results": results}, status=200)
 
 
 def scoreset_metadata(request, urn):
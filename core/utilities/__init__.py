@@ -1,6 +1,7 @@
 import re
 import logging
 from datetime import datetime
+from itertools import islice
 
 import numpy as np
 import pandas as pd
@@ -33,6 +34,8 @@ null_values_re = re.compile(
     r"\s+|none|nan|na|undefined|n/a|null|nil|{}".format(NA_value),
     flags=re.IGNORECASE,
 )
+# Lowercase null values which are compared against stripped string cells.
+lowercase_null_values = frozenset(v.lower() for v in null_values_list)
 readable_null_values = [
     "'{}'".format(v)
     for v in set([v.lower() for v in null_values_list])
@@ -53,6 +56,19 @@ def is_null(value):
     return null_values_re.fullmatch(value) or not value
 
 
+def null_mask(series: pd.Series) -> pd.Series:
+    """
+    Vectorized `is_null`. Returns a boolean series which is True where a
+    cell is `None`, `np.NaN` or a string in `null_values_list` once stripped
+    and lowercased.
+    """
+    if series.dtype == object:
+        return series.isna() | series.astype(str).str.strip().str.lower().isin(
+            lowercase_null_values
+        )
+    return series.isna()
+
+
 def format_delta(ta, tb=None):
     if tb is None:
         tb = datetime.now()
@@ -157,3 +173,12 @@ def chunks(ls, n):
     """Return elements in a list, n at a time."""
     for i in range(0, len(ls), n):
         yield ls[i : i + n]
+
+
+def iter_chunks(iterable, n):
+    """Return lists of elements from any iterable, n at a time."""
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, n))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, n))
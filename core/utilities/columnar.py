@@ -0,0 +1,117 @@
+"""
+This module contains helper functions for reading Parquet and Arrow IPC
+files uploaded in place of CSV files.
+"""
+from typing import BinaryIO, List, TextIO, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet as pq
+
+CSV = "csv"
+PARQUET = "parquet"
+ARROW_FILE = "arrow"
+ARROW_STREAM = "arrow-stream"
+
+# File extensions accepted for columnar uploads. Feather V2 files are Arrow
+# IPC files.
+extensions = ("parquet", "arrow", "feather", "ipc")
+
+magic_numbers = (
+    (b"PAR1", PARQUET),
+    (b"ARROW1", ARROW_FILE),
+    # IPC streams begin with the continuation marker of the schema message.
+    (b"\xff\xff\xff\xff", ARROW_STREAM),
+)
+
+File = Union[str, TextIO, BinaryIO]
+
+
+def detect_format(file: File) -> str:
+    """
+    Infers the format of a file path or open file handle from its leading
+    bytes. Text handles are always CSV. Open handles are returned to
+    position 0.
+    """
+    if isinstance(file, str):
+        with open(file, "rb") as handle:
+            head = handle.read(6)
+    else:
+        file.seek(0)
+        head = file.read(6)
+        file.seek(0)
+
+    if isinstance(head, bytes):
+        for (magic, file_format) in magic_numbers:
+            if head.startswith(magic):
+                return file_format
+    return CSV
+
+
+def read_column_names(file: File, file_format: str) -> List[str]:
+    """
+    Reads the column names of a Parquet or Arrow IPC file from its schema
+    without reading any row data. Columns holding a pandas index are
+    excluded.
+    """
+    source = _open(file)
+    if file_format == PARQUET:
+        schema = pq.read_schema(source)
+    elif file_format == ARROW_FILE:
+        schema = pa.ipc.open_file(source).schema
+    elif file_format == ARROW_STREAM:
+        schema = pa.ipc.open_stream(source).schema
+    else:
+        raise ValueError(f"'{file_format}' is not a columnar file format.")
+
+    _rewind(file)
+    index_columns = _index_columns(schema)
+    return [n for n in schema.names if n not in index_columns]
+
+
+def read_dataframe(file: File, file_format: str) -> pd.DataFrame:
+    """
+    Reads a Parquet or Arrow IPC file into a `pd.DataFrame`, keeping the
+    column types stored in the file. Files on disk are memory-mapped.
+    Columns holding a pandas index are discarded.
+    """
+    source = _open(file)
+    if file_format == PARQUET:
+        table = pq.read_table(source, use_pandas_metadata=False)
+    elif file_format == ARROW_FILE:
+        table = pa.ipc.open_file(source).read_all()
+    elif file_format == ARROW_STREAM:
+        table = pa.ipc.open_stream(source).read_all()
+    else:
+        raise ValueError(f"'{file_format}' is not a columnar file format.")
+
+    _rewind(file)
+    index_columns = _index_columns(table.schema)
+    if index_columns:
+        table = table.drop(
+            [n for n in table.schema.names if n in index_columns]
+        )
+    return table.to_pandas(ignore_metadata=True)
+
+
+def _open(file: File):
+    if isinstance(file, str):
+        return pa.memory_map(file, "r")
+    file.seek(0)
+    return file
+
+
+def _rewind(file: File):
+    if not isinstance(file, str):
+        file.seek(0)
+
+
+def _index_columns(schema: pa.Schema) -> List[str]:
+    # Unnamed indexes written by `pd.DataFrame.to_parquet` are stored as
+    # columns such as '__index_level_0__' and listed in the pandas metadata.
+    # Range indexes are stored as metadata only.
+    metadata = schema.pandas_metadata or {}
+    return [
+        c for c in metadata.get("index_columns", []) if isinstance(c, str)
+    ]
@@ -1,5 +1,9 @@
+import os
+import tempfile
+from typing import List
+
 from django.contrib.messages.storage.fallback import FallbackStorage
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from celery.contrib.testing.worker import start_worker
 from mavedb import celery_app
@@ -20,6 +24,30 @@ class TestMessageMixin:
         return request
 
 
+class TemporaryDirectoryMixin:
+    """
+    Points each setting named in `temporary_directory_settings` to its own
+    empty directory, removed after each test. List the mixin before the test
+    case class so that its `setUp` is called.
+    """
+
+    temporary_directory_settings: List[str] = []
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        paths = {
+            name: os.path.join(directory.name, name.lower())
+            for name in self.temporary_directory_settings
+        }
+        for path in paths.values():
+            os.makedirs(path)
+        settings = override_settings(**paths)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+
 class CeleryTestCase(TestCase):
     allow_database_queries = True
 
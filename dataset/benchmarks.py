@@ -0,0 +1,447 @@
+"""
+Synthetic datasets and stage timings for the upload validation pipeline.
+Used by the `benchmarkupload` management command.
+"""
+import gc
+import time
+import tracemalloc
+from collections import namedtuple
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from fqfa.constants import AA_CODES, DNA_BASES
+from fqfa.util.translate import translate_dna
+
+from variant.utilities import convert_df_to_variant_records
+from variant.validators import HGVSParseCache, MaveDataset
+
+from . import constants
+
+LAYOUTS = ("nt", "pro", "nt+splice+pro")
+SIZES = (10000, 100000, 1000000)
+
+# Every n-th variant is a multi-variant so that the full HGVS parser is
+# exercised alongside the simple substitution fast path.
+MULTI_VARIANT_EVERY = 10
+
+STOP_CODONS = ("TAA", "TAG", "TGA")
+SENSE_CODONS = tuple(
+    a + b + c
+    for a in DNA_BASES
+    for b in DNA_BASES
+    for c in DNA_BASES
+    if (a + b + c) not in STOP_CODONS
+)
+
+
+class StageResult(
+    namedtuple(
+        "StageResult",
+        [
+            "layout",
+            "n_rows",
+            "with_counts",
+            "stage",
+            "seconds",
+            "peak_bytes",
+        ],
+    )
+):
+    @property
+    def rows_per_second(self) -> float:
+        if not self.seconds:
+            return float("inf")
+        return self.n_rows / self.seconds
+
+    @property
+    def peak_mib(self) -> Optional[float]:
+        if self.peak_bytes is None:
+            return None
+        return self.peak_bytes / (1024 ** 2)
+
+
+def synthetic_dataset(
+    n_rows: int, layout: str = "nt", with_counts: bool = False, seed: int = 0
+) -> Tuple[str, str, Optional[str]]:
+    """
+    Generates a valid scores file, and optionally a matching counts file,
+    of unique variants against a random coding target sequence.
+
+    Parameters
+    ----------
+    n_rows: int
+        Number of variants to generate.
+    layout: str
+        One of `LAYOUTS`. 'nt' defines coding variants in `hgvs_nt`, 'pro'
+        defines protein variants in `hgvs_pro` and 'nt+splice+pro' defines
+        genomic, transcript and protein variants in all three columns.
+    with_counts: bool
+        Also generate a counts file defining the same variants.
+    seed: int
+        Seed for the random target sequence and data columns.
+
+    Returns
+    -------
+    A tuple `(targetseq, scores_csv, counts_csv)`. `counts_csv` is `None`
+    when `with_counts` is `False`.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"'{layout}' is not one of {', '.join(LAYOUTS)}.")
+
+    rng = np.random.RandomState(seed)
+    # Enough codons for each row to be a unique single substitution, plus
+    # one to pair with the last row when it is a multi-variant.
+    n_codons = n_rows // 3 + 2
+    targetseq = "".join(
+        SENSE_CODONS[i] for i in rng.randint(len(SENSE_CODONS), size=n_codons)
+    )
+    protein, _ = translate_dna(targetseq)
+
+    if layout == "pro":
+        hgvs = {
+            constants.hgvs_pro_column: _protein_variants(n_rows, protein)
+        }
+    else:
+        prefix = "c" if layout == "nt" else "g"
+        events = [_nucleotide_event(i, targetseq) for i in range(n_rows)]
+        hgvs = {constants.hgvs_nt_column: _join_events(prefix, events)}
+        if layout == "nt+splice+pro":
+            hgvs[constants.hgvs_splice_column] = _join_events("c", events)
+            # Protein variants describe the first change of each event only.
+            hgvs[constants.hgvs_pro_column] = [
+                _protein_consequence(e[0], targetseq, protein) for e in events
+            ]
+
+    scores = pd.DataFrame(hgvs)
+    scores[constants.required_score_column] = rng.normal(size=n_rows)
+    scores["se"] = np.abs(rng.normal(scale=0.1, size=n_rows))
+    scores_csv = scores.to_csv(index=False)
+
+    counts_csv = None
+    if with_counts:
+        counts = pd.DataFrame(hgvs)
+        counts["count_a"] = rng.randint(0, 1000, size=n_rows)
+        counts["count_b"] = rng.randint(0, 1000, size=n_rows)
+        counts_csv = counts.to_csv(index=False)
+
+    return targetseq, scores_csv, counts_csv
+
+
+def _nucleotide_event(i: int, targetseq: str) -> List[Tuple[int, str, str]]:
+    # Row i substitutes one of the three alternate bases at position
+    # i // 3 + 1, so each row is unique. Multi-variant rows also change the
+    # following position.
+    position = i // 3 + 1
+    events = [_nucleotide_substitution(position, i % 3, targetseq)]
+    if i % MULTI_VARIANT_EVERY == MULTI_VARIANT_EVERY - 1:
+        events.append(_nucleotide_substitution(position + 1, 0, targetseq))
+    return events
+
+
+def _nucleotide_substitution(
+    position: int, alt: int, targetseq: str
+) -> Tuple[int, str, str]:
+    ref = targetseq[position - 1]
+    return position, ref, [b for b in DNA_BASES if b != ref][alt]
+
+
+def _join_events(prefix: str, events: List[List[Tuple[int, str, str]]]):
+    variants = []
+    for event in events:
+        changes = [f"{p}{r}>{a}" for (p, r, a) in event]
+        if len(changes) == 1:
+            variants.append(f"{prefix}.{changes[0]}")
+        else:
+            variants.append(f"{prefix}.[{';'.join(changes)}]")
+    return variants
+
+
+def _protein_consequence(
+    substitution: Tuple[int, str, str], targetseq: str, protein: str
+) -> str:
+    position, _, alt = substitution
+    codon_number = (position - 1) // 3 + 1
+    start = (codon_number - 1) * 3
+    codon = list(targetseq[start : start + 3])
+    codon[(position - 1) % 3] = alt
+    new, _ = translate_dna("".join(codon))
+    ref = AA_CODES[protein[codon_number - 1]]
+    if new == protein[codon_number - 1]:
+        return f"p.{ref}{codon_number}="
+    return f"p.{ref}{codon_number}{AA_CODES[new]}"
+
+
+def _protein_variants(n_rows: int, protein: str) -> List[str]:
+    # Row i substitutes one of the twenty alternate residues, including
+    # Ter, at codon i // 20 + 1. Multi-variant rows also change the
+    # following codon.
+    def substitution(codon_number, alt):
+        ref = protein[codon_number - 1]
+        new = [a for a in AA_CODES if a != ref][alt]
+        return f"{AA_CODES[ref]}{codon_number}{AA_CODES[new]}"
+
+    variants = []
+    for i in range(n_rows):
+        codon_number = i // 20 + 1
+        change = substitution(codon_number, i % 20)
+        if i % MULTI_VARIANT_EVERY == MULTI_VARIANT_EVERY - 1:
+            variants.append(
+                f"p.[{change};{substitution(codon_number + 1, 0)}]"
+            )
+        else:
+            variants.append(f"p.{change}")
+    return variants
+
+
+def _measure(
+    func: Callable[[], Any], trace_memory: bool
+) -> Tuple[Any, float, Optional[int]]:
+    # Memory is traced in a separate pass since tracemalloc slows down
+    # allocation heavy code considerably. Only allocations made by this
+    # process are seen, so worker processes used for parsing are excluded.
+    gc.collect()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = func()
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return result, seconds, peak
+
+
+def _uploaded_file(name: str, content: str) -> SimpleUploadedFile:
+    return SimpleUploadedFile(
+        name=name, content=content.encode(), content_type="text/csv"
+    )
+
+
+def _run_pipeline(
+    targetseq: str,
+    scores_csv: str,
+    counts_csv: Optional[str],
+    n_jobs: int,
+    include_form: bool,
+    trace_memory: bool,
+    include_load: bool = False,
+) -> List[Tuple[str, float, Optional[int]]]:
+    timings = []
+    cache = HGVSParseCache()
+
+    def run(stage, func):
+        result, seconds, peak = _measure(func, trace_memory)
+        timings.append((stage, seconds, peak))
+        return result
+
+    def validate(dataset, reference=None):
+        dataset.validate(
+            targetseq=targetseq,
+            relaxed_ordering=True,
+            n_jobs=n_jobs,
+            cache=cache,
+            reference=reference,
+            max_errors=settings.VALIDATION_MAX_ERRORS,
+        )
+        if not dataset.is_valid:
+            raise ValueError(
+                f"Synthetic {dataset.label} dataset is invalid: "
+                f"{dataset.errors[:5]}"
+            )
+        return dataset
+
+    scores = run(
+        "read scores",
+        lambda: MaveDataset.for_scores(
+            _uploaded_file("scores.csv", scores_csv)
+        ),
+    )
+    run("validate scores", lambda: validate(scores))
+
+    counts = MaveDataset()
+    if counts_csv is not None:
+        counts = run(
+            "read counts",
+            lambda: MaveDataset.for_counts(
+                _uploaded_file("counts.csv", counts_csv)
+            ),
+        )
+        run("validate counts", lambda: validate(counts, reference=scores))
+
+    records = run(
+        "variant records",
+        lambda: convert_df_to_variant_records(
+            scores.data(serializable=True),
+            counts.data(serializable=True),
+            scores.index_column,
+        ),
+    )
+
+    if include_load:
+        dataset_columns = {
+            constants.score_columns: scores.non_hgvs_columns,
+            constants.count_columns: counts.non_hgvs_columns,
+        }
+
+        def load(use_copy):
+            return _load_variants(records, dataset_columns, use_copy)
+
+        run("load (orm)", lambda: load(use_copy=False))
+        if connection.vendor == "postgresql":
+            run("load (copy)", lambda: load(use_copy=True))
+
+    if include_form:
+        run(
+            "form",
+            lambda: _validate_form(targetseq, scores_csv, counts_csv, n_jobs),
+        )
+
+    return timings
+
+
+def _load_variants(
+    records: List[dict], dataset_columns: dict, use_copy: bool
+) -> int:
+    # Imported here since factories are only needed for this stage.
+    from variant.models import Variant
+    from .factories import ScoreSetFactory
+
+    # The score set and its variants are rolled back afterwards.
+    with transaction.atomic():
+        count = Variant.bulk_create(
+            ScoreSetFactory(dataset_columns=dataset_columns),
+            records,
+            use_copy=use_copy,
+        )
+        transaction.set_rollback(True)
+
+    if count != len(records):
+        raise ValueError(f"Loaded {count} of {len(records)} variants.")
+    return count
+
+
+def _validate_form(
+    targetseq: str, scores_csv: str, counts_csv: Optional[str], n_jobs: int
+) -> bool:
+    # Imported here since factories are only needed for this stage.
+    from accounts.factories import UserFactory
+    from .factories import ExperimentFactory
+    from .forms.scoreset import ScoreSetForm
+
+    # The user and experiment the form requires are rolled back afterwards.
+    with transaction.atomic():
+        user = UserFactory()
+        experiment = ExperimentFactory()
+        experiment.add_administrators(user)
+
+        files = {
+            constants.variant_score_data: _uploaded_file(
+                "scores.csv", scores_csv
+            )
+        }
+        if counts_csv is not None:
+            files[constants.variant_count_data] = _uploaded_file(
+                "counts.csv", counts_csv
+            )
+        form = ScoreSetForm(
+            data={
+                "short_description": "benchmark",
+                "title": "benchmark",
+                "experiment": experiment.pk,
+            },
+            files=files,
+            user=user,
+        )
+        # Validated datasets are not cached so that every run validates the
+        # files and synthetic datasets do not evict real cache entries.
+        caches = {
+            **settings.CACHES,
+            "validation": {
+                "BACKEND": "django.core.cache.backends.dummy.DummyCache"
+            },
+        }
+        with override_settings(VALIDATION_N_JOBS=n_jobs, CACHES=caches):
+            valid = form.is_valid(targetseq=targetseq)
+        transaction.set_rollback(True)
+
+    if not valid:
+        raise ValueError(f"Synthetic submission is invalid: {form.errors}")
+    return valid
+
+
+def benchmark(
+    n_rows: int,
+    layout: str = "nt",
+    with_counts: bool = False,
+    n_jobs: int = 1,
+    include_form: bool = True,
+    trace_memory: bool = True,
+    seed: int = 0,
+    include_load: bool = False,
+) -> List[StageResult]:
+    """
+    Times each stage of validating a synthetic upload, from reading the
+    files through to the records passed to `Variant.bulk_create`, and
+    optionally the load of those records into the database.
+
+    Parameters
+    ----------
+    n_rows: int
+        Number of variants in the synthetic dataset.
+    layout: str
+        One of `LAYOUTS`, see `synthetic_dataset`.
+    with_counts: bool
+        Include a counts file.
+    n_jobs: int
+        Processes used to parse HGVS columns, see `MaveDataset.validate`.
+    include_form: bool
+        Also time `ScoreSetForm` validation of the same files. This creates
+        a user and experiment in a transaction that is rolled back.
+    trace_memory: bool
+        Run the pipeline a second time with `tracemalloc` to record the peak
+        memory allocated by each stage.
+    seed: int
+        Seed passed to `synthetic_dataset`.
+    include_load: bool
+        Also time loading the variant records into the database with the
+        ORM and, on PostgreSQL, with `COPY`. Each load is rolled back.
+
+    Returns
+    -------
+    A `StageResult` for each stage in the order they were run.
+    """
+    targetseq, scores_csv, counts_csv = synthetic_dataset(
+        n_rows, layout=layout, with_counts=with_counts, seed=seed
+    )
+    args = (targetseq, scores_csv, counts_csv, n_jobs, include_form)
+
+    timings = _run_pipeline(
+        *args, trace_memory=False, include_load=include_load
+    )
+    peaks = [None] * len(timings)
+    if trace_memory:
+        peaks = [
+            p
+            for (_, _, p) in _run_pipeline(
+                *args, trace_memory=True, include_load=include_load
+            )
+        ]
+
+    return [
+        StageResult(
+            layout=layout,
+            n_rows=n_rows,
+            with_counts=with_counts,
+            stage=stage,
+            seconds=seconds,
+            peak_bytes=peak,
+        )
+        for ((stage, seconds, _), peak) in zip(timings, peaks)
+    ]
@@ -0,0 +1,292 @@
+"""
+Cached downloads of the scores and counts of public score sets in each of
+`FORMATS`. A file is written the first time it is requested and then sent
+from disk for every later request.
+
+Files are kept in the snapshot directory of a score set, in a subdirectory
+for each format, under a name made from a key over what is written to the
+file apart from the variants: the urn, licence, data usage policy and
+dataset columns, along with the last child value and the time the score set
+was last saved. Editing any of these changes the key and the old file is
+replaced when the new one is written. Changes to the variants remove the
+snapshot directory and with it the cached files.
+
+Each download is also written compressed with every content coding in
+`ENCODINGS`, so that compressed responses are sent from disk too, apart
+from formats in `COMPRESSED_FORMATS`.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from contextlib import ExitStack
+from typing import IO, Iterable, Iterator, List, Optional, Union
+
+import zstandard
+
+from dataset import snapshots
+
+# Download formats and their file extensions.
+FORMATS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+    "ndjson": ".ndjson",
+}
+# Content codings of the compressed copies of each download and their file
+# extensions, most preferred first.
+ENCODINGS = {"zstd": ".zst", "gzip": ".gz"}
+COMPRESSION_LEVELS = {"zstd": 10, "gzip": 6}
+# Formats compressed within the file, which have no compressed copies.
+COMPRESSED_FORMATS = {"parquet", "arrow"}
+
+
+def downloads_path(scoreset, fmt: str = "csv") -> str:
+    """
+    Returns the directory holding the cached `fmt` downloads of `scoreset`.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(
+            f"'{fmt}' is an unknown format. Use one of {', '.join(FORMATS)}"
+        )
+    return os.path.join(
+        snapshots.snapshot_path(scoreset), snapshots.DOWNLOADS_DIR, fmt
+    )
+
+
+def encodings(fmt: str) -> List[str]:
+    """
+    Returns the content codings `fmt` downloads are compressed with.
+    """
+    if fmt in COMPRESSED_FORMATS:
+        return []
+    return list(ENCODINGS)
+
+
+def download_key(scoreset, dtype: str) -> str:
+    """
+    Returns the key of the cached `dtype` download of `scoreset`, which
+    changes whenever anything written to the file other than the variants
+    changes.
+    """
+    licence = scoreset.licence
+    values = [
+        scoreset.urn,
+        dtype,
+        scoreset.last_child_value,
+        str(scoreset.modification_time),
+        licence.long_name if licence else None,
+        licence.link if licence else None,
+        scoreset.data_usage_policy,
+        scoreset.dataset_columns,
+    ]
+    return hashlib.sha256(
+        json.dumps(values, sort_keys=True).encode()
+    ).hexdigest()[:32]
+
+
+def open_download(
+    scoreset, dtype: str, encoding: Optional[str] = None, fmt: str = "csv"
+) -> Optional[IO[bytes]]:
+    """
+    Opens the cached `fmt` download of the `dtype` data of `scoreset` for
+    reading, compressed with `encoding` if given. Returns `None` if there is
+    no current download.
+    """
+    path = downloads_path(scoreset, fmt)
+    prefix = "{}-{}-".format(dtype, download_key(scoreset, dtype))
+    try:
+        names = os.listdir(path)
+    except FileNotFoundError:
+        return None
+    for name in names:
+        if name.startswith(prefix) and name.endswith(FORMATS[fmt]):
+            try:
+                return open(
+                    os.path.join(path, name + ENCODINGS.get(encoding, "")),
+                    "rb",
+                )
+            except FileNotFoundError:
+                # Replaced by a newer download since listing the directory.
+                return None
+    return None
+
+
+def write_download(
+    scoreset,
+    dtype: str,
+    content: Iterable[Union[str, bytes]],
+    encoding: Optional[str] = None,
+    fmt: str = "csv",
+) -> IO[bytes]:
+    """
+    Writes `content` as the cached `fmt` download of the `dtype` data of
+    `scoreset` along with a copy compressed with each of `encodings(fmt)`,
+    removing previous downloads of the same type and format.
+
+    The file name ends with a digest of `content`, so `download_etag`
+    returns a different tag whenever the content changes.
+
+    Returns
+    -------
+    `IO[bytes]`
+        The written download, compressed with `encoding` if given, opened
+        for reading.
+    """
+    path = downloads_path(scoreset, fmt)
+    writer = _write_download(scoreset, dtype, content, None, fmt)
+    try:
+        while True:
+            next(writer)
+    except StopIteration as stop:
+        name = stop.value
+    # Open before removing other downloads so that the file can still be
+    # sent if a concurrent request replaces it.
+    download = open(
+        os.path.join(path, name + ENCODINGS.get(encoding, "")), "rb"
+    )
+    _remove_other_downloads(path, dtype, name)
+    return download
+
+
+def stream_download(
+    scoreset,
+    dtype: str,
+    content: Iterable[Union[str, bytes]],
+    encoding: Optional[str] = None,
+    fmt: str = "csv",
+) -> Iterator[bytes]:
+    """
+    Writes `content` like `write_download` while yielding it, compressed
+    with `encoding` if given, so that a response can be sent as the
+    download is written. The download is moved into place once `content`
+    has been read to the end and is discarded if the response is closed
+    before then.
+    """
+    name = yield from _write_download(scoreset, dtype, content, encoding, fmt)
+    _remove_other_downloads(downloads_path(scoreset, fmt), dtype, name)
+
+
+def _write_download(
+    scoreset,
+    dtype: str,
+    content: Iterable[Union[str, bytes]],
+    encoding: Optional[str],
+    fmt: str,
+) -> Iterator[bytes]:
+    # Yields the chunks written compressed with `encoding` and returns the
+    # name of the written download.
+    path = downloads_path(scoreset, fmt)
+    os.makedirs(path, exist_ok=True)
+    digest = hashlib.sha256()
+    compressors = {e: compressor(e) for e in encodings(fmt)}
+    if encoding is not None and encoding not in compressors:
+        raise ValueError(
+            f"'{fmt}' downloads are not compressed with '{encoding}'"
+        )
+    # Write next to the destination and move the files into place so that
+    # readers never see a partially written file.
+    partials = {}
+    try:
+        for e in [None] + list(compressors):
+            handle, partials[e] = tempfile.mkstemp(dir=path, suffix=".partial")
+            os.close(handle)
+        with ExitStack() as stack:
+            files = {
+                e: stack.enter_context(open(partial, "wb"))
+                for (e, partial) in partials.items()
+            }
+            for chunk in content:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                digest.update(chunk)
+                written = {None: chunk}
+                for (e, c) in compressors.items():
+                    written[e] = c.compress(chunk)
+                for (e, data) in written.items():
+                    files[e].write(data)
+                if written.get(encoding, None):
+                    yield written[encoding]
+            for (e, c) in compressors.items():
+                data = c.flush()
+                files[e].write(data)
+                if e == encoding and data:
+                    yield data
+
+        name = "{}-{}-{}{}".format(
+            dtype,
+            download_key(scoreset, dtype),
+            digest.hexdigest()[:16],
+            FORMATS[fmt],
+        )
+        # Compressed copies go first so they exist whenever the download
+        # can be found.
+        for (e, suffix) in ENCODINGS.items():
+            if e in partials:
+                os.replace(partials[e], os.path.join(path, name + suffix))
+        os.replace(partials[None], os.path.join(path, name))
+    finally:
+        for partial in partials.values():
+            if os.path.exists(partial):
+                os.remove(partial)
+    return name
+
+
+def _remove_other_downloads(path: str, dtype: str, name: str):
+    prefix = "{}-".format(dtype)
+    for other in os.listdir(path):
+        if other.startswith(prefix) and not other.startswith(name):
+            try:
+                os.remove(os.path.join(path, other))
+            except FileNotFoundError:
+                pass
+
+
+def download_etag(download: IO[bytes]) -> str:
+    """
+    Returns the quoted entity tag of an opened download. Compressed copies
+    have the tag of the download followed by their content coding.
+    """
+    name = os.path.basename(download.name)
+    for (encoding, suffix) in ENCODINGS.items():
+        if name.endswith(suffix):
+            name = os.path.splitext(name[: -len(suffix)])[0]
+            return '"{}-{}"'.format(name, encoding)
+    return '"{}"'.format(os.path.splitext(name)[0])
+
+
+def compressor(encoding: str):
+    """
+    Returns an object compressing data with the content coding `encoding`
+    through its `compress` and `flush` methods.
+    """
+    if encoding == "gzip":
+        # A window size of 16 + 15 bits writes a gzip header and trailer.
+        return zlib.compressobj(
+            COMPRESSION_LEVELS["gzip"], zlib.DEFLATED, 16 + zlib.MAX_WBITS
+        )
+    elif encoding == "zstd":
+        return zstandard.ZstdCompressor(
+            level=COMPRESSION_LEVELS["zstd"]
+        ).compressobj()
+    raise ValueError(
+        f"'{encoding}' is an unknown encoding. Use either 'zstd' or 'gzip'"
+    )
+
+
+def compress(
+    content: Iterable[Union[str, bytes]], encoding: str
+) -> Iterator[bytes]:
+    """
+    Compresses `content` with the content coding `encoding` as it is read.
+    Used for downloads that are not cached.
+    """
+    c = compressor(encoding)
+    for chunk in content:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        data = c.compress(chunk)
+        if data:
+            yield data
+    yield c.flush()
@@ -1,5 +1,7 @@
+import hashlib
 import io
 import json
+import logging
 from enum import Enum
 from typing import Optional, List, Tuple
 
@@ -17,9 +19,11 @@ from core.utilities import humanized_null_values
 from dataset import constants as constants
 from main.models import Licence
 from variant.validators import (
+    HGVSParseCache,
     MaveDataset,
     MaveScoresDataset,
     MaveCountsDataset,
+    ValidatedDatasetCache,
 )
 from ..forms.base import DatasetModelForm
 from ..models import ExperimentSet
@@ -27,12 +31,14 @@ from ..models.experiment import Experiment
 from ..models.scoreset import ScoreSet
 from ..validators import (
     validate_scoreset_score_data_input,
-    validate_csv_extension,
     validate_json_extension,
     validate_scoreset_count_data_input,
     validate_scoreset_json,
+    validate_variant_data_extension,
 )
 
+logger = logging.getLogger("django")
+
 
 class ErrorMessages(NestedEnumMixin, Enum):
     """ScoreSet field specific error messages."""
@@ -150,7 +156,8 @@ class ScoreSetForm(DatasetModelForm):
         required=False,
         label="Variant score data",
         help_text=mark_safe(
-            f"A valid CSV file containing variant score information. The file "
+            f"A valid CSV, Parquet or Arrow IPC file containing variant score "
+            f"information. The file "
             f"must at least specify the columns <b>hgvs_nt</b> or "
             f"<b>hgvs_pro</b> (or both) and <b>score</b>. There are no "
             f"constraints on other column names. Apart from the hgvs columns, "
@@ -170,7 +177,7 @@ class ScoreSetForm(DatasetModelForm):
         ),
         validators=[
             validate_scoreset_score_data_input,
-            validate_csv_extension,
+            validate_variant_data_extension,
         ],
         widget=forms.widgets.ClearableFileInput(attrs={"accept": "csv"}),
     )
@@ -178,7 +185,8 @@ class ScoreSetForm(DatasetModelForm):
         required=False,
         label="Variant count data",
         help_text=mark_safe(
-            f"A valid CSV file containing variant count information. The "
+            f"A valid CSV, Parquet or Arrow IPC file containing variant count "
+            f"information. The "
             f"hgvs columns in this file must adhere to the same requirements "
             f"as the scores file. Non-hgvs columns must contain numeric count "
             f"data, and there are no name requirements for these columns. "
@@ -191,7 +199,7 @@ class ScoreSetForm(DatasetModelForm):
         ),
         validators=[
             validate_scoreset_count_data_input,
-            validate_csv_extension,
+            validate_variant_data_extension,
         ],
         widget=forms.widgets.FileInput(attrs={"accept": "csv"}),
     )
@@ -229,6 +237,15 @@ class ScoreSetForm(DatasetModelForm):
         self.experiment = None
         self.targetseq = None
         self.allow_aa_sequence = False
+        # Shared between the scores and counts files since both must define
+        # the same variants.
+        self.hgvs_cache = HGVSParseCache()
+        # Valid uploads are cached across requests by a hash of their
+        # contents, which are kept to detect unchanged variant data.
+        self.validated_datasets = ValidatedDatasetCache(
+            max_rows=settings.VALIDATION_CACHE_MAX_ROWS
+        )
+        self.file_digests = {}
         if "experiment" in kwargs:
             self.experiment = kwargs.pop("experiment")
         super().__init__(*args, **kwargs)
@@ -542,8 +559,7 @@ class ScoreSetForm(DatasetModelForm):
         if not score_file:
             return MaveDataset()
 
-        v = MaveDataset.for_scores(file=score_file)
-        v.validate(targetseq=self.targetseq, relaxed_ordering=True)
+        v = self.validate_dataset(score_file, MaveDataset.DatasetType.SCORES)
 
         if v.is_valid:
             self.dataset_columns[constants.score_columns] = v.non_hgvs_columns
@@ -561,6 +577,8 @@ class ScoreSetForm(DatasetModelForm):
                         "the errors file to see details.",
                     ),
                 )
+            if v.errors_truncated:
+                self.add_error("score_data", self.truncated_errors_message(v))
             return v
 
     def clean_count_data(self) -> MaveDataset:
@@ -569,8 +587,12 @@ class ScoreSetForm(DatasetModelForm):
             self.dataset_columns[constants.count_columns] = []
             return MaveDataset()
 
-        v = MaveDataset.for_counts(file=count_file)
-        v.validate(targetseq=self.targetseq, relaxed_ordering=True)
+        # Counts must define the same variants as the scores file so reuse
+        # its validated variants where the rows match.
+        score_data = self.cleaned_data.get("score_data", None)
+        v = self.validate_dataset(
+            count_file, MaveDataset.DatasetType.COUNTS, reference=score_data
+        )
 
         if v.is_valid:
             self.dataset_columns[constants.count_columns] = v.non_hgvs_columns
@@ -588,8 +610,51 @@ class ScoreSetForm(DatasetModelForm):
                         "the errors file to see details.",
                     ),
                 )
+            if v.errors_truncated:
+                self.add_error("count_data", self.truncated_errors_message(v))
+            return v
+
+    def validate_dataset(
+        self,
+        file,
+        dataset_type: str,
+        reference: Optional[MaveDataset] = None,
+    ) -> MaveDataset:
+        """
+        Reads and validates an uploaded scores or counts file. Returns the
+        cached dataset instead if an identical file has already been
+        validated against the same target sequence.
+        """
+        digest = self.validated_datasets.digest(file)
+        self.file_digests[dataset_type] = digest
+
+        v = self.validated_datasets.get(
+            digest,
+            dataset_type,
+            targetseq=self.targetseq,
+            relaxed_ordering=True,
+        )
+        if v is not None:
+            logger.info(f"Using cached {v.label} dataset for upload {digest}.")
             return v
 
+        if dataset_type == MaveDataset.DatasetType.SCORES:
+            v = MaveDataset.for_scores(file=file)
+        else:
+            v = MaveDataset.for_counts(file=file)
+        v.validate(
+            targetseq=self.targetseq,
+            relaxed_ordering=True,
+            n_jobs=settings.VALIDATION_N_JOBS,
+            cache=self.hgvs_cache,
+            reference=reference,
+            max_errors=settings.VALIDATION_MAX_ERRORS,
+        )
+        self.validated_datasets.set(
+            digest, dataset_type, self.targetseq, True, v
+        )
+        return v
+
     def clean_meta_data(self):
         meta_file = self.cleaned_data.get("meta_data", None)
         if meta_file is None:
@@ -688,12 +753,20 @@ class ScoreSetForm(DatasetModelForm):
             validate_scoreset_json(self.dataset_columns)
             if not has_count_data:
                 count_data = MaveDataset()
-            variants = {
-                "scores_df": score_data.data(serializable=True),
-                "counts_df": count_data.data(serializable=True),
-                "index": score_data.index_column,
-            }
-            cleaned_data["variants"] = variants
+            if self.variants_unchanged:
+                # Leaving out variants means no task is submitted to replace
+                # the existing variants with identical ones.
+                logger.info(
+                    f"Variant data uploaded for {self.instance.urn} is "
+                    f"unchanged."
+                )
+            else:
+                variants = {
+                    "scores_df": score_data.data(serializable=True),
+                    "counts_df": count_data.data(serializable=True),
+                    "index": score_data.index_column,
+                }
+                cleaned_data["variants"] = variants
 
         return cleaned_data
 
@@ -701,10 +774,13 @@ class ScoreSetForm(DatasetModelForm):
         # Set as instance variables so full clean will be called every time
         # a new sequence or other settings are passed in.
         self.targetseq = targetseq
+        self.file_digests = {}
 
         # Clear previous errors to trigger full_clean call in base class.
         self._errors = None
-        return super().is_valid()
+        valid = super().is_valid()
+        logger.info(f"HGVS parse cache usage: {self.hgvs_cache.info()}")
+        return valid
 
     # --------------- SAVING ------------------------------------ #
     @transaction.atomic
@@ -735,6 +811,9 @@ class ScoreSetForm(DatasetModelForm):
                 self.instance.experiment = experiment
                 self.instance.experiment_id = experiment.id
 
+        if self.has_variants():
+            self.instance.variants_hash = self.variants_hash
+
         return super().save(commit=commit)
 
     # ---------------------- PUBLIC ----------------------------- #
@@ -751,6 +830,32 @@ class ScoreSetForm(DatasetModelForm):
     def has_variants(self):
         return bool(self.cleaned_data.get("variants", {}))
 
+    @property
+    def variants_hash(self) -> Optional[str]:
+        """
+        Hash of the uploaded score and count files, or `None` if no score
+        file has been uploaded.
+        """
+        scores = self.file_digests.get(MaveDataset.DatasetType.SCORES, None)
+        if scores is None:
+            return None
+        counts = self.file_digests.get(MaveDataset.DatasetType.COUNTS, "")
+        return hashlib.sha256(f"{scores}:{counts}".encode()).hexdigest()
+
+    @property
+    def variants_unchanged(self) -> bool:
+        """
+        Returns `True` if the uploaded files are identical to those the
+        instance's variants were successfully created from.
+        """
+        return (
+            self.instance.pk is not None
+            and self.instance.variants_hash is not None
+            and self.instance.variants_hash == self.variants_hash
+            and self.instance.processing_state == constants.success
+            and self.instance.has_variants
+        )
+
     @property
     def scores_dataset(self) -> Optional[MaveScoresDataset]:
         return self.cleaned_data.get("score_data", None)
@@ -777,6 +882,18 @@ class ScoreSetForm(DatasetModelForm):
             and validator.n_errors > self.MAX_ERRORS
         )
 
+    @staticmethod
+    def truncated_errors_message(dataset: MaveDataset) -> str:
+        """
+        Message explaining that validation of `dataset` stopped early because
+        it reached the error budget, so later rows may contain more errors.
+        """
+        return (
+            f"Validation stopped after the first {dataset.n_errors} errors. "
+            f"Correct these and upload your file again to validate the "
+            f"remaining rows."
+        )
+
     @property
     def is_meta_analysis(self) -> bool:
         if "meta_analysis_for" not in self.fields:
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dataset", "0016_auto_20200923_1616"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scoreset",
+            name="variants_hash",
+            field=models.CharField(
+                blank=True,
+                default=None,
+                editable=False,
+                max_length=64,
+                null=True,
+                verbose_name="Variants hash",
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dataset", "0017_scoreset_variants_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scoreset",
+            name="variants_done",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Variants loaded"
+            ),
+        ),
+        migrations.AddField(
+            model_name="scoreset",
+            name="variants_total",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Variants to load"
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dataset", "0018_scoreset_variants_progress"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scoreset",
+            name="modification_time",
+            field=models.DateTimeField(
+                auto_now=True, null=True, verbose_name="Modification time"
+            ),
+        ),
+    ]
@@ -15,6 +15,7 @@ from accounts.permissions import (
 from core.models import FailedTask
 from core.utilities import base_url
 from dataset import constants as constants
+from dataset import snapshots
 from main.models import Licence
 from urn.models import UrnModel
 from urn.validators import validate_mavedb_urn_scoreset
@@ -121,6 +122,22 @@ class ScoreSet(DatasetModel):
 
     replaces : `models.ForeignKey`
         Indicates a scoreset instances that replaces the current instance.
+
+    variants_hash : `models.CharField`
+        Hash of the score and count files the current variants were created
+        from. Used to skip re-creating variants from identical uploads.
+
+    variants_done : `models.PositiveIntegerField`
+        Number of variants loaded so far by the running `create_variants`
+        task.
+
+    variants_total : `models.PositiveIntegerField`
+        Number of variants being loaded by the running `create_variants`
+        task.
+
+    modification_time : `models.DateTimeField`
+        Time the instance was last saved. Unlike `modification_date` this
+        changes with every save, so it keys the cached downloads.
     """
 
     # ---------------------------------------------------------------------- #
@@ -206,6 +223,27 @@ class ScoreSet(DatasetModel):
         validators=[WordLimitValidator(250)],
     )
 
+    variants_hash = models.CharField(
+        max_length=64,
+        null=True,
+        default=None,
+        blank=True,
+        editable=False,
+        verbose_name="Variants hash",
+    )
+
+    variants_done = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Variants loaded"
+    )
+
+    variants_total = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Variants to load"
+    )
+
+    modification_time = models.DateTimeField(
+        auto_now=True, null=True, verbose_name="Modification time"
+    )
+
     # ---------------------------------------------------------------------- #
     #                       Methods
     # ---------------------------------------------------------------------- #
@@ -280,12 +318,20 @@ class ScoreSet(DatasetModel):
             self.target, "uniprot_id", None
         )
 
-    def delete_variants(self):
-        self.variants.all().delete()
+    def delete_variants(self) -> int:
+        """
+        Deletes the variants of this instance with a single statement and
+        resets its dataset columns and urn counter. Returns the number of
+        deleted variants.
+        """
+        from variant.models import Variant
+
+        deleted = Variant.bulk_delete(self)
+        snapshots.delete_snapshot(self)
         self.dataset_columns = default_dataset()
         self.last_child_value = 0
         self.save()
-        return self
+        return deleted
 
     def get_target(self):
         if not hasattr(self, "target"):
@@ -515,3 +561,8 @@ def create_permission_groups_for_scoreset(sender, instance, **kwargs):
 @receiver(pre_delete, sender=ScoreSet)
 def delete_permission_groups_for_scoreset(sender, instance, **kwargs):
     delete_all_groups_for_instance(instance)
+
+
+@receiver(pre_delete, sender=ScoreSet)
+def delete_snapshot_for_scoreset(sender, instance, **kwargs):
+    snapshots.delete_snapshot(instance)
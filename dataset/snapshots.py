@@ -0,0 +1,200 @@
+"""
+Columnar snapshots of the variant data of each score set. The scores and
+counts of a score set are written as Parquet files holding the urn number and
+hgvs columns of each variant followed by the uploaded data columns, so that
+downloads, previews and analyses read whole columns instead of decoding the
+JSON data of every variant row.
+
+Snapshots are rebuilt when the variants of a score set are created and when
+they are renumbered on publish. Each file records the urn and last child
+value of the score set it was written for, and readers fall back to the
+variant table when a snapshot is missing or stale.
+"""
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.conf import settings
+
+from dataset import constants
+
+logger = logging.getLogger("django")
+
+SCORES = "scores"
+COUNTS = "counts"
+
+NUMBER_COLUMN = "urn_number"
+METADATA_KEY = b"mavedb"
+# Subdirectory of a snapshot holding files derived from the variants, such
+# as cached downloads. Removed whenever the snapshot is rewritten.
+DOWNLOADS_DIR = "downloads"
+
+files = {SCORES: "scores.parquet", COUNTS: "counts.parquet"}
+data_keys = {
+    SCORES: constants.variant_score_data,
+    COUNTS: constants.variant_count_data,
+}
+hgvs_fields = (
+    constants.hgvs_nt_column,
+    constants.hgvs_splice_column,
+    constants.hgvs_pro_column,
+)
+
+
+def snapshot_path(scoreset) -> str:
+    """
+    Returns the directory holding the snapshot of `scoreset`.
+    """
+    return os.path.join(settings.VARIANT_SNAPSHOT_DIR, str(scoreset.pk))
+
+
+def snapshot_columns(scoreset, dtype: str) -> List[str]:
+    """
+    Returns the columns of the `dtype` snapshot of `scoreset`: the urn number
+    followed by `scoreset.score_columns` or `scoreset.count_columns`.
+    """
+    if dtype == SCORES:
+        return [NUMBER_COLUMN] + scoreset.score_columns
+    elif dtype == COUNTS:
+        return [NUMBER_COLUMN] + scoreset.count_columns
+    raise ValueError(
+        f"'{dtype}' is an unknown data type. Use either 'scores' or 'counts'"
+    )
+
+
+def write_snapshot(scoreset) -> str:
+    """
+    Writes the scores and counts snapshots of `scoreset` from its variants,
+    replacing any previous snapshot.
+
+    Returns
+    -------
+    `str`
+        Directory holding the snapshot.
+    """
+    path = snapshot_path(scoreset)
+    os.makedirs(path, exist_ok=True)
+    shutil.rmtree(os.path.join(path, DOWNLOADS_DIR), ignore_errors=True)
+    tables = build_tables(scoreset)
+    for (dtype, table) in tables.items():
+        # Write next to the destination and move the file into place so that
+        # readers never see a partially written file.
+        handle, partial = tempfile.mkstemp(dir=path, suffix=".partial")
+        os.close(handle)
+        try:
+            pq.write_table(table, partial)
+            os.replace(partial, os.path.join(path, files[dtype]))
+        except Exception:
+            os.remove(partial)
+            raise
+    logger.info(
+        "Wrote snapshot of {} variants for {}".format(
+            tables[SCORES].num_rows, scoreset.urn
+        )
+    )
+    return path
+
+
+def build_tables(scoreset) -> Dict[str, pa.Table]:
+    """
+    Builds the scores and counts snapshot tables of `scoreset` from its
+    variants, ordered by urn number.
+    """
+    columns = {dtype: snapshot_columns(scoreset, dtype) for dtype in files}
+    values = {
+        dtype: {name: [] for name in names}
+        for (dtype, names) in columns.items()
+    }
+    variants = (
+        scoreset.variants.order_by("number", "id")
+        .values_list("number", *hgvs_fields, "data")
+        .iterator()
+    )
+    for (number, *hgvs, data) in variants:
+        for (dtype, dtype_values) in values.items():
+            dtype_values[NUMBER_COLUMN].append(number)
+            for (field, value) in zip(hgvs_fields, hgvs):
+                dtype_values[field].append(value)
+            row = data.get(data_keys[dtype], {})
+            for name in columns[dtype][len(hgvs_fields) + 1 :]:
+                dtype_values[name].append(row.get(name, None))
+
+    metadata = {
+        "urn": scoreset.urn,
+        "last_child_value": scoreset.last_child_value,
+    }
+    tables = {}
+    for (dtype, dtype_values) in values.items():
+        arrays = [_array(dtype_values[name]) for name in columns[dtype]]
+        table = pa.Table.from_arrays(arrays, names=columns[dtype])
+        tables[dtype] = table.replace_schema_metadata(
+            {METADATA_KEY: json.dumps(metadata)}
+        )
+    return tables
+
+
+def read_snapshot(scoreset, dtype: str) -> Optional[pa.Table]:
+    """
+    Reads the `dtype` snapshot of `scoreset`. Returns `None` if there is no
+    snapshot or if it was written before the variants of `scoreset` last
+    changed.
+    """
+    columns = snapshot_columns(scoreset, dtype)
+    path = os.path.join(snapshot_path(scoreset), files[dtype])
+    if not os.path.exists(path):
+        return None
+
+    try:
+        table = pq.read_table(path, memory_map=True)
+    except (OSError, pa.ArrowException):
+        logger.exception("Could not read snapshot {}".format(path))
+        return None
+
+    schema_metadata = table.schema.metadata or {}
+    metadata = json.loads(schema_metadata.get(METADATA_KEY, "{}"))
+    current = (
+        metadata.get("urn", None) == scoreset.urn
+        and metadata.get("last_child_value", None)
+        == scoreset.last_child_value
+        and table.schema.names == columns
+    )
+    if not current:
+        return None
+    return table
+
+
+def read_frame(scoreset, dtype: str) -> pd.DataFrame:
+    """
+    Returns the `dtype` data of `scoreset` as a `pd.DataFrame` with one row
+    per variant, ordered by urn number. Built from the variant table if the
+    snapshot is missing or stale.
+    """
+    table = read_snapshot(scoreset, dtype)
+    if table is None:
+        table = build_tables(scoreset)[dtype]
+    return table.to_pandas()
+
+
+def delete_snapshot(scoreset) -> bool:
+    """
+    Deletes the snapshot of `scoreset`. Returns `False` if there was none.
+    """
+    path = snapshot_path(scoreset)
+    if not os.path.isdir(path):
+        return False
+    shutil.rmtree(path)
+    return True
+
+
+def _array(values: list) -> pa.Array:
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Columns mixing numbers and text are stored as text.
+        return pa.array([None if v is None else str(v) for v in values])
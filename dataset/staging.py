@@ -0,0 +1,135 @@
+"""
+Staging store for validated variant data waiting to be loaded by the
+`create_variants` task. Data frames are written as Parquet files to a
+directory shared by the web and worker processes so that tasks only carry a
+short reference through the broker. Staged data is kept until it has been
+loaded successfully so that failed tasks can be retried.
+"""
+import os
+import re
+import shutil
+import uuid
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+from django.conf import settings
+
+SCORES_FILE = "scores.parquet"
+COUNTS_FILE = "counts.parquet"
+
+reference_re = re.compile(r"[0-9a-f]{32}")
+
+
+class StagedVariantsNotFound(FileNotFoundError):
+    pass
+
+
+def staging_path(reference: str) -> str:
+    """
+    Returns the directory holding the data staged under `reference`.
+    """
+    if not isinstance(reference, str) or not reference_re.fullmatch(
+        reference
+    ):
+        raise ValueError(f"'{reference}' is not a staging reference.")
+    return os.path.join(settings.VARIANT_STAGING_DIR, reference)
+
+
+def stage_variants(
+    scores: pd.DataFrame, counts: Optional[pd.DataFrame] = None
+) -> str:
+    """
+    Writes scores, and counts if not empty, to the staging directory.
+
+    Parameters
+    ----------
+    scores : `pd.DataFrame`
+        Validated scores data.
+    counts : `pd.DataFrame`, optional.
+        Validated counts data.
+
+    Returns
+    -------
+    `str`
+        Reference to pass to `load_staged_variants`.
+    """
+    reference = uuid.uuid4().hex
+    path = staging_path(reference)
+    # Write to a temporary directory first so that a reference never points
+    # at partially written data.
+    partial = f"{path}.partial"
+    os.makedirs(partial)
+    try:
+        _write(scores, os.path.join(partial, SCORES_FILE))
+        if counts is not None and len(counts):
+            _write(counts, os.path.join(partial, COUNTS_FILE))
+        os.rename(partial, path)
+    except Exception:
+        shutil.rmtree(partial, ignore_errors=True)
+        raise
+    return reference
+
+
+def load_staged_variants(reference: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Reads the scores and counts staged under `reference`. Counts are an
+    empty `pd.DataFrame` if none were staged.
+
+    Raises
+    ------
+    `StagedVariantsNotFound`
+        Nothing is staged under `reference`.
+    """
+    path = staging_path(reference)
+    if not os.path.isdir(path):
+        raise StagedVariantsNotFound(
+            f"No variants are staged under '{reference}'."
+        )
+
+    scores = _read(os.path.join(path, SCORES_FILE))
+    counts = pd.DataFrame()
+    if os.path.exists(os.path.join(path, COUNTS_FILE)):
+        counts = _read(os.path.join(path, COUNTS_FILE))
+    return scores, counts
+
+
+def delete_staged_variants(reference: str) -> bool:
+    """
+    Deletes the data staged under `reference`. Returns `False` if nothing
+    was staged.
+    """
+    path = staging_path(reference)
+    if not os.path.isdir(path):
+        return False
+    shutil.rmtree(path)
+    return True
+
+
+def _write(df: pd.DataFrame, path: str):
+    try:
+        df.to_parquet(path, engine="pyarrow", index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        df.assign(**_text_columns(df)).to_parquet(
+            path, engine="pyarrow", index=False
+        )
+
+
+def _text_columns(df: pd.DataFrame) -> Dict[str, pd.Series]:
+    # Columns mixing numbers and text are staged as text.
+    columns = {}
+    for column in df.columns:
+        values = df[column]
+        if values.dtype != object:
+            continue
+        try:
+            pa.array(values, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            columns[column] = values.astype(str).where(
+                pd.notnull(values), None
+            )
+    return columns
+
+
+def _read(path: str) -> pd.DataFrame:
+    return pd.read_parquet(path, engine="pyarrow")
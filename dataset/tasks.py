@@ -1,3 +1,6 @@
+import time
+
+from django.conf import settings
 from django.db import transaction
 from django.contrib.auth import get_user_model
 
@@ -7,14 +10,18 @@ from core.tasks import BaseTask
 
 from mavedb import celery_app
 
-from variant.models import Variant
-from variant.utilities import convert_df_to_variant_records
+from variant.models import StagedVariant, Variant
+from variant.validators import validate_all_columns_match
+from variant.utilities import (
+    convert_df_to_variant_records,
+    iter_variant_records,
+)
 
 from dataset import constants
 from dataset.utilities import delete_instance as delete_instance_util
 from dataset.utilities import get_model_by_urn
 
-from . import models
+from . import models, snapshots, staging
 from .utilities import publish_dataset
 
 User = get_user_model()
@@ -81,6 +88,13 @@ class BaseCreateVariantsTask(BaseDatasetTask):
     def run(self, *args, **kwargs):
         return create_variants(*args, **kwargs)
 
+    def on_success(self, retval, task_id, args, kwargs):
+        # Staged data is kept after failures so that the task can be retried.
+        reference = kwargs.get("staged_variants", None)
+        if reference is not None:
+            staging.delete_staged_variants(reference)
+        return super().on_success(retval, task_id, args, kwargs)
+
 
 class BasePublishTask(BaseDatasetTask):
     description = "publish the entry {urn}"
@@ -165,6 +179,10 @@ def publish_scoreset(self, user_pk, scoreset_urn):
     with transaction.atomic():
         self.scoreset = publish_dataset(dataset=self.instance, user=self.user)
         self.urn = self.instance.urn
+
+    # Publishing renumbers the variant urns.
+    self.instance.refresh_from_db()
+    write_snapshot(self.instance)
     return self.instance
 
 
@@ -205,22 +223,28 @@ def delete_instance(self, user_pk, urn):
     if (not self.instance.private) or self.instance.has_public_urn:
         raise ValueError(f"{self.urn} is not private and cannot be deleted.")
 
+    start = time.perf_counter()
     with transaction.atomic():
-        return delete_instance_util(self.instance)
+        total, deleted = delete_instance_util(self.instance)
+    logger.info(
+        "Deleted {} rows for {} in {:.2f}s: {}".format(
+            total,
+            self.urn,
+            time.perf_counter() - start,
+            ", ".join(
+                "{} {}".format(n, label) for (label, n) in deleted.items()
+            ),
+        )
+    )
+    return total, deleted
 
 
-@celery_app.task(
-    bind=True,
-    ignore_result=True,
-    base=BaseCreateVariantsTask,
-    serializer="pickle",
-)
+@celery_app.task(bind=True, ignore_result=True, base=BaseCreateVariantsTask)
 def create_variants(
     self,
     user_pk,
     scoreset_urn,
-    scores_records,
-    counts_records,
+    staged_variants,
     index,
     dataset_columns,
 ):
@@ -236,10 +260,9 @@ def create_variants(
         Primary key (id) of the submitting user.
     scoreset_urn : str
         The urn of the instance to associate variants to.
-    scores_records : str
-        JSON formatted dataframe (NaN replaced with None).
-    counts_records :
-        JSON formatted dataframe (NaN replaced with None).
+    staged_variants : str
+        Reference returned by `staging.stage_variants` for the validated
+        scores and counts data.
     index : str
         HGVS column to use as the index when matching up variant data between
         scores and counts.
@@ -260,29 +283,185 @@ def create_variants(
     self.user = User.objects.get(pk=user_pk)
     self.instance = models.scoreset.ScoreSet.objects.get(urn=scoreset_urn)
 
+    scores_records, counts_records = staging.load_staged_variants(
+        staged_variants
+    )
     logger.info(
-        "Sending scores dataframe with {} rows.".format(len(scores_records))
+        "Loaded scores dataframe with {} rows.".format(len(scores_records))
     )
     logger.info(
-        "Sending counts dataframe with {} rows.".format(len(counts_records))
+        "Loaded counts dataframe with {} rows.".format(len(counts_records))
     )
-    logger.info("Formatting variants for {}".format(self.urn))
-    variants = convert_df_to_variant_records(
-        scores_records, counts_records, index
+    total = len(scores_records)
+    set_variants_progress(self.instance, done=0, total=total)
+
+    # Re-uploads with the same columns only write the variants that changed.
+    diff = (
+        bool(index)
+        and dataset_columns == self.instance.dataset_columns
+        and self.instance.variants.exists()
     )
 
-    if variants:
-        logger.info("{}:{}".format(self.urn, variants[-1]))
+    if total > settings.VARIANT_CHUNK_SIZE and not diff:
+        # Staged chunks are validated against the uploaded columns.
+        self.instance.dataset_columns = dataset_columns
+        stage_variant_chunks(
+            self.instance,
+            staged_variants,
+            scores_records,
+            counts_records,
+            index,
+            chunk_size=settings.VARIANT_CHUNK_SIZE,
+        )
+        with transaction.atomic():
+            delete_existing_variants(self.instance)
 
-    with transaction.atomic():
-        logger.info("Deleting existing variants for {}".format(self.urn))
-        self.instance.delete_variants()
+            logger.info("Creating variants for {}".format(self.urn))
+            Variant.create_from_staged(self.instance, staged_variants)
 
-        logger.info("Creating variants for {}".format(self.urn))
-        Variant.bulk_create(self.instance, variants)
+            logger.info("Saving {}".format(self.urn))
+            self.instance.dataset_columns = dataset_columns
+            self.instance.save()
+    else:
+        logger.info("Formatting variants for {}".format(self.urn))
+        variants = convert_df_to_variant_records(
+            scores_records, counts_records, index
+        )
 
-        logger.info("Saving {}".format(self.urn))
-        self.instance.dataset_columns = dataset_columns
-        self.instance.save()
+        if variants:
+            logger.info("{}:{}".format(self.urn, variants[-1]))
+
+        with transaction.atomic():
+            counts = None
+            if diff:
+                snapshots.delete_snapshot(self.instance)
+                counts = Variant.bulk_diff(self.instance, variants, index)
+
+            if counts is None:
+                delete_existing_variants(self.instance)
+
+                logger.info("Creating variants for {}".format(self.urn))
+                self.instance.dataset_columns = dataset_columns
+                Variant.bulk_create(self.instance, variants)
+            else:
+                logger.info(
+                    "Updated variants for {}: {}".format(
+                        self.urn,
+                        ", ".join(
+                            "{} {}".format(n, name)
+                            for (name, n) in counts.items()
+                        ),
+                    )
+                )
+
+            logger.info("Saving {}".format(self.urn))
+            self.instance.variants_done = total
+            self.instance.save()
 
+    write_snapshot(self.instance)
     return self.instance
+
+
+def write_snapshot(scoreset):
+    """
+    Writes the columnar snapshot of `scoreset`. The variants are already
+    committed, so a failure is logged and the snapshot removed instead of
+    failing the task. Readers fall back to the variant table without one.
+    """
+    try:
+        snapshots.write_snapshot(scoreset)
+    except Exception:
+        logger.exception(
+            "Could not write the snapshot for {}".format(scoreset.urn)
+        )
+        snapshots.delete_snapshot(scoreset)
+
+
+def delete_existing_variants(scoreset):
+    """
+    Deletes the variants of `scoreset`, logging the number deleted and the
+    time taken.
+    """
+    logger.info("Deleting existing variants for {}".format(scoreset.urn))
+    start = time.perf_counter()
+    deleted = scoreset.delete_variants()
+    logger.info(
+        "Deleted {} variants for {} in {:.2f}s".format(
+            deleted, scoreset.urn, time.perf_counter() - start
+        )
+    )
+    return deleted
+
+
+def set_variants_progress(scoreset, done, total=None):
+    """
+    Records the number of variants loaded out of the total on `scoreset`
+    without saving any of its other fields.
+    """
+    fields = {"variants_done": done}
+    if total is not None:
+        fields["variants_total"] = total
+    models.scoreset.ScoreSet.objects.filter(pk=scoreset.pk).update(**fields)
+    for (name, value) in fields.items():
+        setattr(scoreset, name, value)
+
+
+def stage_variant_chunks(
+    scoreset, reference, scores, counts, index, chunk_size
+):
+    """
+    Writes the variant records of the staged upload `reference` to
+    `variant.models.StagedVariant` rows, committing each chunk of
+    `chunk_size` rows in its own transaction and recording progress on
+    `scoreset`. Chunks committed by an earlier attempt for the same upload
+    are skipped, so a retried task resumes from the last committed chunk.
+    Each chunk is validated against the dataset columns of `scoreset` with
+    `validate_all_columns_match` before it is written.
+
+    Returns
+    -------
+    int
+        Number of staged rows.
+    """
+    staged = StagedVariant.objects.filter(scoreset=scoreset)
+    # Rows left behind by an earlier upload can't be resumed.
+    staged.exclude(reference=reference).delete()
+    # Chunks are committed whole and in order, so the committed rows are
+    # always numbered 1 to `done`.
+    done = staged.filter(reference=reference).count()
+    if done:
+        logger.info(
+            "Resuming {} after {} staged variants".format(scoreset.urn, done)
+        )
+    set_variants_progress(scoreset, done=done)
+
+    start = 0
+    for records in iter_variant_records(
+        scores, counts, index, batch_size=chunk_size
+    ):
+        end = start + len(records)
+        if end > done:
+            offset = max(done - start, 0)
+            validate_all_columns_match(
+                (record["data"] for record in records[offset:]), scoreset
+            )
+            with transaction.atomic():
+                StagedVariant.objects.bulk_create(
+                    StagedVariant(
+                        scoreset=scoreset,
+                        reference=reference,
+                        number=number,
+                        **record,
+                    )
+                    for (number, record) in enumerate(
+                        records[offset:], start=start + offset + 1
+                    )
+                )
+                set_variants_progress(scoreset, done=end)
+            logger.info(
+                "Staged {} of {} variants for {}".format(
+                    end, scoreset.variants_total, scoreset.urn
+                )
+            )
+        start = end
+    return start
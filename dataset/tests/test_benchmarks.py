@@ -0,0 +1,84 @@
+from io import StringIO
+
+from django.test import TestCase
+
+from variant.validators import MaveDataset
+
+from .. import constants
+from ..benchmarks import LAYOUTS, benchmark, synthetic_dataset
+
+
+class TestSyntheticDataset(TestCase):
+    def test_generates_valid_datasets_for_each_layout(self):
+        for layout in LAYOUTS:
+            with self.subTest(msg=layout):
+                targetseq, scores_csv, counts_csv = synthetic_dataset(
+                    200, layout=layout, with_counts=True
+                )
+                scores = MaveDataset.for_scores(StringIO(scores_csv))
+                scores.validate(targetseq=targetseq, relaxed_ordering=True)
+                counts = MaveDataset.for_counts(StringIO(counts_csv))
+                counts.validate(targetseq=targetseq, relaxed_ordering=True)
+
+                self.assertTrue(scores.is_valid, scores.errors)
+                self.assertEqual(scores.n_rows, 200)
+                self.assertTrue(scores.match_other(counts))
+
+    def test_defines_columns_for_layout(self):
+        _, scores_csv, counts_csv = synthetic_dataset(10, layout="pro")
+        header = scores_csv.splitlines()[0].split(",")
+
+        self.assertIsNone(counts_csv)
+        self.assertIn(constants.hgvs_pro_column, header)
+        self.assertNotIn(constants.hgvs_nt_column, header)
+
+    def test_same_seed_generates_same_dataset(self):
+        self.assertEqual(
+            synthetic_dataset(50, seed=1), synthetic_dataset(50, seed=1)
+        )
+
+    def test_error_unknown_layout(self):
+        with self.assertRaises(ValueError):
+            synthetic_dataset(10, layout="splice")
+
+
+class TestBenchmark(TestCase):
+    def test_reports_each_stage(self):
+        results = benchmark(50, layout="nt", with_counts=True)
+
+        self.assertListEqual(
+            [r.stage for r in results],
+            [
+                "read scores",
+                "validate scores",
+                "read counts",
+                "validate counts",
+                "variant records",
+                "form",
+            ],
+        )
+        for result in results:
+            self.assertEqual(result.n_rows, 50)
+            self.assertGreater(result.rows_per_second, 0)
+            self.assertGreater(result.peak_bytes, 0)
+
+    def test_skips_form_and_memory(self):
+        results = benchmark(
+            50, layout="pro", include_form=False, trace_memory=False
+        )
+
+        self.assertNotIn("form", [r.stage for r in results])
+        self.assertTrue(all(r.peak_bytes is None for r in results))
+
+    def test_times_loading_variants(self):
+        results = benchmark(
+            50,
+            layout="nt",
+            include_form=False,
+            trace_memory=False,
+            include_load=True,
+        )
+        stages = [r.stage for r in results]
+
+        self.assertIn("load (orm)", stages)
+        self.assertIn("load (copy)", stages)
@@ -0,0 +1,108 @@
+import gzip
+import os
+
+from django.test import TestCase
+
+from core.utilities.tests import TemporaryDirectoryMixin
+
+from .. import downloads, snapshots
+from ..factories import ScoreSetFactory
+
+
+class TestDownloads(TemporaryDirectoryMixin, TestCase):
+    temporary_directory_settings = ["VARIANT_SNAPSHOT_DIR"]
+
+    def setUp(self):
+        super().setUp()
+
+        self.scoreset = ScoreSetFactory(private=False)
+
+    def write(self, content, dtype="scores", fmt="csv"):
+        with downloads.write_download(
+            self.scoreset, dtype, content, fmt=fmt
+        ) as f:
+            return downloads.download_etag(f)
+
+    def test_open_returns_none_without_download(self):
+        self.assertIsNone(downloads.open_download(self.scoreset, "scores"))
+
+    def test_opens_written_download(self):
+        etag = self.write(["a,b\n", b"1,2\n"])
+        with downloads.open_download(self.scoreset, "scores") as f:
+            self.assertEqual(f.read(), b"a,b\n1,2\n")
+            self.assertEqual(downloads.download_etag(f), etag)
+        self.assertIsNone(downloads.open_download(self.scoreset, "counts"))
+
+    def test_etag_changes_with_content(self):
+        self.assertNotEqual(self.write(["a\n"]), self.write(["b\n"]))
+        # The previous download and its compressed copies are removed.
+        self.assertEqual(
+            len(os.listdir(downloads.downloads_path(self.scoreset))),
+            1 + len(downloads.ENCODINGS),
+        )
+
+    def test_metadata_changes_invalidate_download(self):
+        self.write(["a\n"])
+        self.scoreset.data_usage_policy = "Use freely."
+        self.assertIsNone(downloads.open_download(self.scoreset, "scores"))
+
+    def test_writing_snapshot_removes_downloads(self):
+        self.write(["a\n"])
+        snapshots.write_snapshot(self.scoreset)
+        self.assertIsNone(downloads.open_download(self.scoreset, "scores"))
+
+    def test_writes_compressed_copies(self):
+        etag = self.write(["a,b\n", "1,2\n"])
+        for encoding in downloads.ENCODINGS:
+            with downloads.open_download(
+                self.scoreset, "scores", encoding
+            ) as f:
+                self.assertEqual(
+                    downloads.download_etag(f),
+                    '{}-{}"'.format(etag[:-1], encoding),
+                )
+                if encoding == "gzip":
+                    self.assertEqual(gzip.decompress(f.read()), b"a,b\n1,2\n")
+
+    def test_keeps_formats_apart(self):
+        self.write(["a\n"])
+        self.write([b"PAR1"], fmt="parquet")
+        with downloads.open_download(self.scoreset, "scores") as f:
+            self.assertEqual(f.read(), b"a\n")
+        with downloads.open_download(
+            self.scoreset, "scores", fmt="parquet"
+        ) as f:
+            self.assertEqual(f.read(), b"PAR1")
+        self.assertIsNone(
+            downloads.open_download(self.scoreset, "scores", fmt="arrow")
+        )
+
+    def test_does_not_compress_parquet_and_arrow(self):
+        self.write([b"PAR1"], fmt="parquet")
+        names = os.listdir(downloads.downloads_path(self.scoreset, "parquet"))
+        self.assertEqual(len(names), 1)
+        self.assertTrue(names[0].endswith(".parquet"))
+
+    def test_saving_score_set_invalidates_download(self):
+        self.write(["a\n"])
+        self.scoreset.save()
+        self.assertIsNone(downloads.open_download(self.scoreset, "scores"))
+
+    def test_streams_download_while_writing_it(self):
+        stream = downloads.stream_download(
+            self.scoreset, "scores", ["a,b\n", "1,2\n"], "gzip"
+        )
+        self.assertEqual(gzip.decompress(b"".join(stream)), b"a,b\n1,2\n")
+        with downloads.open_download(self.scoreset, "scores") as f:
+            self.assertEqual(f.read(), b"a,b\n1,2\n")
+
+    def test_stream_closed_before_the_end_is_not_kept(self):
+        stream = downloads.stream_download(
+            self.scoreset, "scores", ["a,b\n", "1,2\n"]
+        )
+        next(stream)
+        stream.close()
+        self.assertIsNone(downloads.open_download(self.scoreset, "scores"))
+        self.assertEqual(
+            os.listdir(downloads.downloads_path(self.scoreset)), []
+        )
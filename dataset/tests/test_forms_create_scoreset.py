@@ -1,9 +1,10 @@
 import pandas as pd
-from django.test import TestCase, RequestFactory
+from django.test import TestCase, RequestFactory, mock, override_settings
 
 from accounts.factories import UserFactory
 from main.models import Licence
 from variant.factories import generate_hgvs, VariantFactory
+from variant.validators import MaveDataset
 from .utility import make_files
 from .. import constants
 from ..factories import ExperimentFactory, ScoreSetFactory
@@ -564,6 +565,86 @@ class TestScoreSetForm(TestCase):
 
         self.assertEqual(index, constants.hgvs_nt_column)
 
+    def test_counts_file_reuses_variants_parsed_from_scores_file(self):
+        data, files = self.make_post_data(count_data=True)
+        form = ScoreSetForm(data=data, files=files, user=self.user)
+        self.assertTrue(form.is_valid())
+
+        info = form.hgvs_cache.info()
+        self.assertEqual(info.misses, 2)
+        self.assertEqual(info.hits, 2)
+
+    @override_settings(VALIDATION_MAX_ERRORS=2)
+    def test_notes_when_score_data_errors_were_truncated(self):
+        score_data = "{},{}\n".format(
+            constants.hgvs_nt_column, constants.required_score_column
+        ) + "\n".join(f"c.{i}X>G,1.0" for i in range(1, 6))
+        data, files = self.make_post_data(score_data=score_data)
+        form = ScoreSetForm(data=data, files=files, user=self.user)
+
+        self.assertFalse(form.is_valid())
+        self.assertTrue(form.scores_dataset.errors_truncated)
+        self.assertIn(
+            ScoreSetForm.truncated_errors_message(form.scores_dataset),
+            form.errors[constants.variant_score_data],
+        )
+
+    @override_settings(
+        CACHES={
+            "validation": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "test-identical-upload",
+            }
+        }
+    )
+    def test_identical_upload_is_not_validated_again(self):
+        score_data = "{},{}\n{},0.5\n".format(
+            constants.hgvs_nt_column,
+            constants.required_score_column,
+            generate_hgvs(prefix="c"),
+        )
+        data, files = self.make_post_data(score_data=score_data)
+        form = ScoreSetForm(data=data, files=files, user=self.user)
+        self.assertTrue(form.is_valid())
+
+        _, files = self.make_post_data(score_data=score_data, make_exp=False)
+        form = ScoreSetForm(data=data, files=files, user=self.user)
+        with mock.patch.object(MaveDataset, "for_scores") as for_scores:
+            self.assertTrue(form.is_valid())
+        for_scores.assert_not_called()
+        self.assertTrue(form.has_variants())
+
+    def test_has_variants_is_false_when_uploaded_files_are_unchanged(self):
+        score_data = "{},{}\n{},0.5\n".format(
+            constants.hgvs_nt_column,
+            constants.required_score_column,
+            generate_hgvs(prefix="c"),
+        )
+        instance = ScoreSetFactory()
+        VariantFactory(scoreset=instance)
+        instance.processing_state = constants.success
+        instance.save()
+        instance.add_administrators(self.user)
+        instance.experiment.add_administrators(self.user)
+
+        data, files = self.make_post_data(score_data=score_data)
+        data["experiment"] = instance.experiment.pk
+        form = ScoreSetForm(
+            data=data, files=files, user=self.user, instance=instance
+        )
+        self.assertTrue(form.is_valid())
+        self.assertTrue(form.has_variants())
+        form.save(commit=True)
+        instance.refresh_from_db()
+        self.assertEqual(instance.variants_hash, form.variants_hash)
+
+        _, files = self.make_post_data(score_data=score_data, make_exp=False)
+        form = ScoreSetForm(
+            data=data, files=files, user=self.user, instance=instance
+        )
+        self.assertTrue(form.is_valid())
+        self.assertFalse(form.has_variants())
+
     def test_new_scores_resets_dataset_columns(self):
         scs = ScoreSetFactory()
         for i in range(5):
@@ -114,6 +114,15 @@ class TestScoreSet(TestCase):
         self.assertEqual(scs.variants.count(), 0)
         self.assertEqual(scs.last_child_value, 0)
 
+    def test_delete_variants_returns_number_deleted(self):
+        scs = ScoreSetFactory()
+        for _ in range(3):
+            VariantFactory(scoreset=scs)
+        other = VariantFactory()
+
+        self.assertEqual(scs.delete_variants(), 3)
+        self.assertEqual(other.scoreset.variants.count(), 1)
+
     def test_can_traverse_public_replaced_by_tree(self):
         scs_1 = ScoreSetFactory(private=False)
         scs_2 = ScoreSetFactory(
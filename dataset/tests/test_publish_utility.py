@@ -116,6 +116,15 @@ class TestPublishDataset(TestCase):
         v2.refresh_from_db()
         self.assertNotEqual(v1.urn[-1], v2.urn[-1])
 
+    def test_publish_numbers_variants_in_creation_order(self):
+        obj = ScoreSetFactory()
+        variants = [VariantFactory(scoreset=obj) for _ in range(3)]
+        obj = publish_dataset(obj)
+        for (i, variant) in enumerate(variants, start=1):
+            variant.refresh_from_db()
+            self.assertEqual(variant.urn, "{}#{}".format(obj.urn, i))
+        self.assertEqual(obj.last_child_value, 3)
+
     def test_typeerror_not_a_dataset(self):
         with self.assertRaises(TypeError):
             publish_dataset(VariantFactory())
@@ -0,0 +1,100 @@
+import os
+
+from django.test import TestCase
+
+from core.utilities.tests import TemporaryDirectoryMixin
+
+from variant.models import Variant
+
+from .. import constants, snapshots
+from ..factories import ScoreSetFactory
+
+
+class TestSnapshots(TemporaryDirectoryMixin, TestCase):
+    temporary_directory_settings = ["VARIANT_SNAPSHOT_DIR"]
+
+    def setUp(self):
+        super().setUp()
+
+        self.scoreset = ScoreSetFactory(
+            dataset_columns={
+                constants.score_columns: ["score", "se"],
+                constants.count_columns: ["count"],
+            }
+        )
+        Variant.bulk_create(
+            self.scoreset,
+            [
+                {
+                    constants.hgvs_nt_column: "c.{}A>G".format(i + 1),
+                    "data": {
+                        constants.variant_score_data: {
+                            "score": i / 2,
+                            "se": None,
+                        },
+                        constants.variant_count_data: {"count": i},
+                    },
+                }
+                for i in range(3)
+            ],
+        )
+        self.scoreset.refresh_from_db()
+
+    def test_snapshot_holds_variants_in_urn_order(self):
+        snapshots.write_snapshot(self.scoreset)
+        table = snapshots.read_snapshot(self.scoreset, "scores")
+
+        self.assertListEqual(
+            table.schema.names,
+            [snapshots.NUMBER_COLUMN] + self.scoreset.score_columns,
+        )
+        self.assertListEqual(
+            table.column(snapshots.NUMBER_COLUMN).to_pylist(), [1, 2, 3]
+        )
+        self.assertListEqual(
+            table.column(constants.hgvs_nt_column).to_pylist(),
+            ["c.1A>G", "c.2A>G", "c.3A>G"],
+        )
+        self.assertListEqual(
+            table.column(constants.hgvs_pro_column).to_pylist(),
+            [None, None, None],
+        )
+        self.assertListEqual(
+            table.column("score").to_pylist(), [0.0, 0.5, 1.0]
+        )
+        self.assertListEqual(
+            table.column("se").to_pylist(), [None, None, None]
+        )
+
+        counts = snapshots.read_snapshot(self.scoreset, "counts")
+        self.assertListEqual(counts.column("count").to_pylist(), [0, 1, 2])
+
+    def test_read_returns_none_without_snapshot(self):
+        self.assertIsNone(snapshots.read_snapshot(self.scoreset, "scores"))
+
+    def test_read_returns_none_after_variants_change(self):
+        snapshots.write_snapshot(self.scoreset)
+        self.scoreset.last_child_value += 1
+        self.assertIsNone(snapshots.read_snapshot(self.scoreset, "scores"))
+
+    def test_read_returns_none_after_urn_changes(self):
+        snapshots.write_snapshot(self.scoreset)
+        self.scoreset.urn = "urn:mavedb:00000001-a-1"
+        self.assertIsNone(snapshots.read_snapshot(self.scoreset, "scores"))
+
+    def test_delete_variants_deletes_snapshot(self):
+        path = snapshots.write_snapshot(self.scoreset)
+        self.scoreset.delete_variants()
+        self.assertFalse(os.path.exists(path))
+
+    def test_read_frame_falls_back_to_variant_table(self):
+        df = snapshots.read_frame(self.scoreset, "counts")
+        self.assertListEqual(list(df["count"]), [0, 1, 2])
+        self.assertListEqual(list(df[snapshots.NUMBER_COLUMN]), [1, 2, 3])
+
+    def test_stores_columns_mixing_numbers_and_text_as_text(self):
+        variant = self.scoreset.variants.first()
+        variant.data[constants.variant_score_data]["se"] = "n/a"
+        variant.save()
+        table = snapshots.build_tables(self.scoreset)["scores"]
+        self.assertIn("n/a", table.column("se").to_pylist())
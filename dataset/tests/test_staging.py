@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pandas as pd
+from django.test import TestCase
+from pandas.testing import assert_frame_equal
+
+from core.utilities.tests import TemporaryDirectoryMixin
+
+from .. import constants, staging
+
+
+class TestStaging(TemporaryDirectoryMixin, TestCase):
+    temporary_directory_settings = ["VARIANT_STAGING_DIR"]
+
+    def setUp(self):
+        super().setUp()
+
+        self.scores = pd.DataFrame(
+            {
+                constants.hgvs_nt_column: ["c.1A>G", "c.2A>G"],
+                constants.hgvs_pro_column: [None, None],
+                constants.required_score_column: [1.5, np.NaN],
+            }
+        )
+        self.counts = pd.DataFrame(
+            {
+                constants.hgvs_nt_column: ["c.1A>G", "c.2A>G"],
+                constants.hgvs_pro_column: [None, None],
+                "count": [1, 2],
+            }
+        )
+
+    def test_loads_staged_scores_and_counts(self):
+        reference = staging.stage_variants(self.scores, self.counts)
+        scores, counts = staging.load_staged_variants(reference)
+
+        assert_frame_equal(scores, self.scores)
+        assert_frame_equal(counts, self.counts)
+
+    def test_stages_columns_mixing_numbers_and_text_as_text(self):
+        scores = self.scores.assign(other=pd.Series([1, "n/a"], dtype=object))
+        reference = staging.stage_variants(scores)
+        loaded, _ = staging.load_staged_variants(reference)
+        self.assertListEqual(list(loaded["other"]), ["1", "n/a"])
+        assert_frame_equal(loaded.drop(columns="other"), self.scores)
+
+    def test_counts_are_empty_when_not_staged(self):
+        reference = staging.stage_variants(self.scores, pd.DataFrame())
+        _, counts = staging.load_staged_variants(reference)
+        self.assertTrue(counts.empty)
+
+    def test_does_not_stage_index(self):
+        scores = self.scores.set_index(
+            self.scores[constants.hgvs_nt_column]
+        )
+        reference = staging.stage_variants(scores)
+        loaded, _ = staging.load_staged_variants(reference)
+        self.assertListEqual(list(loaded.columns), list(self.scores.columns))
+
+    def test_delete_removes_staged_data(self):
+        reference = staging.stage_variants(self.scores, self.counts)
+        self.assertTrue(staging.delete_staged_variants(reference))
+        self.assertFalse(os.path.exists(staging.staging_path(reference)))
+        self.assertFalse(staging.delete_staged_variants(reference))
+
+    def test_error_nothing_staged(self):
+        with self.assertRaises(staging.StagedVariantsNotFound):
+            staging.load_staged_variants("0" * 32)
+
+    def test_error_reference_is_not_a_staging_reference(self):
+        with self.assertRaises(ValueError):
+            staging.staging_path("../../etc")
@@ -1,16 +1,20 @@
+import os
+
 import pandas as pd
 import numpy as np
 
-from django.test import TestCase, mock
+from django.test import TestCase, mock, override_settings
 
 from accounts.factories import UserFactory
 from accounts.models import Profile
 
 from core.models import FailedTask
+from core.utilities.tests import TemporaryDirectoryMixin
 
 from variant.factories import generate_hgvs, VariantFactory
+from variant.models import StagedVariant, Variant
 
-from dataset import constants
+from dataset import constants, staging
 from dataset.models.scoreset import default_dataset, ScoreSet
 from dataset.factories import ScoreSetFactory
 from dataset.tasks import (
@@ -100,8 +104,15 @@ class TestBaseDatasetTask(TestCase):
         self.assertEqual(FailedTask.objects.count(), 1)
 
 
-class TestCreateVariantsTask(TestCase):
+class TestCreateVariantsTask(TemporaryDirectoryMixin, TestCase):
+    temporary_directory_settings = [
+        "VARIANT_STAGING_DIR",
+        "VARIANT_SNAPSHOT_DIR",
+    ]
+
     def setUp(self):
+        super().setUp()
+
         self.user = UserFactory()
         self.scoreset = ScoreSetFactory()
         self.hgvs_nt = generate_hgvs(prefix="p")
@@ -120,7 +131,7 @@ class TestCreateVariantsTask(TestCase):
                 constants.hgvs_nt_column: [self.hgvs_nt],
                 constants.hgvs_pro_column: [self.hgvs_pro],
                 constants.hgvs_splice_column: [self.hgvs_splice],
-                "counts": 10,
+                "count": 10,
             }
         )
         self.dataset_columns = {
@@ -134,8 +145,9 @@ class TestCreateVariantsTask(TestCase):
             user_pk=self.user.pk,
             scoreset_urn=self.scoreset.urn,
             dataset_columns=self.dataset_columns,
-            scores_records=self.df_scores.to_json(orient="records"),
-            counts_records=self.df_counts.to_json(orient="records"),
+            staged_variants=staging.stage_variants(
+                self.df_scores, self.df_counts
+            ),
             index=self.index,
         )
         mock_kwargs.update(**kwargs)
@@ -164,9 +176,138 @@ class TestCreateVariantsTask(TestCase):
         self.scoreset.refresh_from_db()
         self.assertEqual(self.scoreset.last_child_value, 1)
 
+    @mock.patch.object(Profile, "notify_user_submission_status")
+    def test_deletes_staged_variants_on_success(self, patch):
+        kwargs = self.mock_kwargs()
+        create_variants.apply(kwargs=kwargs)
+        self.assertEqual(self.scoreset.variants.count(), 1)
+        self.assertFalse(
+            os.path.exists(staging.staging_path(kwargs["staged_variants"]))
+        )
+
+    @mock.patch.object(Profile, "notify_user_submission_status")
+    def test_keeps_staged_variants_on_failure_for_retry(self, patch):
+        kwargs = self.mock_kwargs()
+        with mock.patch(
+            "dataset.tasks.Variant.bulk_create", side_effect=ValueError()
+        ):
+            create_variants.apply(kwargs=kwargs)
+        self.assertTrue(
+            os.path.exists(staging.staging_path(kwargs["staged_variants"]))
+        )
+
+        failed = FailedTask.objects.first()
+        self.assertIn(kwargs["staged_variants"], failed.kwargs)
+        failed.retry(inline=True)
+        self.assertEqual(self.scoreset.variants.count(), 1)
+
+    def use_variants(self, n):
+        hgvs = ["c.{}A>G".format(i + 1) for i in range(n)]
+        self.df_scores = pd.DataFrame(
+            {
+                constants.hgvs_nt_column: hgvs,
+                constants.hgvs_pro_column: None,
+                constants.hgvs_splice_column: None,
+                "score": np.arange(n, dtype=float),
+            }
+        )
+        self.df_counts = pd.DataFrame(
+            {
+                constants.hgvs_nt_column: hgvs,
+                constants.hgvs_pro_column: None,
+                constants.hgvs_splice_column: None,
+                "count": np.arange(n),
+            }
+        )
+
+    def test_reupload_keeps_urns_of_matched_variants(self):
+        self.use_variants(3)
+        create_variants.run(**self.mock_kwargs())
+        urns = dict(self.scoreset.variants.values_list("hgvs_nt", "urn"))
+
+        self.df_scores.loc[1, "score"] = 10.0
+        self.df_scores = self.df_scores.drop(index=0)
+        self.df_counts = self.df_counts.drop(index=0)
+        with mock.patch.object(Variant, "bulk_create") as patch:
+            create_variants.run(**self.mock_kwargs())
+        patch.assert_not_called()
+
+        self.assertEqual(self.scoreset.variants.count(), 2)
+        for variant in self.scoreset.variants.all():
+            self.assertEqual(variant.urn, urns[variant.hgvs_nt])
+        self.assertEqual(
+            self.scoreset.variants.get(hgvs_nt="c.2A>G").data["score_data"],
+            {"score": 10.0},
+        )
+
+    @override_settings(VARIANT_CHUNK_SIZE=2)
+    def test_loads_large_uploads_in_chunks(self):
+        self.use_variants(5)
+        with mock.patch.object(
+            StagedVariant.objects,
+            "bulk_create",
+            wraps=StagedVariant.objects.bulk_create,
+        ) as patch:
+            create_variants.run(**self.mock_kwargs())
+        self.assertEqual(patch.call_count, 3)
+
+        self.scoreset.refresh_from_db()
+        self.assertEqual(self.scoreset.staged_variants.count(), 0)
+        self.assertEqual(self.scoreset.variants.count(), 5)
+        self.assertEqual(self.scoreset.last_child_value, 5)
+        self.assertEqual(self.scoreset.dataset_columns, self.dataset_columns)
+        for i in range(5):
+            variant = self.scoreset.variants.get(
+                urn="{}#{}".format(self.scoreset.urn, i + 1)
+            )
+            self.assertEqual(variant.hgvs_nt, "c.{}A>G".format(i + 1))
+            self.assertEqual(variant.data["score_data"]["score"], i)
+
+    @override_settings(VARIANT_CHUNK_SIZE=2)
+    def test_records_variants_loaded_out_of_total(self):
+        self.use_variants(5)
+        create_variants.run(**self.mock_kwargs())
+        self.scoreset.refresh_from_db()
+        self.assertEqual(self.scoreset.variants_done, 5)
+        self.assertEqual(self.scoreset.variants_total, 5)
+
+    @override_settings(VARIANT_CHUNK_SIZE=2)
+    @mock.patch.object(Profile, "notify_user_submission_status")
+    def test_retry_resumes_from_last_committed_chunk(self, patch):
+        self.use_variants(5)
+        kwargs = self.mock_kwargs()
+        bulk_create = StagedVariant.objects.bulk_create
+        chunks = []
+
+        def fail_second_chunk(objs, *args, **kwargs):
+            chunks.append(objs)
+            if len(chunks) == 2:
+                raise ValueError()
+            return bulk_create(objs, *args, **kwargs)
+
+        with mock.patch.object(
+            StagedVariant.objects, "bulk_create", side_effect=fail_second_chunk
+        ):
+            create_variants.apply(kwargs=kwargs)
+        self.scoreset.refresh_from_db()
+        self.assertEqual(self.scoreset.variants_done, 2)
+        self.assertEqual(self.scoreset.staged_variants.count(), 2)
+
+        with mock.patch.object(
+            StagedVariant.objects, "bulk_create", wraps=bulk_create
+        ) as resumed:
+            FailedTask.objects.first().retry(inline=True)
+        self.assertEqual(resumed.call_count, 2)
+        self.assertEqual(self.scoreset.variants.count(), 5)
+        self.assertEqual(self.scoreset.staged_variants.count(), 0)
+
+
+class TestPublishScoresetTask(TemporaryDirectoryMixin, TestCase):
+    temporary_directory_settings = ["VARIANT_SNAPSHOT_DIR"]
 
-class TestPublishScoresetTask(TestCase):
     def setUp(self):
+        super().setUp()
+
         self.user = UserFactory()
         self.scoreset = ScoreSetFactory()
         self.scoreset.save()
@@ -251,6 +392,18 @@ class TestDeleteInstance(TestCase):
         patch.assert_called()
         self.assertIsNone(delete_instance.instance)
 
+    @mock.patch.object(Profile, "notify_user_submission_status")
+    def test_logs_deleted_row_counts(self, patch):
+        for _ in range(3):
+            VariantFactory(scoreset=self.scoreset)
+        with mock.patch("dataset.tasks.logger") as logger:
+            delete_instance.apply(
+                kwargs=dict(urn=self.scoreset.urn, user_pk=self.user.pk)
+            )
+        message = logger.info.call_args[0][0]
+        self.assertIn(self.scoreset.urn, message)
+        self.assertIn("3 variant.Variant", message)
+
     @mock.patch.object(Profile, "notify_user_submission_status")
     def test_fails_if_deleting_public(self, patch):
         self.scoreset.private = False
@@ -1,4 +1,6 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from metadata import models as meta_models
 
@@ -106,6 +108,27 @@ class TestDeleteScoreSet(TestCase):
         self.assertEqual(models.scoreset.ScoreSet.objects.count(), 0)
         self.assertEqual(Variant.objects.count(), 0)
 
+    def test_deletes_variants_with_a_single_statement(self):
+        scs = ScoreSetWithTargetFactory()
+        other = ScoreSetWithTargetFactory()
+        for _ in range(3):
+            VariantFactory(scoreset=scs)
+        VariantFactory(scoreset=other)
+
+        with CaptureQueriesContext(connection) as context:
+            total, deleted = delete_scoreset(scs)
+        table = Variant._meta.db_table
+        statements = [
+            q["sql"]
+            for q in context.captured_queries
+            if q["sql"].startswith("DELETE") and table in q["sql"]
+        ]
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(deleted[Variant._meta.label], 3)
+        self.assertEqual(deleted[models.scoreset.ScoreSet._meta.label], 1)
+        self.assertEqual(total, sum(deleted.values()))
+        self.assertEqual(Variant.objects.count(), 1)
+
     def test_deletes_target(self):
         scs = ScoreSetWithTargetFactory()
         self.assertEqual(models.scoreset.ScoreSet.objects.count(), 1)
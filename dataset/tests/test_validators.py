@@ -61,6 +61,18 @@ class TestHeaderFromIO(TestCase):
         expected = [constants.hgvs_nt_column, "score", "count,nt"]
         self.assertEqual(expected, header)
 
+    def test_can_read_header_from_parquet(self):
+        file = BytesIO()
+        pd.DataFrame(
+            {constants.hgvs_nt_column: ["c.1A>G"], "score": [1.0]},
+            index=[5],
+        ).to_parquet(file)
+
+        header = read_header_from_io(file)
+
+        self.assertEqual([constants.hgvs_nt_column, "score"], header)
+        self.assertEqual(file.tell(), 0)
+
     def test_can_read_header_from_string(self):
         file = StringIO("{},score,count\n".format(constants.hgvs_nt_column))
         header = read_header_from_io(file)
@@ -21,7 +21,7 @@ from accounts.permissions import (
     assign_user_as_instance_admin,
 )
 
-from core.utilities.tests import TestMessageMixin
+from core.utilities.tests import TemporaryDirectoryMixin, TestMessageMixin
 
 from genome.factories import (
     ReferenceGenomeFactory,
@@ -49,6 +49,7 @@ from variant.factories import VariantFactory
 
 from ..utilities import publish_dataset
 import dataset.constants as constants
+from .. import staging
 from ..forms.scoreset import ScoreSetForm
 from ..factories import (
     ScoreSetFactory,
@@ -345,13 +346,21 @@ class TestScoreSetSetDetailView(TestCase, TestMessageMixin):
         self.assertContains(response, ">" + scs2.urn + "<", count=1)
 
 
-class TestCreateNewScoreSetView(TransactionTestCase, TestMessageMixin):
+class TestCreateNewScoreSetView(
+    TemporaryDirectoryMixin, TransactionTestCase, TestMessageMixin
+):
     """
     Test that the submission process does not allow invalid data through,
     and properly handles model creation.
     """
 
+    temporary_directory_settings = [
+        "VARIANT_STAGING_DIR",
+        "VARIANT_SNAPSHOT_DIR",
+    ]
+
     def setUp(self):
+        super().setUp()
         self.factory = RequestFactory()
         self.path = reverse_lazy("dataset:scoreset_new")
         self.template = "dataset/scoreset/new_scoreset.html"
@@ -601,8 +610,9 @@ class TestCreateNewScoreSetView(TransactionTestCase, TestMessageMixin):
             create_mock.assert_called_once()
             scores, counts, index = form.serialize_variants()
             expected = create_mock.call_args[1]["kwargs"]
-            expected_scores = expected.pop("scores_records")
-            expected_counts = expected.pop("counts_records")
+            expected_scores, expected_counts = staging.load_staged_variants(
+                expected.pop("staged_variants")
+            )
             self.assertEqual(
                 {
                     "user_pk": self.user.pk,
@@ -612,8 +622,16 @@ class TestCreateNewScoreSetView(TransactionTestCase, TestMessageMixin):
                 },
                 expected,
             )
-            assert_frame_equal(scores, expected_scores)
-            assert_frame_equal(counts, expected_counts)
+            assert_frame_equal(
+                scores.reset_index(drop=True),
+                expected_scores,
+                check_dtype=False,
+            )
+            assert_frame_equal(
+                counts.reset_index(drop=True),
+                expected_counts,
+                check_dtype=False,
+            )
 
     @mock.patch(
         "dataset.tasks.create_variants.submit_task", return_value=(True, None)
@@ -999,13 +1017,21 @@ class TestCreateNewScoreSetView(TransactionTestCase, TestMessageMixin):
         self.assertContains(response, "Protein sequences are allowed")
 
 
-class TestEditScoreSetView(TransactionTestCase, TestMessageMixin):
+class TestEditScoreSetView(
+    TemporaryDirectoryMixin, TransactionTestCase, TestMessageMixin
+):
     """
     Test that the submission process does not allow invalid data through,
     and properly handles model creation.
     """
 
+    temporary_directory_settings = [
+        "VARIANT_STAGING_DIR",
+        "VARIANT_SNAPSHOT_DIR",
+    ]
+
     def setUp(self):
+        super().setUp()
         self.factory = RequestFactory()
         self.path = "/profile/edit/scoreset/{}/"
         self.template = "dataset/scoreset/update_scoreset.html"
@@ -1,4 +1,5 @@
 import datetime
+from collections import Counter
 from typing import Union, Optional
 
 from django.contrib.auth import get_user_model
@@ -18,11 +19,11 @@ User = get_user_model()
 @transaction.atomic
 def delete_instance(instance):
     if isinstance(instance, ExperimentSet):
-        delete_experimentset(instance)
+        return delete_experimentset(instance)
     elif isinstance(instance, Experiment):
-        delete_experiment(instance)
+        return delete_experiment(instance)
     elif isinstance(instance, ScoreSet):
-        delete_scoreset(instance)
+        return delete_scoreset(instance)
     else:
         raise TypeError(
             "Expected ExperimentsSet, Experiment or ScoreSet. "
@@ -30,6 +31,19 @@ def delete_instance(instance):
         )
 
 
+def merge_deleted(*results):
+    """
+    Combines the `(total, {model label: count})` results of several
+    deletions into one result of the same form.
+    """
+    total = 0
+    counts = Counter()
+    for (n, per_model) in results:
+        total += n
+        counts.update(per_model)
+    return total, dict(counts)
+
+
 @transaction.atomic
 def delete_experimentset(experimentset):
     if not isinstance(experimentset, ExperimentSet):
@@ -38,9 +52,8 @@ def delete_experimentset(experimentset):
                 type(experimentset).__name__
             )
         )
-    for child in experimentset.children:
-        delete_experiment(child)
-    experimentset.delete()
+    results = [delete_experiment(c) for c in experimentset.children]
+    return merge_deleted(*results, experimentset.delete())
 
 
 @transaction.atomic
@@ -49,19 +62,28 @@ def delete_experiment(experiment):
         raise TypeError(
             "Expected Experiment, found {}.".format(type(experiment).__name__)
         )
-    for child in experiment.children:
-        delete_scoreset(child)
-    experiment.delete()
+    results = [delete_scoreset(c) for c in experiment.children]
+    return merge_deleted(*results, experiment.delete())
 
 
 @transaction.atomic
 def delete_scoreset(scoreset):
+    """
+    Deletes `scoreset` and its variants. Variants are deleted with a single
+    statement before the score set.
+
+    Returns
+    -------
+    tuple[int, dict]
+        Total number of deleted rows and the number deleted per model, as
+        returned by `Model.delete`.
+    """
     if not isinstance(scoreset, ScoreSet):
         raise TypeError(
             "Expected ScoreSet, found {}.".format(type(scoreset).__name__)
         )
-    for variant in scoreset.children:
-        variant.delete()
+    n_variants = Variant.bulk_delete(scoreset)
+    deleted = [(n_variants, {Variant._meta.label: n_variants})]
 
     should_delete_exp = False
     should_delete_exp_set = False
@@ -83,14 +105,14 @@ def delete_scoreset(scoreset):
             and experimentset.meta_analysis_scoresets.count() == 1
         )
 
-    result = scoreset.delete()
+    deleted.append(scoreset.delete())
 
     if should_delete_exp and experiment is not None:
-        delete_experiment(experiment)
+        deleted.append(delete_experiment(experiment))
     if should_delete_exp_set and experimentset is not None:
-        delete_experimentset(experimentset)
+        deleted.append(delete_experimentset(experimentset))
 
-    return result
+    return merge_deleted(*deleted)
 
 
 @transaction.atomic
@@ -137,12 +159,8 @@ def publish_dataset(
         )
         experiment = models.experiment.assign_public_urn(dataset.experiment)
         scoreset = models.scoreset.assign_public_urn(dataset)
-        urns = Variant.bulk_create_urns(
-            scoreset.children.count(), scoreset, reset_counter=True
-        )
-        for urn, child in zip(urns, scoreset.children.all()):
-            child.urn = urn
-            child.save()
+        Variant.validate_stored_columns(scoreset)
+        Variant.renumber_urns(scoreset, by_number=True)
     elif isinstance(dataset, models.experiment.Experiment):
         experimentset = models.experimentset.assign_public_urn(
             dataset.experimentset
@@ -9,7 +9,7 @@ from django.utils.deconstruct import deconstructible
 from django.core.exceptions import ValidationError
 from django.core.validators import FileExtensionValidator
 
-from core.utilities import is_null, readable_null_values
+from core.utilities import columnar, is_null, readable_null_values
 
 from . import constants
 
@@ -17,6 +17,9 @@ from . import constants
 validate_csv_extension = FileExtensionValidator(allowed_extensions=["csv"])
 validate_gz_extension = FileExtensionValidator(allowed_extensions=["gz"])
 validate_json_extension = FileExtensionValidator(allowed_extensions=["json"])
+validate_variant_data_extension = FileExtensionValidator(
+    allowed_extensions=["csv"] + list(columnar.extensions)
+)
 
 
 @deconstructible
@@ -44,6 +47,13 @@ def read_header_from_io(file, label=None, msg=None):
         label = "uploaded"
 
     try:
+        file_format = columnar.detect_format(file)
+        if file_format != columnar.CSV:
+            return [
+                h.strip()
+                for h in columnar.read_column_names(file, file_format)
+            ]
+
         header_line = file.readline()
         if isinstance(header_line, bytes):
             header_line = header_line.decode()
@@ -1,7 +1,7 @@
 # -*- coding: UTF-8 -*-
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from django.contrib import messages
 from django.db import transaction
@@ -24,9 +24,10 @@ from metadata.forms import (
 
 # Absolute import tasks for celery to work
 from dataset.tasks import create_variants
-from dataset import constants
+from dataset import constants, snapshots, staging
 
 from genome.forms import PrimaryReferenceMapForm, TargetGeneForm
+from variant.validators import MaveDataset
 
 from ..models.scoreset import ScoreSet
 from ..models.experiment import Experiment
@@ -60,8 +61,7 @@ class ScoreSetDetailView(DatasetModelView):
     def get_context_data(self, **kwargs):
         context = super(ScoreSetDetailView, self).get_context_data(**kwargs)
         instance = self.get_object()
-        order_by = "id"  # instance.primary_hgvs_column
-        variants = instance.children.order_by("{}".format(order_by))[:10]
+        variants = instance.children.order_by("number", "id")[:10]
         context["variants"] = variants
         context["score_columns"] = instance.score_columns
         context["count_columns"] = instance.count_columns
@@ -90,9 +90,6 @@ class ScoreSetDetailView(DatasetModelView):
         type_ = self.request.GET.get("type", False)
         instance = self.get_object()
 
-        order_by = "id"  # instance.primary_hgvs_column
-        variants = instance.children.order_by("{}".format(order_by))[:10]
-
         # Format table columns for dataTables
         columns = (
             instance.count_columns
@@ -104,13 +101,8 @@ class ScoreSetDetailView(DatasetModelView):
             table_columns.append({"className": name, "targets": [i]})
 
         rows = []
-        for variant in variants:
+        for v_data in self.preview_data(instance, type_):
             row = {}
-            if type_ == "counts":
-                v_data = variant.count_data
-            else:
-                v_data = variant.score_data
-
             for i, data in enumerate(v_data):
                 if isinstance(data, float):
                     data = "{:.3f}".format(data)
@@ -132,6 +124,23 @@ class ScoreSetDetailView(DatasetModelView):
         }
         return JsonResponse(response, safe=False)
 
+    @staticmethod
+    def preview_data(instance, type_, n=10):
+        """
+        Returns the hgvs and data values of the first `n` variants of
+        `instance`, read from its snapshot when there is a current one.
+        """
+        dtype = "counts" if type_ == "counts" else "scores"
+        table = snapshots.read_snapshot(instance, dtype)
+        if table is not None:
+            preview = table.slice(0, n).drop([snapshots.NUMBER_COLUMN])
+            return list(zip(*(c.to_pylist() for c in preview.columns)))
+
+        variants = instance.children.order_by("number", "id")[:n]
+        if type_ == "counts":
+            return [variant.count_data for variant in variants]
+        return [variant.score_data for variant in variants]
+
 
 class BaseScoreSetFormView(ScoreSetAjaxMixin):
     # Override these in update/create
@@ -186,19 +195,28 @@ class BaseScoreSetFormView(ScoreSetAjaxMixin):
             reverse("dataset:scoreset_detail", kwargs={"urn": self.object.urn})
         )
 
+    @staticmethod
+    def errors_file_lines(dataset: MaveDataset) -> List[str]:
+        # Note at the end of the file when validation stopped early so users
+        # know to expect further errors once these are fixed.
+        lines = list(dataset.errors)
+        if dataset.errors_truncated:
+            lines.append(ScoreSetForm.truncated_errors_message(dataset))
+        return lines
+
     def form_invalid(self, form: Dict[str, Any]):
         ss_form: ScoreSetForm = form.get("scoreset_form")
         profile: Profile = self.request.user.profile
         if ss_form.should_write_scores_error_file and ss_form.scores_dataset:
             profile.set_submission_scores_errors(
-                data=ss_form.scores_dataset.errors
+                data=self.errors_file_lines(ss_form.scores_dataset)
             )
         else:
             profile.set_submission_scores_errors(data=None)
 
         if ss_form.should_write_counts_error_file and ss_form.counts_dataset:
             profile.set_submission_counts_errors(
-                data=ss_form.counts_dataset.errors
+                data=self.errors_file_lines(ss_form.counts_dataset)
             )
         else:
             profile.set_submission_counts_errors(data=None)
@@ -290,14 +308,16 @@ class BaseScoreSetFormView(ScoreSetAjaxMixin):
             self.object.processing_state = constants.processing
             self.object.save()
 
+            # Only a reference to the staged data is sent through the broker.
             scores_rs, counts_rs, index = form.serialize_variants()
             task_kwargs = {
                 "user_pk": self.request.user.pk,
                 "scoreset_urn": self.object.urn,
                 "dataset_columns": form.dataset_columns.copy(),
                 "index": index,
-                "scores_records": scores_rs,
-                "counts_records": counts_rs,
+                "staged_variants": staging.stage_variants(
+                    scores_rs, counts_rs
+                ),
             }
 
             success, _ = create_variants.submit_task(
@@ -0,0 +1,112 @@
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from dataset.benchmarks import LAYOUTS, SIZES, benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Times each stage of validating synthetic score and count uploads "
+        "and reports rows per second and peak memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            nargs="+",
+            type=int,
+            default=list(SIZES[:2]),
+            help=(
+                "Number of variants in each synthetic dataset. Use "
+                "'--rows {}' for the full suite.".format(
+                    " ".join(str(s) for s in SIZES)
+                )
+            ),
+        )
+        parser.add_argument(
+            "--layouts",
+            nargs="+",
+            choices=LAYOUTS,
+            default=list(LAYOUTS),
+            help="HGVS columns defined by each synthetic dataset.",
+        )
+        parser.add_argument(
+            "--counts",
+            choices=("with", "without", "both"),
+            default="both",
+            help="Benchmark uploads with a counts file, without, or both.",
+        )
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=settings.VALIDATION_N_JOBS,
+            help="Processes used to parse HGVS columns.",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Synthetic dataset seed."
+        )
+        parser.add_argument(
+            "--no-form",
+            action="store_true",
+            dest="no_form",
+            help="Skip timing score set form validation.",
+        )
+        parser.add_argument(
+            "--load",
+            action="store_true",
+            dest="load",
+            help=(
+                "Also time loading variants into the database with the ORM "
+                "and with COPY. Loads are rolled back."
+            ),
+        )
+        parser.add_argument(
+            "--no-memory",
+            action="store_true",
+            dest="no_memory",
+            help="Skip the second pass that records peak memory.",
+        )
+
+    def handle(self, *args, **kwargs):
+        counts = kwargs.get("counts", "both")
+        with_counts = {
+            "with": [True],
+            "without": [False],
+            "both": [False, True],
+        }[counts]
+
+        sys.stdout.write(
+            "{:<15}{:>9}{:>8}  {:<18}{:>10}{:>12}{:>10}\n".format(
+                "layout", "rows", "counts", "stage", "seconds", "rows/s", "MiB"
+            )
+        )
+        for layout in kwargs.get("layouts", LAYOUTS):
+            for n_rows in kwargs.get("rows", SIZES[:2]):
+                for counts_file in with_counts:
+                    results = benchmark(
+                        n_rows,
+                        layout=layout,
+                        with_counts=counts_file,
+                        n_jobs=kwargs.get("jobs", 1),
+                        include_form=not kwargs.get("no_form", False),
+                        trace_memory=not kwargs.get("no_memory", False),
+                        seed=kwargs.get("seed", 0),
+                        include_load=kwargs.get("load", False),
+                    )
+                    for result in results:
+                        sys.stdout.write(
+                            "{:<15}{:>9}{:>8}  {:<18}{:>10.3f}{:>12.0f}"
+                            "{:>10}\n".format(
+                                result.layout,
+                                result.n_rows,
+                                "yes" if result.with_counts else "no",
+                                result.stage,
+                                result.seconds,
+                                result.rows_per_second,
+                                "-"
+                                if result.peak_mib is None
+                                else "{:.1f}".format(result.peak_mib),
+                            )
+                        )
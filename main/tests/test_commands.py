@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import TestCase, mock
 from django.core.management import call_command
 from django.core.exceptions import ValidationError, ObjectDoesNotExist
 
@@ -140,3 +140,18 @@ class TestAddUserCommand(TestCase):
         self.assertIn(user, instance.viewers)
         self.assertNotIn(user, instance.administrators)
         self.assertNotIn(user, instance.editors)
+
+
+class TestBenchmarkUploadCommand(TestCase):
+    @mock.patch("main.management.commands.benchmarkupload.sys.stdout")
+    def test_writes_a_row_per_stage(self, stdout):
+        call_command(
+            "benchmarkupload",
+            rows=[20],
+            layouts=["nt"],
+            counts="without",
+            no_form=True,
+            no_memory=True,
+        )
+        # Header followed by the read, validate and records stages.
+        self.assertEqual(stdout.write.call_count, 4)
@@ -18,6 +18,43 @@ SECURE_BROWSER_XSS_FILTER = True
 # MaveDB APP behaviour settings
 META_ANALYSIS_ALLOW_DAISY_CHAIN = False
 
+# Number of processes used to validate the HGVS columns of large uploads.
+# Values less than 1 will use all available cores.
+VALIDATION_N_JOBS = int(os.getenv("APP_VALIDATION_N_JOBS", 1))
+# Validation of an uploaded file stops once this many errors have been found.
+VALIDATION_MAX_ERRORS = int(os.getenv("APP_VALIDATION_MAX_ERRORS", 1000))
+# Valid uploads are cached by a hash of their contents so that re-uploading
+# an identical file is not validated again. Entries expire after the timeout
+# (in seconds) and the oldest are culled once the cache holds max entries.
+VALIDATION_CACHE_DIR = os.getenv(
+    "APP_VALIDATION_CACHE_DIR", os.path.join(BASE_DIR, "cache", "validation")
+)
+VALIDATION_CACHE_TIMEOUT = int(
+    os.getenv("APP_VALIDATION_CACHE_TIMEOUT", 60 * 60 * 24)
+)
+VALIDATION_CACHE_MAX_ENTRIES = int(
+    os.getenv("APP_VALIDATION_CACHE_MAX_ENTRIES", 50)
+)
+# Uploads with more rows than this are not cached since each entry is written
+# to disk while the form is submitted.
+VALIDATION_CACHE_MAX_ROWS = int(
+    os.getenv("APP_VALIDATION_CACHE_MAX_ROWS", 200000)
+)
+# Validated variant data is staged here for the create_variants task. Must be
+# shared by the web and worker processes.
+VARIANT_STAGING_DIR = os.getenv(
+    "APP_VARIANT_STAGING_DIR", os.path.join(BASE_DIR, "staging")
+)
+# Uploads with more variants than this are loaded in chunks of this size, each
+# committed separately, so that a failed task resumes from the last chunk.
+VARIANT_CHUNK_SIZE = int(os.getenv("APP_VARIANT_CHUNK_SIZE", 50000))
+# Columnar snapshots of the variant data of each score set, and the cached
+# downloads of public score sets, are written here. Must be shared by the web
+# and worker processes.
+VARIANT_SNAPSHOT_DIR = os.getenv(
+    "APP_VARIANT_SNAPSHOT_DIR", os.path.join(BASE_DIR, "snapshots")
+)
+
 BASE_URL = os.getenv("APP_BASE_URL", "localhost:8000")
 API_BASE_URL = os.getenv("APP_API_BASE_URL", "localhost:8000/api")
 SECRET_KEY = os.getenv("APP_SECRET_KEY", "very_secret_key")
@@ -39,6 +76,18 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/1.11/topics/cache/
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "validation": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": VALIDATION_CACHE_DIR,
+        "TIMEOUT": VALIDATION_CACHE_TIMEOUT,
+        "OPTIONS": {"MAX_ENTRIES": VALIDATION_CACHE_MAX_ENTRIES},
+    },
+}
+
 # Social auth settings for ORCID authentication
 SOCIAL_AUTH_ORCID_PROFILE_EXTRA_PARAMS = {"credit-name": "credit_name"}
 SOCIAL_AUTH_ORCID_KEY = os.getenv("APP_ORCID_KEY", None)
@@ -30,7 +30,8 @@ USE_TZ = True
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
 CACHES = {
-    "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+    "validation": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
 }
 
 # Database - fetch settings from dotenv file to override from local env if not
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import django.contrib.postgres.fields.jsonb
+import django.db.models.deletion
+from django.db import migrations, models
+
+import variant.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dataset", "0018_scoreset_variants_progress"),
+        ("variant", "0008_auto_20210213_0000"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StagedVariant",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("reference", models.CharField(max_length=32)),
+                ("number", models.PositiveIntegerField()),
+                ("hgvs_nt", models.TextField(default=None, null=True)),
+                ("hgvs_splice", models.TextField(default=None, null=True)),
+                ("hgvs_pro", models.TextField(default=None, null=True)),
+                (
+                    "data",
+                    django.contrib.postgres.fields.jsonb.JSONField(
+                        default=variant.models.default_data_dict
+                    ),
+                ),
+                (
+                    "scoreset",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="staged_variants",
+                        to="dataset.ScoreSet",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Staged variant",
+                "verbose_name_plural": "Staged variants",
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name="stagedvariant",
+            unique_together=set([("scoreset", "reference", "number")]),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+def backfill_numbers(apps, schema_editor):
+    Variant = apps.get_model("variant", "Variant")
+    if schema_editor.connection.vendor == "postgresql":
+        qn = schema_editor.quote_name
+        schema_editor.execute(
+            "UPDATE {table} SET {number} = "
+            "CAST(SUBSTRING({urn} FROM '#([0-9]+)$') AS INTEGER) "
+            "WHERE {urn} ~ '#[0-9]+$'".format(
+                table=qn(Variant._meta.db_table),
+                number=qn(Variant._meta.get_field("number").column),
+                urn=qn(Variant._meta.get_field("urn").column),
+            )
+        )
+        return
+
+    variants = Variant.objects.filter(urn__regex=r"#[0-9]+$")
+    for (pk, urn) in variants.values_list("pk", "urn").iterator():
+        number = int(urn.rsplit("#", 1)[-1])
+        Variant.objects.filter(pk=pk).update(number=number)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("variant", "0009_stagedvariant"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="variant",
+            name="number",
+            field=models.PositiveIntegerField(
+                default=None, editable=False, null=True, verbose_name="Number"
+            ),
+        ),
+        migrations.RunPython(backfill_numbers, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="variant",
+            index=models.Index(
+                fields=["scoreset", "number"],
+                name="variant_scoreset_number_idx",
+            ),
+        ),
+    ]
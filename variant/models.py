@@ -1,8 +1,12 @@
+import datetime
+import io
+import json
 from collections import defaultdict
-from typing import List, Union, Optional
+from typing import Dict, Iterable, List, Union, Optional
 
 from django.contrib.postgres.fields import JSONField
-from django.db import models, transaction
+from django.db import connection, models, transaction
+from django.db.models.functions import Cast, Concat
 
 from dataset import constants as constants
 from urn.models import UrnModel
@@ -14,6 +18,7 @@ from variant.validators import (
     validate_splice_variant,
     validate_variant_json,
     validate_columns_match,
+    validate_all_columns_match,
 )
 
 # 'score' should be the first column in a score dataset
@@ -27,6 +32,32 @@ def default_data_dict():
     )
 
 
+def _copy_text(value) -> str:
+    # Formats a value for the text format of PostgreSQL's COPY command.
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def variant_number(urn: Optional[str]) -> Optional[int]:
+    """
+    Returns the number `N` of a variant urn ending in `#N`, or `None` for
+    urns without one such as temporary urns.
+    """
+    if not urn or "#" not in urn:
+        return None
+    number = urn.rsplit("#", 1)[-1]
+    if not number.isdigit():
+        return None
+    return int(number)
+
+
 @transaction.atomic
 def assign_public_urn(variant):
     """
@@ -110,6 +141,10 @@ class Variant(UrnModel):
     data : `JSONField`
         The variant's numerical data.
 
+    number : `int`, optional.
+        The number `N` at the end of the urn `<scoreset urn>#N`. Set from the
+        urn when saved. Variants are ordered by number within a scoreset.
+
     """
 
     # ---------------------------------------------------------------------- #
@@ -118,6 +153,12 @@ class Variant(UrnModel):
     class Meta:
         verbose_name = "Variant"
         verbose_name_plural = "Variants"
+        indexes = [
+            models.Index(
+                fields=["scoreset", "number"],
+                name="variant_scoreset_number_idx",
+            )
+        ]
 
     # ---------------------------------------------------------------------- #
     #                       Required Model fields
@@ -155,6 +196,10 @@ class Variant(UrnModel):
         validators=[validate_variant_json],
     )
 
+    number = models.PositiveIntegerField(
+        null=True, default=None, editable=False, verbose_name="Number"
+    )
+
     # ---------------------------------------------------------------------- #
     #                       Methods
     # ---------------------------------------------------------------------- #
@@ -162,6 +207,7 @@ class Variant(UrnModel):
     def save(self, *args, **kwargs):
         if self.parent:
             validate_columns_match(self, self.parent)
+        self.number = variant_number(self.urn)
         return super().save(*args, **kwargs)
 
     @property
@@ -174,19 +220,522 @@ class Variant(UrnModel):
     def hgvs(self) -> Optional[str]:
         return self.hgvs_nt or self.hgvs_pro
 
+    # Prefix of the temporary urns held by variants while renumbering.
+    RENUMBER_URN_PREFIX: str = "renumber:"
+
+    # Rows sent to the database by each COPY statement in `copy_create`.
+    COPY_BATCH_SIZE: int = 50000
+
     @classmethod
     @transaction.atomic
-    def bulk_create(cls, parent, variant_kwargs_list, batch_size=None) -> int:
-        num_variants = len(list(variant_kwargs_list))
-        variant_urns = Variant.bulk_create_urns(num_variants, parent)
-        variants = (
-            Variant(urn=urn, scoreset=parent, **kwargs)
-            for urn, kwargs in zip(variant_urns, variant_kwargs_list)
+    def bulk_create(
+        cls,
+        parent,
+        variant_kwargs_list,
+        batch_size=None,
+        use_copy=None,
+        urns: Optional[List[str]] = None,
+    ) -> int:
+        """
+        Creates a variant for each dictionary of field values in
+        `variant_kwargs_list` with consecutive child urns of `parent`, or
+        with `urns` if given, in which case `last_child_value` of `parent`
+        is left to the caller.
+
+        Variants are loaded with `COPY ... FROM STDIN` when the database is
+        PostgreSQL, or with the ORM's `bulk_create` otherwise. Pass
+        `use_copy` to choose the loader explicitly.
+
+        The data of all variants is checked against the columns of `parent`
+        once with `validate_all_columns_match` before anything is written.
+        """
+        variant_kwargs_list = list(variant_kwargs_list)
+        validate_all_columns_match(
+            (
+                kwargs.get("data", default_data_dict())
+                for kwargs in variant_kwargs_list
+            ),
+            parent,
         )
-        cls.objects.bulk_create(variants, batch_size=batch_size)
+        num_variants = len(variant_kwargs_list)
+        if urns is None:
+            variant_urns = Variant.bulk_create_urns(num_variants, parent)
+        else:
+            variant_urns = list(urns)
+
+        if use_copy is None:
+            use_copy = connection.vendor == "postgresql"
+        if use_copy:
+            cls.copy_create(
+                parent, variant_urns, variant_kwargs_list, batch_size
+            )
+        else:
+            variants = (
+                Variant(
+                    urn=urn,
+                    number=variant_number(urn),
+                    scoreset=parent,
+                    **kwargs,
+                )
+                for urn, kwargs in zip(variant_urns, variant_kwargs_list)
+            )
+            cls.objects.bulk_create(variants, batch_size=batch_size)
+
         parent.save()
         return parent.variants.count()
 
+    @classmethod
+    def copy_create(
+        cls,
+        parent,
+        urns: List[str],
+        variant_kwargs_list: Iterable[dict],
+        batch_size=None,
+    ) -> None:
+        """
+        Streams variants into the variant table with PostgreSQL's
+        `COPY ... FROM STDIN` in the current transaction. Skips the
+        construction of a model instance for each row, so field defaults
+        other than the creation and modification dates are not applied.
+        """
+        batch_size = batch_size or cls.COPY_BATCH_SIZE
+        fields = [
+            "urn",
+            "number",
+            "hgvs_nt",
+            "hgvs_splice",
+            "hgvs_pro",
+            "scoreset",
+            "data",
+            "creation_date",
+            "modification_date",
+        ]
+        columns = ", ".join(
+            connection.ops.quote_name(cls._meta.get_field(f).column)
+            for f in fields
+        )
+        sql = "COPY {} ({}) FROM STDIN".format(
+            connection.ops.quote_name(cls._meta.db_table), columns
+        )
+
+        today = datetime.date.today().isoformat()
+        rows = (
+            (
+                urn,
+                variant_number(urn),
+                kwargs.get("hgvs_nt", None),
+                kwargs.get("hgvs_splice", None),
+                kwargs.get("hgvs_pro", None),
+                parent.pk,
+                json.dumps(kwargs.get("data", default_data_dict())),
+                today,
+                today,
+            )
+            for urn, kwargs in zip(urns, variant_kwargs_list)
+        )
+
+        with connection.cursor() as cursor:
+            buffer = io.StringIO()
+            for i, row in enumerate(rows, start=1):
+                buffer.write("\t".join(_copy_text(v) for v in row))
+                buffer.write("\n")
+                if i % batch_size == 0:
+                    buffer.seek(0)
+                    cursor.copy_expert(sql, buffer)
+                    buffer = io.StringIO()
+            if buffer.tell():
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+
+    @classmethod
+    @transaction.atomic
+    def create_from_staged(cls, parent, reference: str) -> int:
+        """
+        Moves the rows staged under `reference` by a chunked load into the
+        variant table with a single `INSERT ... SELECT`. Urns are numbered in
+        staged order, so `parent` must not have any variants. All staged rows
+        of `parent` are deleted afterwards.
+        """
+        if parent.last_child_value:
+            raise ValueError(
+                "Staged variants can only be created for a score set "
+                "without variants."
+            )
+
+        staged = StagedVariant.objects.filter(
+            scoreset=parent, reference=reference
+        )
+        n = staged.count()
+
+        qn = connection.ops.quote_name
+
+        def column(model, name):
+            return qn(model._meta.get_field(name).column)
+
+        values = ["hgvs_nt", "hgvs_splice", "hgvs_pro", "data"]
+        sql = (
+            "INSERT INTO {table} ({urn}, {variant_number}, {scoreset}, "
+            "{creation_date}, {modification_date}, {columns}) "
+            "SELECT %s || CAST({number} AS TEXT), {number}, "
+            "{staged_scoreset}, %s, %s, {staged_columns} FROM {staged} "
+            "WHERE {staged_scoreset} = %s AND {reference} = %s "
+            "ORDER BY {number}"
+        ).format(
+            table=qn(cls._meta.db_table),
+            urn=column(cls, "urn"),
+            variant_number=column(cls, "number"),
+            scoreset=column(cls, "scoreset"),
+            creation_date=column(cls, "creation_date"),
+            modification_date=column(cls, "modification_date"),
+            columns=", ".join(column(cls, v) for v in values),
+            number=column(StagedVariant, "number"),
+            staged_scoreset=column(StagedVariant, "scoreset"),
+            staged_columns=", ".join(column(StagedVariant, v) for v in values),
+            staged=qn(StagedVariant._meta.db_table),
+            reference=column(StagedVariant, "reference"),
+        )
+        today = datetime.date.today()
+        params = ["{}#".format(parent.urn), today, today, parent.pk, reference]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+        StagedVariant.objects.filter(scoreset=parent).delete()
+        parent.last_child_value = n
+        parent.save()
+        return n
+
+    # Rows changed by each statement of `bulk_diff`.
+    DIFF_BATCH_SIZE: int = 5000
+
+    @classmethod
+    @transaction.atomic
+    def bulk_diff(
+        cls, parent, variant_kwargs_list, key: str
+    ) -> Optional[Dict[str, int]]:
+        """
+        Replaces the variants of `parent` with those described by
+        `variant_kwargs_list` by matching variants on the hgvs field `key`.
+        Variants are numbered in the order of `variant_kwargs_list`, so the
+        n-th variant has the urn `<parent urn>#n` as after a fresh upload.
+        Matched variants are only written if their hgvs fields, data or
+        position changed. Unmatched existing variants are deleted.
+
+        Does nothing and returns `None` if a value of `key` is missing or
+        repeated in either set of variants, since variants can't be matched.
+
+        Returns
+        -------
+        dict
+            Number of variants `created`, `updated`, `deleted` and
+            `unchanged`.
+        """
+        fields = ["hgvs_nt", "hgvs_splice", "hgvs_pro", "data"]
+        if key not in fields:
+            raise ValueError(f"'{key}' is not a hgvs field.")
+        prefix = "{}#".format(parent.urn)
+
+        incoming = {}
+        for kwargs in variant_kwargs_list:
+            row = {
+                "hgvs_nt": kwargs.get("hgvs_nt", None),
+                "hgvs_splice": kwargs.get("hgvs_splice", None),
+                "hgvs_pro": kwargs.get("hgvs_pro", None),
+                "data": kwargs.get("data", default_data_dict()),
+            }
+            if row[key] is None or row[key] in incoming:
+                return None
+            incoming[row[key]] = row
+
+        existing = {}
+        variants = cls.objects.filter(scoreset=parent).values_list(
+            "pk", "urn", "number", *fields
+        )
+        for (pk, *values) in variants.iterator():
+            row = dict(zip(["urn", "number"] + fields, values))
+            if row[key] is None or row[key] in existing:
+                return None
+            existing[row[key]] = (pk, row)
+
+        created = []
+        updated = []
+        moved = []
+        for (number, (k, row)) in enumerate(incoming.items(), start=1):
+            urn = "{}{}".format(prefix, number)
+            if k not in existing:
+                created.append((urn, row))
+                continue
+            pk, current = existing[k]
+            row = dict(row, urn=urn, number=number)
+            if row != current:
+                updated.append((pk, row))
+            if current["urn"] != urn:
+                moved.append(pk)
+        deleted = [
+            pk for (k, (pk, _)) in existing.items() if k not in incoming
+        ]
+
+        for start in range(0, len(deleted), cls.DIFF_BATCH_SIZE):
+            batch = deleted[start : start + cls.DIFF_BATCH_SIZE]
+            cls.bulk_delete(parent, pks=batch)
+        # Urns are unique, so variants changing position first move to a
+        # temporary urn to free the urn of the variant taking their place.
+        for start in range(0, len(moved), cls.DIFF_BATCH_SIZE):
+            batch = moved[start : start + cls.DIFF_BATCH_SIZE]
+            cls.objects.filter(pk__in=batch).update(
+                urn=Concat(
+                    models.Value(cls.RENUMBER_URN_PREFIX),
+                    Cast("pk", models.CharField()),
+                )
+            )
+        cls.update_rows(updated)
+        if created:
+            cls.bulk_create(
+                parent,
+                [row for (_, row) in created],
+                urns=[urn for (urn, _) in created],
+            )
+
+        parent.last_child_value = len(incoming)
+        type(parent).objects.filter(pk=parent.pk).update(
+            last_child_value=parent.last_child_value
+        )
+
+        return {
+            "created": len(created),
+            "updated": len(updated),
+            "deleted": len(deleted),
+            "unchanged": len(existing) - len(deleted) - len(updated),
+        }
+
+    @classmethod
+    def update_rows(cls, rows: List[tuple]) -> None:
+        """
+        Sets the urn, number, hgvs fields and data of variants from
+        `(pk, fields)` pairs. On PostgreSQL each batch of rows is written by
+        a single `UPDATE ... FROM (VALUES ...)` statement.
+        """
+        today = datetime.date.today()
+        if connection.vendor != "postgresql":
+            for (pk, fields) in rows:
+                cls.objects.filter(pk=pk).update(
+                    modification_date=today, **fields
+                )
+            return
+
+        qn = connection.ops.quote_name
+        fields = [
+            "urn",
+            "number",
+            "hgvs_nt",
+            "hgvs_splice",
+            "hgvs_pro",
+            "data",
+        ]
+        table = qn(cls._meta.db_table)
+        pk = qn(cls._meta.pk.column)
+        assignments = ", ".join(
+            "{} = v.{}".format(qn(cls._meta.get_field(f).column), f)
+            for f in fields[:-1]
+        )
+        for start in range(0, len(rows), cls.DIFF_BATCH_SIZE):
+            batch = rows[start : start + cls.DIFF_BATCH_SIZE]
+            sql = (
+                "UPDATE {table} SET {assignments}, "
+                "{data} = CAST(v.data AS jsonb), {modified} = %s "
+                "FROM (VALUES {values}) AS v (id, {fields}) "
+                "WHERE {table}.{pk} = v.id"
+            ).format(
+                table=table,
+                assignments=assignments,
+                data=qn(cls._meta.get_field("data").column),
+                modified=qn(cls._meta.get_field("modification_date").column),
+                values=", ".join(
+                    ["(%s, %s, %s, %s, %s, %s, %s)"] * len(batch)
+                ),
+                fields=", ".join(fields),
+                pk=pk,
+            )
+            params = [today]
+            for (row_pk, row) in batch:
+                params.extend(
+                    [
+                        row_pk,
+                        row["urn"],
+                        row["number"],
+                        row["hgvs_nt"],
+                        row["hgvs_splice"],
+                        row["hgvs_pro"],
+                        json.dumps(row["data"]),
+                    ]
+                )
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+
+    @classmethod
+    def renumber_urns(cls, parent, by_number: bool = False) -> int:
+        """
+        Assigns the urns `<parent urn>#1` to `#n` to the variants of `parent`
+        in the order they were created, or in the order of their current
+        urn numbers if `by_number` is set, and sets `last_child_value` of
+        `parent` to `n`. On PostgreSQL all urns are assigned by a single
+        `UPDATE` numbering rows with a window function. Returns `n`.
+
+        The unique constraint on urns is checked row by row, so variants
+        whose new urn may still be held by another variant of `parent` are
+        first moved to a temporary urn made from their primary key.
+        """
+        today = datetime.date.today()
+        prefix = "{}#".format(parent.urn)
+        if connection.vendor == "postgresql":
+            qn = connection.ops.quote_name
+            table = qn(cls._meta.db_table)
+            pk = qn(cls._meta.pk.column)
+            urn = qn(cls._meta.get_field("urn").column)
+            scoreset = qn(cls._meta.get_field("scoreset").column)
+            modified = qn(cls._meta.get_field("modification_date").column)
+            number = qn(cls._meta.get_field("number").column)
+            numbered = (
+                "FROM (SELECT {pk}, ROW_NUMBER() OVER (ORDER BY {order}) "
+                "AS n FROM {table} WHERE {scoreset} = %s) AS numbered "
+                "WHERE {table}.{pk} = numbered.{pk}"
+            )
+            move = (
+                "UPDATE {table} SET {urn} = %s || CAST({table}.{pk} AS TEXT) "
+                + numbered
+                + " AND SUBSTR({urn}, 1, %s) = %s "
+                "AND {urn} <> %s || CAST(numbered.n AS TEXT)"
+            )
+            renumber = (
+                "UPDATE {table} SET {urn} = %s || CAST(numbered.n AS TEXT), "
+                "{number} = numbered.n, {modified} = %s " + numbered
+            )
+            names = dict(
+                table=table,
+                order="{}, {}".format(number, pk) if by_number else pk,
+                urn=urn,
+                number=number,
+                modified=modified,
+                pk=pk,
+                scoreset=scoreset,
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    move.format(**names),
+                    [
+                        cls.RENUMBER_URN_PREFIX,
+                        parent.pk,
+                        len(prefix),
+                        prefix,
+                        prefix,
+                    ],
+                )
+                cursor.execute(
+                    renumber.format(**names), [prefix, today, parent.pk]
+                )
+                n = cursor.rowcount
+        else:
+            rows = list(
+                cls.objects.filter(scoreset=parent)
+                .order_by(*(["number", "pk"] if by_number else ["pk"]))
+                .values_list("pk", "urn")
+            )
+            n = len(rows)
+            urns = cls.bulk_create_urns(n, parent, reset_counter=True)
+            for ((pk, current), urn) in zip(rows, urns):
+                if current and current.startswith(prefix) and current != urn:
+                    cls.objects.filter(pk=pk).update(
+                        urn="{}{}".format(cls.RENUMBER_URN_PREFIX, pk)
+                    )
+            for ((pk, _), urn) in zip(rows, urns):
+                cls.objects.filter(pk=pk).update(
+                    urn=urn,
+                    number=variant_number(urn),
+                    modification_date=today,
+                )
+
+        parent.last_child_value = n
+        type(parent).objects.filter(pk=parent.pk).update(last_child_value=n)
+        return n
+
+    @classmethod
+    def validate_stored_columns(cls, parent) -> int:
+        """
+        Checks the score and count columns stored in the data of every
+        variant of `parent` against the columns of `parent`, in order, as
+        `validate_columns_match` does for a single variant. Each distinct
+        pair of column lists is checked once. On PostgreSQL the column lists
+        are collected by the database with `jsonb_object_keys`, which lists
+        keys in the same order as they are loaded, so the variant data is
+        not decoded. Returns the number of variants checked.
+        """
+        keys = [constants.variant_score_data, constants.variant_count_data]
+        column_sets = defaultdict(int)
+        if connection.vendor == "postgresql":
+            qn = connection.ops.quote_name
+            data = qn(cls._meta.get_field("data").column)
+            column_list = (
+                "CASE WHEN {data} ? %s THEN ARRAY(SELECT k FROM "
+                "jsonb_object_keys({data} -> %s) WITH ORDINALITY AS t (k, i) "
+                "ORDER BY i) END"
+            ).format(data=data)
+            sql = (
+                "SELECT {column_list}, {column_list}, COUNT(*) FROM {table} "
+                "WHERE {scoreset} = %s GROUP BY 1, 2"
+            ).format(
+                column_list=column_list,
+                table=qn(cls._meta.db_table),
+                scoreset=qn(cls._meta.get_field("scoreset").column),
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    sql, [keys[0], keys[0], keys[1], keys[1], parent.pk]
+                )
+                for (*columns, n) in cursor.fetchall():
+                    columns = tuple(
+                        None if c is None else tuple(c) for c in columns
+                    )
+                    column_sets[columns] += n
+        else:
+            variants = cls.objects.filter(scoreset=parent)
+            for data in variants.values_list("data", flat=True).iterator():
+                scores, counts = (
+                    tuple(data[key]) if key in data else None for key in keys
+                )
+                column_sets[(scores, counts)] += 1
+
+        for (scores, counts) in column_sets:
+            data = {
+                key: dict.fromkeys(columns)
+                for (key, columns) in zip(keys, (scores, counts))
+                if columns is not None
+            }
+            validate_columns_match(cls(data=data), parent)
+        return sum(column_sets.values())
+
+    @classmethod
+    def bulk_delete(cls, parent, pks: Optional[List[int]] = None) -> int:
+        """
+        Deletes every variant of `parent`, or only those with a primary key
+        in `pks`, with a single `DELETE` statement, skipping the collection
+        of each variant done by `QuerySet.delete`. Returns the number of
+        deleted variants.
+        """
+        qn = connection.ops.quote_name
+        sql = "DELETE FROM {} WHERE {} = %s".format(
+            qn(cls._meta.db_table), qn(cls._meta.get_field("scoreset").column)
+        )
+        params = [parent.pk]
+        if pks is not None:
+            if not pks:
+                return 0
+            sql += " AND {} IN ({})".format(
+                qn(cls._meta.pk.column), ", ".join(["%s"] * len(pks))
+            )
+            params.extend(pks)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+
     @staticmethod
     def bulk_create_urns(n, parent, reset_counter=False) -> List[str]:
         start_value = 0 if reset_counter else parent.last_child_value
@@ -262,3 +811,38 @@ class Variant(UrnModel):
                 result.append(self.data[data_key][column])
 
         return result
+
+
+class StagedVariant(models.Model):
+    """
+    A variant written by a chunked `create_variants` task. Staged rows are
+    committed a chunk at a time so that an interrupted task can resume, and
+    are moved into the variant table by `Variant.create_from_staged` once
+    every chunk has been written.
+
+    Attributes
+    ----------
+    reference : `str`, required.
+        Staging reference of the upload the row was loaded from.
+
+    number : `int`, required.
+        One-based position of the row in the upload, used to number the urn
+        of the variant.
+    """
+
+    class Meta:
+        verbose_name = "Staged variant"
+        verbose_name_plural = "Staged variants"
+        unique_together = ("scoreset", "reference", "number")
+
+    scoreset = models.ForeignKey(
+        to="dataset.ScoreSet",
+        on_delete=models.CASCADE,
+        related_name="staged_variants",
+    )
+    reference = models.CharField(max_length=32)
+    number = models.PositiveIntegerField()
+    hgvs_nt = models.TextField(null=True, default=None)
+    hgvs_splice = models.TextField(null=True, default=None)
+    hgvs_pro = models.TextField(null=True, default=None)
+    data = JSONField(default=default_data_dict)
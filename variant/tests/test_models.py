@@ -6,8 +6,8 @@ import dataset.constants as constants
 from dataset.factories import ScoreSetFactory
 from dataset.utilities import publish_dataset
 from urn.validators import MAVEDB_VARIANT_URN_RE
-from ..factories import VariantFactory
-from ..models import assign_public_urn, Variant
+from ..factories import make_data, VariantFactory
+from ..models import assign_public_urn, StagedVariant, Variant
 
 
 class TestVariant(TestCase):
@@ -187,6 +187,379 @@ class TestVariant(TestCase):
         )
         self.assertDictEqual(variants[1].data, variant_kwargs_list[1]["data"])
 
+    def test_copy_loader_creates_same_variants_as_orm_loader(self):
+        column = constants.required_score_column
+        variant_kwargs_list = [
+            {
+                constants.hgvs_nt_column: "g.1A>G",
+                constants.hgvs_pro_column: None,
+                constants.hgvs_splice_column: "c.1A>G",
+                "data": {
+                    constants.variant_score_data: {
+                        column: 0.5,
+                        "note": 'tab\tnew\nline \\ "quoted" \u00e9',
+                    },
+                    constants.variant_count_data: {},
+                },
+            },
+            {
+                constants.hgvs_nt_column: None,
+                constants.hgvs_pro_column: "p.G5Y",
+                constants.hgvs_splice_column: None,
+                "data": {
+                    constants.variant_score_data: {column: None, "note": ""},
+                    constants.variant_count_data: {},
+                },
+            },
+        ]
+        loaded = []
+        for use_copy in (False, True):
+            parent = ScoreSetFactory(
+                dataset_columns={
+                    constants.score_columns: [column, "note"],
+                    constants.count_columns: [],
+                }
+            )
+            count = Variant.bulk_create(
+                parent, variant_kwargs_list, use_copy=use_copy
+            )
+            self.assertEqual(count, 2)
+            loaded.append(
+                [
+                    (
+                        v.urn.replace(parent.urn, ""),
+                        v.hgvs_nt,
+                        v.hgvs_splice,
+                        v.hgvs_pro,
+                        v.data,
+                        v.creation_date,
+                    )
+                    for v in parent.variants.order_by("urn")
+                ]
+            )
+
+        self.assertListEqual(loaded[0], loaded[1])
+
+    @mock.patch.object(Variant, "copy_create")
+    def test_bulk_create_uses_orm_loader_on_other_databases(self, patch):
+        parent = ScoreSetFactory()
+        with mock.patch("variant.models.connection") as connection:
+            connection.vendor = "sqlite"
+            Variant.bulk_create(
+                parent, [{"hgvs_nt": "g.1A>G", "data": make_data()}]
+            )
+        patch.assert_not_called()
+
+    def test_bulk_diff_only_writes_changed_variants(self):
+        def variant(position, score):
+            return {
+                constants.hgvs_nt_column: "g.{}A>G".format(position),
+                "data": {
+                    constants.variant_score_data: {"score": score},
+                    constants.variant_count_data: {},
+                },
+            }
+
+        parent = ScoreSetFactory()
+        Variant.bulk_create(parent, [variant(i, 0.5) for i in (1, 2, 3)])
+        counts = Variant.bulk_diff(
+            parent,
+            [variant(2, 1.0), variant(3, 0.5), variant(4, 0.5)],
+            key=constants.hgvs_nt_column,
+        )
+        self.assertDictEqual(
+            counts, {"created": 1, "updated": 2, "deleted": 1, "unchanged": 0}
+        )
+
+        variants = {v.hgvs_nt: v for v in parent.variants.all()}
+        self.assertListEqual(sorted(variants), ["g.2A>G", "g.3A>G", "g.4A>G"])
+        self.assertEqual(
+            variants["g.2A>G"].data[constants.variant_score_data]["score"],
+            1.0,
+        )
+        parent.refresh_from_db()
+        self.assertEqual(parent.last_child_value, 3)
+
+    def test_bulk_diff_numbers_variants_in_incoming_order(self):
+        data = make_data()
+
+        def variant(position):
+            return {
+                constants.hgvs_nt_column: "g.{}A>G".format(position),
+                "data": data,
+            }
+
+        parent = ScoreSetFactory()
+        Variant.bulk_create(parent, [variant(i) for i in (1, 2, 3)])
+        counts = Variant.bulk_diff(
+            parent,
+            [variant(3), variant(4), variant(1)],
+            key=constants.hgvs_nt_column,
+        )
+        self.assertDictEqual(
+            counts, {"created": 1, "updated": 2, "deleted": 1, "unchanged": 0}
+        )
+        self.assertListEqual(
+            list(
+                parent.variants.order_by("number").values_list(
+                    "urn", "number", "hgvs_nt"
+                )
+            ),
+            [
+                ("{}#1".format(parent.urn), 1, "g.3A>G"),
+                ("{}#2".format(parent.urn), 2, "g.4A>G"),
+                ("{}#3".format(parent.urn), 3, "g.1A>G"),
+            ],
+        )
+
+    def test_bulk_diff_does_not_write_variants_keeping_their_position(self):
+        data = make_data()
+
+        def variant(position):
+            return {
+                constants.hgvs_nt_column: "g.{}A>G".format(position),
+                "data": data,
+            }
+
+        parent = ScoreSetFactory()
+        Variant.bulk_create(parent, [variant(i) for i in (1, 2)])
+        with mock.patch.object(Variant, "update_rows") as update_rows:
+            counts = Variant.bulk_diff(
+                parent,
+                [variant(1), variant(2), variant(3)],
+                key=constants.hgvs_nt_column,
+            )
+        update_rows.assert_called_once_with([])
+        self.assertDictEqual(
+            counts, {"created": 1, "updated": 0, "deleted": 0, "unchanged": 2}
+        )
+        self.assertEqual(
+            parent.variants.get(hgvs_nt="g.3A>G").urn,
+            "{}#3".format(parent.urn),
+        )
+
+    @mock.patch.object(Variant, "bulk_delete", wraps=Variant.bulk_delete)
+    def test_bulk_diff_deletes_unmatched_variants_with_bulk_delete(
+        self, bulk_delete
+    ):
+        parent = ScoreSetFactory()
+        Variant.bulk_create(
+            parent,
+            [
+                {constants.hgvs_nt_column: "g.1A>G", "data": make_data()},
+                {constants.hgvs_nt_column: "g.2A>G", "data": make_data()},
+            ],
+        )
+        removed = parent.variants.get(hgvs_nt="g.1A>G")
+        Variant.bulk_diff(
+            parent,
+            [{constants.hgvs_nt_column: "g.2A>G", "data": make_data()}],
+            key=constants.hgvs_nt_column,
+        )
+        bulk_delete.assert_called_once_with(parent, pks=[removed.pk])
+        self.assertListEqual(
+            list(parent.variants.values_list("hgvs_nt", flat=True)),
+            ["g.2A>G"],
+        )
+
+    def test_publish_keeps_order_of_diffed_variants(self):
+        data = make_data()
+
+        def variant(position):
+            return {
+                constants.hgvs_nt_column: "g.{}A>G".format(position),
+                "data": data,
+            }
+
+        parent = ScoreSetFactory()
+        Variant.bulk_create(parent, [variant(i) for i in (1, 2, 3)])
+        Variant.bulk_diff(
+            parent,
+            [variant(3), variant(4), variant(1)],
+            key=constants.hgvs_nt_column,
+        )
+
+        parent = publish_dataset(parent)
+        self.assertListEqual(
+            list(
+                parent.variants.order_by("number").values_list(
+                    "urn", "hgvs_nt"
+                )
+            ),
+            [
+                ("{}#1".format(parent.urn), "g.3A>G"),
+                ("{}#2".format(parent.urn), "g.4A>G"),
+                ("{}#3".format(parent.urn), "g.1A>G"),
+            ],
+        )
+
+    def test_bulk_diff_returns_none_if_variants_cannot_be_matched(self):
+        parent = ScoreSetFactory()
+        Variant.bulk_create(
+            parent,
+            [{constants.hgvs_nt_column: "g.1A>G", "data": make_data()}],
+        )
+        counts = Variant.bulk_diff(
+            parent,
+            [
+                {constants.hgvs_nt_column: "g.2A>G"},
+                {constants.hgvs_nt_column: "g.2A>G"},
+            ],
+            key=constants.hgvs_nt_column,
+        )
+        self.assertIsNone(counts)
+        self.assertEqual(parent.variants.get().hgvs_nt, "g.1A>G")
+
+    def test_bulk_create_validates_columns_before_writing(self):
+        parent = ScoreSetFactory()
+        with self.assertRaises(ValidationError):
+            Variant.bulk_create(
+                parent,
+                [
+                    {"hgvs_nt": "g.1A>G", "data": make_data()},
+                    {
+                        "hgvs_nt": "g.2A>G",
+                        "data": {
+                            constants.variant_score_data: {"other": 1},
+                            constants.variant_count_data: {},
+                        },
+                    },
+                ],
+            )
+        self.assertEqual(parent.variants.count(), 0)
+
+    def test_save_sets_number_from_urn(self):
+        variant = VariantFactory()
+        self.assertIsNone(variant.number)
+        variant.urn = "{}#12".format(variant.scoreset.urn)
+        variant.save()
+        self.assertEqual(Variant.objects.get(pk=variant.pk).number, 12)
+
+    def test_bulk_create_sets_number(self):
+        for use_copy in (False, True):
+            parent = ScoreSetFactory()
+            parent.last_child_value = 8
+            Variant.bulk_create(
+                parent,
+                [
+                    {"hgvs_nt": "g.{}A>G".format(i + 1), "data": make_data()}
+                    for i in range(3)
+                ],
+                use_copy=use_copy,
+            )
+            self.assertListEqual(
+                list(
+                    parent.variants.order_by("number").values_list(
+                        "number", flat=True
+                    )
+                ),
+                [9, 10, 11],
+            )
+
+    def test_validate_stored_columns_checks_each_variant(self):
+        parent = ScoreSetFactory()
+        Variant.bulk_create(
+            parent,
+            [
+                {"hgvs_nt": "g.{}A>G".format(i), "data": make_data()}
+                for i in (1, 2, 3)
+            ],
+        )
+        self.assertEqual(Variant.validate_stored_columns(parent), 3)
+
+        parent.variants.filter(hgvs_nt="g.2A>G").update(
+            data={
+                constants.variant_score_data: {"other": 1},
+                constants.variant_count_data: {},
+            }
+        )
+        with self.assertRaises(ValidationError):
+            Variant.validate_stored_columns(parent)
+
+    def test_validate_stored_columns_requires_score_and_count_data(self):
+        parent = ScoreSetFactory()
+        Variant.bulk_create(
+            parent, [{"hgvs_nt": "g.1A>G", "data": make_data()}]
+        )
+        parent.variants.update(
+            data={constants.variant_score_data: {"score": 1}}
+        )
+        with self.assertRaises(ValidationError):
+            Variant.validate_stored_columns(parent)
+
+    def test_renumber_urns_numbers_variants_of_parent_only(self):
+        parent = ScoreSetFactory()
+        variants = [VariantFactory(scoreset=parent) for _ in range(3)]
+        other = VariantFactory()
+
+        self.assertEqual(Variant.renumber_urns(parent), 3)
+        for (i, variant) in enumerate(variants, start=1):
+            variant.refresh_from_db()
+            self.assertEqual(variant.urn, "{}#{}".format(parent.urn, i))
+            self.assertEqual(variant.number, i)
+        parent.refresh_from_db()
+        self.assertEqual(parent.last_child_value, 3)
+        self.assertEqual(Variant.objects.get(pk=other.pk).urn, other.urn)
+
+    def test_renumber_urns_by_number_keeps_current_order(self):
+        parent = ScoreSetFactory()
+        variants = [
+            VariantFactory(
+                scoreset=parent, urn="{}#{}".format(parent.urn, number)
+            )
+            for number in (5, 2)
+        ]
+
+        Variant.renumber_urns(parent, by_number=True)
+        for (variant, number) in zip(variants, (2, 1)):
+            variant.refresh_from_db()
+            self.assertEqual(variant.number, number)
+
+    def test_renumber_urns_closes_gaps_without_duplicate_urns(self):
+        parent = ScoreSetFactory()
+        numbers = (3, 2, 5)
+        variants = [
+            VariantFactory(
+                scoreset=parent, urn="{}#{}".format(parent.urn, number)
+            )
+            for number in numbers
+        ]
+
+        # Each variant takes an urn held by another variant until renumbered.
+        Variant.renumber_urns(parent, by_number=True)
+        for (variant, number) in zip(variants, (2, 1, 3)):
+            variant.refresh_from_db()
+            self.assertEqual(variant.urn, "{}#{}".format(parent.urn, number))
+
+        Variant.renumber_urns(parent)
+        for (variant, number) in zip(variants, (1, 2, 3)):
+            variant.refresh_from_db()
+            self.assertEqual(variant.urn, "{}#{}".format(parent.urn, number))
+
+    def test_create_from_staged_numbers_urns_in_staged_order(self):
+        parent = ScoreSetFactory()
+        for number in (2, 1):
+            StagedVariant.objects.create(
+                scoreset=parent,
+                reference="a" * 32,
+                number=number,
+                hgvs_nt="g.{}A>G".format(number),
+            )
+        StagedVariant.objects.create(
+            scoreset=parent, reference="b" * 32, number=1
+        )
+
+        count = Variant.create_from_staged(parent, "a" * 32)
+        self.assertEqual(count, 2)
+
+        parent.refresh_from_db()
+        self.assertEqual(parent.last_child_value, 2)
+        self.assertEqual(parent.staged_variants.count(), 0)
+        self.assertEqual(
+            parent.variants.get(hgvs_nt="g.2A>G").urn,
+            "{}#{}".format(parent.urn, 2),
+        )
+
 
 class TestAssignPublicUrn(TestCase):
     def setUp(self):
@@ -281,3 +281,39 @@ class TestCreateVariantAttrsUtility(TestCase):
         )
         self.assertIsNone(variants[1][constants.hgvs_pro_column])
         self.assertIsNone(variants[1][constants.hgvs_splice_column])
+
+    def test_converts_null_value_strings_to_none(self):
+        d1, d2 = self.fixture_data()
+        d1[constants.hgvs_pro_column] = ["NA", " "]
+        d1["note"] = ["none", "a"]
+        d2[constants.hgvs_pro_column] = ["NA", " "]
+
+        variants = utilities.convert_df_to_variant_records(d1, d2)
+        self.assertIsNone(variants[0][constants.hgvs_pro_column])
+        self.assertIsNone(variants[1][constants.hgvs_pro_column])
+        self.assertIsNone(
+            variants[0]["data"][constants.variant_score_data]["note"]
+        )
+        self.assertEqual(
+            variants[1]["data"][constants.variant_score_data]["note"], "a"
+        )
+
+    def test_aligns_count_rows_to_score_rows(self):
+        d1, d2 = self.fixture_data()
+        variants = utilities.convert_df_to_variant_records(d1, d2.iloc[::-1])
+        self.assertEqual(variants[0][constants.hgvs_nt_column], "c.1A>G")
+        self.assertEqual(
+            variants[0]["data"][constants.variant_count_data], {"count": 1}
+        )
+        self.assertEqual(
+            variants[1]["data"][constants.variant_count_data], {"count": 2}
+        )
+
+    def test_iter_variant_records_yields_batches(self):
+        d1, d2 = self.fixture_data()
+        batches = list(utilities.iter_variant_records(d1, d2, batch_size=1))
+        self.assertEqual(len(batches), 2)
+        self.assertListEqual(
+            [v for batch in batches for v in batch],
+            utilities.convert_df_to_variant_records(d1, d2),
+        )
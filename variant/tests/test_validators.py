@@ -1,20 +1,31 @@
+import random
 from io import BytesIO, StringIO
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+from fqfa.constants import AA_CODES
+from mavehgvs import MaveHgvsParseError, Variant
 from django.core.exceptions import ValidationError
-from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, mock, override_settings
 from pandas.testing import assert_index_equal, assert_frame_equal
 
 from core.utilities import null_values_list
 from dataset import constants
+from dataset.factories import ScoreSetFactory
 
 from ..factories import generate_hgvs, VariantFactory
 from ..validators import (
+    HGVSParseCache,
     MaveDataset,
+    ValidatedDatasetCache,
+    validate_all_columns_match,
     validate_columns_match,
     validate_variant_json,
     validate_hgvs_string,
 )
+from ..validators.dataset import _parse_simple_variant
 
 
 class TestValidateMatchingColumns(TestCase):
@@ -51,6 +62,57 @@ class TestValidateMatchingColumns(TestCase):
         validate_columns_match(variant, variant.scoreset)
 
 
+class TestValidateAllColumnsMatch(TestCase):
+    def setUp(self):
+        self.scoreset = ScoreSetFactory(
+            dataset_columns={
+                constants.score_columns: ["score", "se"],
+                constants.count_columns: ["count"],
+            }
+        )
+
+    @staticmethod
+    def data(scores, counts):
+        return {
+            constants.variant_score_data: {c: 1 for c in scores},
+            constants.variant_count_data: {c: 1 for c in counts},
+        }
+
+    def test_returns_number_of_variants_validated(self):
+        data = [self.data(["se", "score"], ["count"])] * 3
+        self.assertEqual(validate_all_columns_match(data, self.scoreset), 3)
+
+    def test_validation_error_non_matching_score_columns(self):
+        data = [
+            self.data(["score", "se"], ["count"]),
+            self.data(["score"], ["count"]),
+        ]
+        with self.assertRaises(ValidationError):
+            validate_all_columns_match(data, self.scoreset)
+
+    def test_validation_error_non_matching_count_columns(self):
+        data = [self.data(["score", "se"], ["count", "other"])]
+        with self.assertRaises(ValidationError):
+            validate_all_columns_match(data, self.scoreset)
+
+    def test_validation_error_missing_data_key(self):
+        data = [{constants.variant_score_data: {"score": 1, "se": 1}}]
+        with self.assertRaises(ValidationError):
+            validate_all_columns_match(data, self.scoreset)
+
+    def test_accepts_empty_counts_equal_to_scores(self):
+        self.scoreset.dataset_columns[constants.count_columns] = [
+            "se",
+            "score",
+        ]
+        data = [self.data(["score", "se"], [])]
+        validate_all_columns_match(data, self.scoreset)
+
+        self.scoreset.dataset_columns[constants.count_columns] = ["count"]
+        with self.assertRaises(ValidationError):
+            validate_all_columns_match(data, self.scoreset)
+
+
 class TestHGVSValidator(TestCase):
     """
     Tests the function :func:`validate_hgvs_string` to see if it is able
@@ -141,6 +203,253 @@ class TestVariantJsonValidator(TestCase):
             data[key] = {}
 
 
+class TestHGVSParseCache(TestCase):
+    def test_counts_hits_and_misses(self):
+        cache = HGVSParseCache()
+        self.assertIsNone(cache.get("c.1A>G", None, False))
+        cache.set("c.1A>G", None, False, ("c.1A>G", "c", None))
+        self.assertEqual(
+            cache.get("c.1A>G", None, False), ("c.1A>G", "c", None)
+        )
+
+        info = cache.info()
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.currsize, 1)
+
+    def test_keys_include_targetseq_and_relaxed_ordering(self):
+        cache = HGVSParseCache()
+        cache.set("c.1A>G", None, False, ("c.1A>G", "c", None))
+        self.assertIsNone(cache.get("c.1A>G", "ATG", False))
+        self.assertIsNone(cache.get("c.1A>G", None, True))
+
+    def test_evicts_least_recently_used(self):
+        cache = HGVSParseCache(maxsize=2)
+        cache.set("c.1A>G", None, False, ("c.1A>G", "c", None))
+        cache.set("c.2A>G", None, False, ("c.2A>G", "c", None))
+        cache.get("c.1A>G", None, False)
+        cache.set("c.3A>G", None, False, ("c.3A>G", "c", None))
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get("c.1A>G", None, False))
+        self.assertIsNone(cache.get("c.2A>G", None, False))
+
+    def test_datasets_sharing_a_cache_only_parse_variants_once(self):
+        cache = HGVSParseCache()
+        scores = MaveDataset.for_scores(
+            StringIO("hgvs_nt,score\nc.1A>G,0.5\nc.2X>G,0.5")
+        )
+        scores.validate(cache=cache)
+        counts = MaveDataset.for_counts(
+            StringIO("hgvs_nt,count\nc.1A>G,1\nc.2X>G,1")
+        )
+        counts.validate(cache=cache)
+
+        self.assertEqual(cache.info().misses, 2)
+        self.assertEqual(cache.info().hits, 2)
+        self.assertListEqual(scores.errors, counts.errors)
+
+
+@override_settings(
+    CACHES={
+        "validation": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "test-validation",
+        }
+    }
+)
+class TestValidatedDatasetCache(TestCase):
+    def setUp(self):
+        self.cache = ValidatedDatasetCache()
+        self.cache.backend.clear()
+        self.targetseq = "ATGAAA"
+
+    def validated_scores(self, data):
+        dataset = MaveDataset.for_scores(StringIO(data))
+        dataset.validate(targetseq=self.targetseq, relaxed_ordering=True)
+        return dataset
+
+    def test_digest_is_the_same_for_uploads_and_handles(self):
+        content = b"hgvs_nt,score\nc.1A>G,0.5\n"
+        upload = SimpleUploadedFile("scores.csv", content)
+        self.assertEqual(
+            ValidatedDatasetCache.digest(upload),
+            ValidatedDatasetCache.digest(BytesIO(content)),
+        )
+        self.assertEqual(
+            ValidatedDatasetCache.digest(upload),
+            ValidatedDatasetCache.digest(StringIO(content.decode())),
+        )
+        self.assertEqual(upload.tell(), 0)
+
+    def test_returns_equal_valid_dataset(self):
+        dataset = self.validated_scores("hgvs_nt,score\nc.1A>G,0.5\n")
+        self.assertTrue(
+            self.cache.set(
+                "abc",
+                MaveDataset.DatasetType.SCORES,
+                self.targetseq,
+                True,
+                dataset,
+            )
+        )
+
+        cached = self.cache.get(
+            "abc", MaveDataset.DatasetType.SCORES, self.targetseq, True
+        )
+        self.assertTrue(cached.is_valid)
+        self.assertEqual(cached.label, "scores")
+        self.assertEqual(cached.index_column, dataset.index_column)
+        assert_frame_equal(cached.data(), dataset.data())
+
+    def test_keys_include_targetseq_relaxed_ordering_and_type(self):
+        dataset = self.validated_scores("hgvs_nt,score\nc.1A>G,0.5\n")
+        self.cache.set(
+            "abc",
+            MaveDataset.DatasetType.SCORES,
+            self.targetseq,
+            True,
+            dataset,
+        )
+        for args in [
+            ("abd", MaveDataset.DatasetType.SCORES, self.targetseq, True),
+            ("abc", MaveDataset.DatasetType.COUNTS, self.targetseq, True),
+            ("abc", MaveDataset.DatasetType.SCORES, "ATGAAC", True),
+            ("abc", MaveDataset.DatasetType.SCORES, self.targetseq, False),
+        ]:
+            self.assertIsNone(self.cache.get(*args))
+
+    def test_does_not_cache_invalid_dataset(self):
+        dataset = self.validated_scores("hgvs_nt,score\nc.1T>G,0.5\n")
+        self.assertFalse(dataset.is_valid)
+        self.assertFalse(
+            self.cache.set(
+                "abc",
+                MaveDataset.DatasetType.SCORES,
+                self.targetseq,
+                True,
+                dataset,
+            )
+        )
+        self.assertIsNone(
+            self.cache.get(
+                "abc", MaveDataset.DatasetType.SCORES, self.targetseq, True
+            )
+        )
+
+    def test_does_not_cache_dataset_over_max_rows(self):
+        dataset = self.validated_scores(
+            "hgvs_nt,score\nc.1A>G,0.5\nc.2T>G,0.5\n"
+        )
+        cache = ValidatedDatasetCache(max_rows=1)
+        self.assertFalse(
+            cache.set(
+                "abc",
+                MaveDataset.DatasetType.SCORES,
+                self.targetseq,
+                True,
+                dataset,
+            )
+        )
+        self.assertIsNone(
+            cache.get(
+                "abc", MaveDataset.DatasetType.SCORES, self.targetseq, True
+            )
+        )
+
+
+class TestParseSimpleVariant(TestCase):
+    """
+    Tests that the simple variant fast path used during dataset validation
+    agrees with `mavehgvs`.
+    """
+
+    @staticmethod
+    def parse_with_mavehgvs(variant, targetseq=None):
+        try:
+            parsed = Variant(variant, targetseq=targetseq)
+            return str(parsed), parsed.prefix, None
+        except MaveHgvsParseError as error:
+            return None, None, str(error)
+
+    @staticmethod
+    def random_variant(rng):
+        amino_acids = list(AA_CODES.values()) + ["Xaa", "ala"]
+        position = rng.choice(
+            [str(rng.randint(1, 40)), "0", "01", "-3", "*4", "3+1"]
+        )
+        if rng.random() < 0.5:
+            return "{}.{}{}>{}".format(
+                rng.choice("cgmnorpC"),
+                position,
+                rng.choice("ACGTNa"),
+                rng.choice("ACGTN"),
+            )
+        return "{}.{}{}{}".format(
+            rng.choice("pcP"),
+            rng.choice(amino_acids),
+            position,
+            rng.choice(amino_acids + ["=", "fs", "del"]),
+        )
+
+    def test_returns_none_for_variants_that_are_not_simple(self):
+        for variant in (
+            "c.1_2del",
+            "c.1+3A>G",
+            "c.*4A>G",
+            "NM_1:c.1A>G",
+            "p.[Ala1Gly;Ala2Gly]",
+            "r.1a>g",
+        ):
+            with self.subTest(msg=variant):
+                self.assertIsNone(_parse_simple_variant(variant))
+
+    def test_parses_synonymous_protein_variants(self):
+        for variant in ("p.(=)", "p.="):
+            with self.subTest(msg=variant):
+                self.assertEqual(
+                    _parse_simple_variant(variant, targetseq="MA"),
+                    (variant, "p", None),
+                )
+
+    def test_validates_against_target_sequence(self):
+        self.assertEqual(
+            _parse_simple_variant("p.Ter3Gly", targetseq="MA*"),
+            ("p.Ter3Gly", "p", None),
+        )
+        self.assertEqual(
+            _parse_simple_variant("c.2A>G", targetseq="ATG")[2],
+            "variant reference does not match target",
+        )
+        self.assertEqual(
+            _parse_simple_variant("c.4A>G", targetseq="ATG")[2],
+            "variant coordinate out of bounds",
+        )
+
+    def test_agrees_with_mavehgvs_on_random_variants(self):
+        rng = random.Random(0)
+        n_simple = 0
+        for _ in range(20000):
+            variant = self.random_variant(rng)
+            targetseq = rng.choice(
+                [
+                    None,
+                    "".join(rng.choice("ACGT") for _ in range(30)),
+                    "".join(rng.choice(list(AA_CODES)) for _ in range(20)),
+                ]
+            )
+            parsed = _parse_simple_variant(variant, targetseq=targetseq)
+            if parsed is None:
+                continue
+            n_simple += 1
+            self.assertEqual(
+                parsed,
+                self.parse_with_mavehgvs(variant, targetseq=targetseq),
+                msg=f"{variant} with target {targetseq}",
+            )
+        self.assertGreater(n_simple, 0)
+
+
 class TestMaveDataset(TestCase):
     """
     Tests the validator :func:`validate_variant_rows` to check if the correct
@@ -800,3 +1109,333 @@ class TestMaveDataset(TestCase):
 
     def test_invalid_relaxed_ordering_check_fails(self):
         self.fail("Test is pending")
+
+    def test_parallel_validation_matches_serial_validation(self):
+        rows = [f"c.{i + 1}A>G,p.Ile{i + 1}Val,0.5" for i in range(30)]
+        rows[3] = "c.4A>G,p.Ile4Xyz,0.5"
+        rows[17] = "c.18X>G,p.Ile18Val,0.5"
+        rows[21] = "g.22A>G,p.Ile22Val,0.5"
+        data = "{},{},{}\n{}".format(
+            self.HGVS_NT_COL,
+            self.HGVS_PRO_COL,
+            self.SCORE_COL,
+            "\n".join(rows),
+        )
+
+        serial = MaveDataset.for_scores(StringIO(data))
+        serial.validate(n_jobs=1)
+
+        with mock.patch.object(MaveDataset, "PARALLEL_MIN_ROWS", 1):
+            with mock.patch.object(MaveDataset, "PARALLEL_CHUNK_SIZE", 4):
+                parallel = MaveDataset.for_scores(StringIO(data))
+                parallel.validate(n_jobs=2)
+
+        self.assertFalse(parallel.is_valid)
+        self.assertListEqual(serial.errors, parallel.errors)
+
+    def test_parallel_validation_normalizes_variants(self):
+        rows = [f"c.{i + 1}A>G,p.Ile{i + 1}Val,0.5" for i in range(30)]
+        data = "{},{},{}\n{}".format(
+            self.HGVS_NT_COL,
+            self.HGVS_PRO_COL,
+            self.SCORE_COL,
+            "\n".join(rows),
+        )
+
+        serial = MaveDataset.for_scores(StringIO(data))
+        serial.validate(n_jobs=1)
+
+        with mock.patch.object(MaveDataset, "PARALLEL_MIN_ROWS", 1):
+            with mock.patch.object(MaveDataset, "PARALLEL_CHUNK_SIZE", 4):
+                parallel = MaveDataset.for_scores(StringIO(data))
+                parallel.validate(n_jobs=2)
+
+        self.assertTrue(parallel.is_valid)
+        assert_frame_equal(serial.data(), parallel.data())
+
+    def test_reading_in_chunks_matches_reading_in_one_chunk(self):
+        rows = [f"c.{i + 1}A>G,{i},NA" for i in range(25)]
+        data = "{},{},other\n{}".format(
+            self.HGVS_NT_COL, self.SCORE_COL, "\n".join(rows)
+        )
+
+        chunked = MaveDataset.for_scores(StringIO(data), parse_chunk_size=4)
+        chunked.validate()
+        whole = MaveDataset.for_scores(StringIO(data), parse_chunk_size=100)
+        whole.validate()
+
+        self.assertTrue(chunked.is_valid)
+        assert_frame_equal(chunked.data(), whole.data())
+
+    def test_reads_column_changing_type_between_chunks_as_text(self):
+        rows = [
+            f"c.{i + 1}A>G,{i},{i if i < 10 else f'x{i}'}" for i in range(25)
+        ]
+        data = "{},{},other\n{}".format(
+            self.HGVS_NT_COL, self.SCORE_COL, "\n".join(rows)
+        )
+
+        chunked = MaveDataset.for_scores(StringIO(data), parse_chunk_size=4)
+        chunked.validate()
+        whole = MaveDataset.for_scores(StringIO(data), parse_chunk_size=100)
+        whole.validate()
+
+        self.assertTrue(chunked.is_valid)
+        assert_frame_equal(chunked.data(), whole.data())
+        self.assertTrue(
+            all(isinstance(v, str) for v in chunked.data()["other"])
+        )
+
+    def test_reads_binary_file_handles(self):
+        data = "{},{}\nc.1A>G,NA\n".format(self.HGVS_NT_COL, self.SCORE_COL)
+
+        dataset = MaveDataset.for_scores(BytesIO(data.encode("utf-8")))
+        dataset.validate()
+
+        self.assertTrue(dataset.is_valid)
+        self.assertListEqual(
+            list(dataset.data(serializable=True)[self.SCORE_COL]), [None]
+        )
+
+    def test_reuses_reference_variants_in_matching_rows(self):
+        scores = MaveDataset.for_scores(
+            StringIO("hgvs_nt,score\nc.1A>G,0.5\nc.2A>G,0.5")
+        )
+        scores.validate()
+        counts = MaveDataset.for_counts(
+            StringIO("hgvs_nt,count\nc.1A>G,1\nc.3A>G,1")
+        )
+
+        with mock.patch.object(
+            MaveDataset, "_parse_variants", autospec=True
+        ) as patch:
+            patch.side_effect = lambda self, variants, **kwargs: [
+                (v, "c", None) for v in variants
+            ]
+            counts.validate(reference=scores)
+
+        self.assertTrue(counts.is_valid)
+        patch.assert_called_once()
+        self.assertListEqual(patch.call_args[0][1], ["c.3A>G"])
+
+    def test_does_not_reuse_reference_validated_with_other_targetseq(self):
+        scores = MaveDataset.for_scores(StringIO("hgvs_nt,score\nc.1A>G,0.5"))
+        scores.validate()
+        counts = MaveDataset.for_counts(StringIO("hgvs_nt,count\nc.1A>G,1"))
+        counts.validate(targetseq="TTT", reference=scores)
+
+        self.assertFalse(counts.is_valid)
+
+    def test_does_not_reuse_column_validated_with_other_targetseq(self):
+        # Protein variants are not checked against the target sequence when
+        # transcript variants are given, as in the scores but not the counts.
+        scores = MaveDataset.for_scores(
+            StringIO(
+                "hgvs_nt,hgvs_splice,hgvs_pro,score\n"
+                "g.1A>G,c.1A>G,p.Leu1Val,0.5"
+            )
+        )
+        scores.validate(targetseq="ATGAAA")
+        self.assertTrue(scores.is_valid)
+
+        data = "hgvs_nt,hgvs_pro,count\nc.1A>G,p.Leu1Val,1"
+        with_reference = MaveDataset.for_counts(StringIO(data))
+        with_reference.validate(targetseq="ATGAAA", reference=scores)
+        without_reference = MaveDataset.for_counts(StringIO(data))
+        without_reference.validate(targetseq="ATGAAA")
+
+        self.assertFalse(without_reference.is_valid)
+        self.assertListEqual(with_reference.errors, without_reference.errors)
+
+    def test_reference_does_not_change_validation_result(self):
+        scores = MaveDataset.for_scores(
+            StringIO("hgvs_nt,hgvs_pro,score\nc.1A>G,p.Ile1Val,0.5")
+        )
+        scores.validate()
+        data = "hgvs_nt,hgvs_pro,count\nc.1A>G,p.Ile1Xyz,1"
+
+        with_reference = MaveDataset.for_counts(StringIO(data))
+        with_reference.validate(reference=scores)
+        without_reference = MaveDataset.for_counts(StringIO(data))
+        without_reference.validate()
+
+        self.assertListEqual(with_reference.errors, without_reference.errors)
+
+    def test_replaces_mixed_case_and_padded_null_values_in_text_columns(self):
+        for value in ("Null", "N/A", "  NA ", " "):
+            with self.subTest(msg=f"'{value}'"):
+                data = "{},{},other\n{},1.0,{}\n{},1.0,text".format(
+                    self.HGVS_NT_COL,
+                    self.SCORE_COL,
+                    generate_hgvs(prefix="c"),
+                    value,
+                    generate_hgvs(prefix="c"),
+                )
+
+                dataset = MaveDataset.for_scores(StringIO(data))
+                dataset.validate()
+
+                self.assertTrue(dataset.is_valid)
+                self.assertListEqual(
+                    list(dataset.data(serializable=True)["other"]),
+                    [None, "text"],
+                )
+
+    def test_reads_boolean_column_with_null_values(self):
+        data = "{},{},flag\n{},1.0,True\n{},1.0,NA\n{},1.0,False".format(
+            self.HGVS_NT_COL,
+            self.SCORE_COL,
+            generate_hgvs(prefix="c"),
+            generate_hgvs(prefix="c"),
+            generate_hgvs(prefix="c"),
+        )
+
+        dataset = MaveDataset.for_scores(StringIO(data))
+        dataset.validate()
+
+        self.assertTrue(dataset.is_valid)
+        self.assertListEqual(
+            list(dataset.data(serializable=True)["flag"]), [True, None, False]
+        )
+
+    def test_does_not_replace_variants_containing_null_substrings(self):
+        data = "{},{},{}\nc.1A>G,p.Ala1_Ala2delinsAsnAla,1.0".format(
+            self.HGVS_NT_COL, self.HGVS_PRO_COL, self.SCORE_COL
+        )
+
+        dataset = MaveDataset.for_scores(StringIO(data))
+        dataset.validate()
+
+        self.assertTrue(dataset.is_valid)
+        self.assertListEqual(
+            list(dataset.data()[self.HGVS_PRO_COL]),
+            ["p.Ala1_Ala2delinsAsnAla"],
+        )
+
+    def test_stops_validating_once_error_budget_is_spent(self):
+        data = "{},{}\n".format(self.HGVS_NT_COL, self.SCORE_COL) + "\n".join(
+            f"c.{i}X>G,1.0" for i in range(1, 11)
+        )
+
+        dataset = MaveDataset.for_scores(StringIO(data))
+        dataset.validate(max_errors=3)
+
+        self.assertFalse(dataset.is_valid)
+        self.assertTrue(dataset.errors_truncated)
+        self.assertEqual(dataset.n_errors, 3)
+        self.assertTrue(dataset.errors[0].startswith("c.1X>G"))
+
+    @mock.patch.object(MaveDataset, "ERROR_BUDGET_BLOCK_SIZE", 2)
+    def test_error_budget_does_not_parse_rows_past_the_current_block(self):
+        data = "{},{}\n".format(self.HGVS_NT_COL, self.SCORE_COL) + "\n".join(
+            f"c.{i}X>G,1.0" for i in range(1, 11)
+        )
+        dataset = MaveDataset.for_scores(StringIO(data))
+
+        with mock.patch.object(
+            MaveDataset, "_parse_variants", wraps=dataset._parse_variants
+        ) as patch:
+            dataset.validate(max_errors=2)
+
+        patch.assert_called_once()
+        self.assertListEqual(patch.call_args[0][0], ["c.1X>G", "c.2X>G"])
+
+    def test_error_budget_skips_later_columns_once_spent(self):
+        data = "{},{},{}\nc.1X>G,p.Foo1Bar,1.0".format(
+            self.HGVS_NT_COL, self.HGVS_PRO_COL, self.SCORE_COL
+        )
+
+        dataset = MaveDataset.for_scores(StringIO(data))
+        dataset.validate(max_errors=1)
+
+        self.assertEqual(dataset.n_errors, 1)
+        self.assertTrue(dataset.errors_truncated)
+
+    def test_not_truncated_when_error_budget_is_not_spent(self):
+        data = "{},{}\nc.1X>G,1.0\nc.1A>G,1.0".format(
+            self.HGVS_NT_COL, self.SCORE_COL
+        )
+
+        dataset = MaveDataset.for_scores(StringIO(data))
+        dataset.validate(max_errors=5)
+
+        self.assertEqual(dataset.n_errors, 1)
+        self.assertFalse(dataset.errors_truncated)
+
+    def test_reads_parquet_and_arrow_files_like_csv_files(self):
+        df = pd.DataFrame(
+            {
+                self.HGVS_NT_COL: ["c.1A>G", "c.2T>C"],
+                self.HGVS_PRO_COL: ["p.Met1Val", None],
+                self.SCORE_COL: [0.5, 1.0],
+                "other": ["text", "NA"],
+            }
+        )
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        expected = MaveDataset.for_scores(StringIO(df.to_csv(index=False)))
+        expected.validate(targetseq="ATGTCA")
+
+        parquet = BytesIO()
+        df.to_parquet(parquet)
+        arrow_file = BytesIO()
+        with pa.ipc.new_file(arrow_file, table.schema) as writer:
+            writer.write_table(table)
+        arrow_stream = BytesIO()
+        with pa.ipc.new_stream(arrow_stream, table.schema) as writer:
+            writer.write_table(table)
+
+        for file in (parquet, arrow_file, arrow_stream):
+            with self.subTest(msg=file.getvalue()[:6]):
+                dataset = MaveDataset.for_scores(file)
+                dataset.validate(targetseq="ATGTCA")
+
+                self.assertTrue(dataset.is_valid)
+                assert_frame_equal(dataset.data(), expected.data())
+
+    def test_reads_nullable_columns_of_parquet_files(self):
+        file = BytesIO()
+        pd.DataFrame(
+            {
+                self.HGVS_NT_COL: ["c.1A>G", "c.2T>C"],
+                self.SCORE_COL: [0.5, 1.0],
+                "flag": pd.array([True, None], dtype="boolean"),
+            }
+        ).to_parquet(file)
+
+        dataset = MaveDataset.for_scores(file)
+        dataset.validate()
+
+        self.assertTrue(dataset.is_valid)
+        self.assertListEqual(
+            list(dataset.data(serializable=True)["flag"]), [True, None]
+        )
+
+    def test_keeps_column_types_stored_in_parquet_files(self):
+        score = 0.1234567890123456789
+        file = BytesIO()
+        pd.DataFrame(
+            {
+                self.HGVS_NT_COL: ["c.1A>G"],
+                self.SCORE_COL: np.array([score], dtype=np.float64),
+                "count": np.array([3], dtype=np.int64),
+            }
+        ).to_parquet(file)
+
+        dataset = MaveDataset.for_scores(file)
+        dataset.validate()
+
+        self.assertTrue(dataset.is_valid)
+        self.assertEqual(dataset.data()[self.SCORE_COL].iloc[0], score)
+        self.assertEqual(dataset.data()["count"].dtype, np.int64)
+
+    def test_validates_hgvs_columns_of_parquet_files(self):
+        file = BytesIO()
+        pd.DataFrame(
+            {self.HGVS_NT_COL: ["c.1A>G", 2], self.SCORE_COL: [1.0, 2.0]}
+        ).astype({self.HGVS_NT_COL: str}).to_parquet(file)
+
+        dataset = MaveDataset.for_scores(file)
+        dataset.validate()
+
+        self.assertFalse(dataset.is_valid)
+        self.assertEqual(dataset.n_errors, 1)
@@ -1,8 +1,13 @@
+from typing import Iterator, List, Optional
+
 import numpy as np
 import pandas as pd
 from pandas.testing import assert_index_equal
 
-from core.utilities import is_null
+from core.utilities import null_mask
+
+# Number of variant records built at a time by `iter_variant_records`.
+RECORD_BATCH_SIZE = 50000
 
 
 def convert_df_to_variant_records(scores, counts=None, index=None):
@@ -34,6 +39,23 @@ def convert_df_to_variant_records(scores, counts=None, index=None):
         Formatted records that can be used to create `variant.models.Variant`
         instances.
     """
+    variants = []
+    for batch in iter_variant_records(scores, counts, index):
+        variants.extend(batch)
+    return variants
+
+
+def iter_variant_records(
+    scores, counts=None, index=None, batch_size: Optional[int] = None
+) -> Iterator[List[dict]]:
+    """
+    Generator version of `convert_df_to_variant_records` which yields the
+    records in lists of at most `batch_size` records.
+
+    Counts rows are aligned to scores rows with a single join on the primary
+    hgvs column, pairing duplicated variants in the order they appear, and
+    null values are converted to `None` a column at a time.
+    """
     from dataset.validators import validate_datasets_define_same_variants
     from dataset.constants import (
         hgvs_nt_column,
@@ -43,6 +65,9 @@ def convert_df_to_variant_records(scores, counts=None, index=None):
         variant_score_data,
     )
 
+    if batch_size is None:
+        batch_size = RECORD_BATCH_SIZE
+
     if isinstance(scores, str):
         scores = pd.read_json(scores, orient="records")
     if isinstance(counts, str):
@@ -57,7 +82,7 @@ def convert_df_to_variant_records(scores, counts=None, index=None):
             counts.index = pd.Index(counts[index])
 
     if not has_score_data:
-        return []
+        return
 
     if has_count_data:
         assert_index_equal(
@@ -65,58 +90,82 @@ def convert_df_to_variant_records(scores, counts=None, index=None):
         )
         validate_datasets_define_same_variants(scores, counts)
 
-    variants = []
-    for (primary_hgvs, group) in scores.groupby(by=scores.index, sort=False):
-        score_records = group.to_dict(orient="records")
+    hgvs_columns = [hgvs_nt_column, hgvs_splice_column, hgvs_pro_column]
+    if not scores.index.is_unique:
+        # Keep rows of the same variant together, ordered by where each
+        # variant first appears.
+        codes, _ = pd.factorize(scores.index)
+        scores = scores.iloc[np.argsort(codes, kind="stable")]
+    if has_count_data:
+        counts = _align_rows(counts, scores.index)
+
+    score_columns = [c for c in scores.columns if c not in hgvs_columns]
+    count_columns = []
+    if has_count_data:
+        count_columns = [c for c in counts.columns if c not in hgvs_columns]
+    # Count data equal to the score data is stored as empty, which is always
+    # the case when there is no count data.
+    compare_data = has_count_data and set(count_columns) == set(score_columns)
+
+    for start in range(0, len(scores), batch_size):
+        score_rows = scores.iloc[start : start + batch_size]
+        hgvs = zip(*(_column_values(score_rows[c]) for c in hgvs_columns))
+        score_records = _records(score_rows, score_columns)
         if has_count_data:
-            count_records = counts[counts.index == primary_hgvs].to_dict(
-                orient="records"
-            )
-            assert len(score_records) == len(count_records)
+            count_rows = counts.iloc[start : start + batch_size]
+            count_records = _records(count_rows, count_columns)
         else:
-            # Make duplicates to zip with self when no count data.
-            count_records = [r.copy() for r in score_records]
-
-        for (sr, cr) in zip(score_records, count_records):
-            hgvs_nt = sr.pop(hgvs_nt_column)
-            hgvs_splice = sr.pop(hgvs_splice_column)
-            hgvs_pro = sr.pop(hgvs_pro_column)
-
-            if is_null(hgvs_nt) or hgvs_nt is np.NaN or hgvs_nt == "nan":
-                hgvs_nt = None
-            if (
-                is_null(hgvs_splice)
-                or hgvs_splice is np.NaN
-                or hgvs_splice == "nan"
-            ):
-                hgvs_splice = None
-            if is_null(hgvs_pro) or hgvs_pro is np.NaN or hgvs_pro == "nan":
-                hgvs_pro = None
-
-            cr.pop(hgvs_nt_column)
-            cr.pop(hgvs_splice_column)
-            cr.pop(hgvs_pro_column)
-
-            # Postgres JSON field cannot store np.NaN values so convert
-            # any np.NaN to None.
-            for key, value in sr.items():
-                if is_null(value) or value is np.NaN:
-                    sr[key] = None
-            if cr:
-                for key, value in cr.items():
-                    if is_null(value) or value is np.NaN:
-                        cr[key] = None
-
-            data = {
-                variant_score_data: sr,
-                variant_count_data: {} if cr == sr else cr,
-            }
-            variant = {
-                hgvs_nt_column: hgvs_nt,
-                hgvs_splice_column: hgvs_splice,
-                hgvs_pro_column: hgvs_pro,
-                "data": data,
-            }
-            variants.append(variant)
+            count_records = [{} for _ in range(len(score_rows))]
+
+        batch = []
+        for ((hgvs_nt, hgvs_splice, hgvs_pro), sr, cr) in zip(
+            hgvs, score_records, count_records
+        ):
+            if compare_data and cr == sr:
+                cr = {}
+            batch.append(
+                {
+                    hgvs_nt_column: hgvs_nt,
+                    hgvs_splice_column: hgvs_splice,
+                    hgvs_pro_column: hgvs_pro,
+                    "data": {
+                        variant_score_data: sr,
+                        variant_count_data: cr,
+                    },
+                }
+            )
+        yield batch
 
-    return variants
+
+def _align_rows(df: pd.DataFrame, index: pd.Index) -> pd.DataFrame:
+    # Reorders the rows of `df` to match `index`. The n-th row of a
+    # duplicated variant in `df` is paired with its n-th row in `index`.
+    if df.index.is_unique and index.is_unique:
+        return df.reindex(index)
+
+    def occurrences(idx):
+        return pd.MultiIndex.from_arrays(
+            [idx, idx.to_series().groupby(level=0, sort=False).cumcount()]
+        )
+
+    return df.set_axis(occurrences(df.index), axis=0).reindex(
+        occurrences(index)
+    )
+
+
+def _column_values(series: pd.Series) -> list:
+    # Postgres JSON field cannot store np.NaN values so convert null values
+    # to None.
+    values = series.astype(object).values
+    mask = null_mask(series).values
+    if mask.any():
+        values = values.copy()
+        values[mask] = None
+    return values.tolist()
+
+
+def _records(df: pd.DataFrame, columns: List[str]) -> List[dict]:
+    if not columns:
+        return [{} for _ in range(len(df))]
+    values = [_column_values(df[c]) for c in columns]
+    return [dict(zip(columns, row)) for row in zip(*values)]
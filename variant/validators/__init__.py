@@ -1,7 +1,9 @@
 from .dataset import (
+    HGVSParseCache,
     MaveDataset,
     MaveCountsDataset,
     MaveScoresDataset,
+    ValidatedDatasetCache,
 )
 
 from .hgvs import (
@@ -12,6 +14,7 @@ from .hgvs import (
 )
 
 from .variant import (
+    validate_all_columns_match,
     validate_columns_match,
     validate_variant_json,
 )
@@ -25,8 +28,11 @@ __all__ = [
     "validate_pro_variant",
     "validate_hgvs_string",
     "validate_columns_match",
+    "validate_all_columns_match",
     "validate_variant_json",
     "MaveCountsDataset",
     "MaveScoresDataset",
     "MaveDataset",
+    "HGVSParseCache",
+    "ValidatedDatasetCache",
 ]
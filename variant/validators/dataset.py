@@ -1,24 +1,254 @@
 import re
-from collections import defaultdict
-from io import StringIO
-from itertools import groupby
+import hashlib
+import logging
+import multiprocessing
+from collections import defaultdict, namedtuple, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import groupby, repeat
 from operator import itemgetter
 from typing import Union, Optional, Tuple, List, TextIO, BinaryIO, Set, Dict
 
 import pandas as pd
 import numpy as np
 from mavehgvs import MaveHgvsParseError, Variant
+from fqfa.constants import AA_CODES, DNA_BASES
 from fqfa.util.translate import translate_dna
 from fqfa.util.infer import infer_sequence_type
+from django.core.cache import caches
 
 import dataset.constants
 from core.utilities import (
+    chunks,
+    columnar,
     is_null,
+    lowercase_null_values,
     null_values_list,
-    null_values_re,
     readable_null_values,
 )
 
+logger = logging.getLogger("django")
+
+# Single substitutions and synonymous variants make up most uploaded variants.
+# They are recognised with one compiled pattern and validated against the
+# target sequence directly, which is much cheaper than constructing a
+# `mavehgvs.Variant`. The groups mirror the plain numeric positions accepted
+# by `mavehgvs`; intronic, UTR and target-prefixed variants are not matched.
+amino_acid_codes = "|".join(AA_CODES.values())
+amino_acid_3_to_1 = {v: k for (k, v) in AA_CODES.items()}
+simple_variant_re = re.compile(
+    rf"(?P<nt_prefix>[cgmno])\.(?P<nt_position>[1-9][0-9]*)"
+    rf"(?P<nt_ref>[{''.join(DNA_BASES)}])>[{''.join(DNA_BASES)}]"
+    rf"|p\.(?:\(=\)|=|(?P<pro_ref>{amino_acid_codes})"
+    rf"(?P<pro_position>[1-9][0-9]*)(?:{amino_acid_codes}|=))",
+    flags=re.ASCII,
+)
+
+
+def _normalize_null_values(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replaces string cells which are empty, whitespace or one of the values in
+    `null_values_list` (case-insensitive) with `np.NaN`. Numeric columns are
+    skipped since the CSV parser already converts null values in these
+    columns through its `na_values` argument, as are object columns without
+    strings such as booleans with missing values.
+    """
+    for column in df.columns:
+        if df[column].dtype != object:
+            continue
+        inferred = pd.api.types.infer_dtype(df[column], skipna=True)
+        if inferred not in ("string", "mixed", "mixed-integer"):
+            continue
+        lowered = df[column].str.strip().str.lower()
+        is_null_value = lowered.isin(lowercase_null_values)
+        if is_null_value.any():
+            df.loc[is_null_value, column] = np.NaN
+    return df
+
+
+def _mixed_type_columns(chunks: List[pd.DataFrame]) -> List[str]:
+    """
+    Returns the columns parsed as text in some chunks and as numbers or
+    booleans in others. Chunks holding only nulls in a column are ignored.
+    """
+    kinds = defaultdict(set)
+    for chunk in chunks:
+        for column in chunk.columns:
+            values = chunk[column]
+            if not values.notnull().any():
+                continue
+            if values.dtype == object:
+                kinds[column].add("text")
+            elif values.dtype == bool:
+                kinds[column].add("bool")
+            else:
+                kinds[column].add("number")
+    return [column for (column, kind) in kinds.items() if len(kind) > 1]
+
+
+def _parse_variant_chunk(
+    variants: List[str],
+    targetseq: Optional[str] = None,
+    relaxed_ordering: bool = False,
+) -> List[Tuple[Optional[str], Optional[str], Optional[str]]]:
+    """
+    Parses each variant string using `mavehgvs`, or `_parse_simple_variant`
+    where possible. Defined at the module level so that it can be sent to the
+    worker processes of a process pool.
+
+    Parameters
+    ----------
+    variants: List[str]
+        Non-null variant strings to parse.
+    targetseq: str, optional
+        Target sequence to validate variants against.
+    relaxed_ordering: bool
+        Allow variants in a multi-variant to be listed in any order.
+
+    Returns
+    -------
+    A list of `(normalized, prefix, error)` tuples in the same order as
+    `variants`. `normalized` and `prefix` are `None` when the variant could
+    not be parsed, otherwise `error` is `None`.
+    """
+    parsed = []
+    for variant in variants:
+        simple = _parse_simple_variant(variant, targetseq=targetseq)
+        if simple is not None:
+            parsed.append(simple)
+            continue
+        try:
+            validated = Variant(
+                variant,
+                targetseq=targetseq,
+                relaxed_ordering=relaxed_ordering,
+            )
+            parsed.append((str(validated), validated.prefix, None))
+        except MaveHgvsParseError as error:
+            parsed.append((None, None, str(error)))
+    return parsed
+
+
+def _parse_simple_variant(
+    variant: str, targetseq: Optional[str] = None
+) -> Optional[Tuple[Optional[str], Optional[str], Optional[str]]]:
+    """
+    Parses single nucleotide or protein substitutions, such as `c.45A>G` or
+    `p.Ala12Gly`, and the protein variants `p.(=)` and `p.=` without
+    `mavehgvs`. These are already in normalized form so are returned as-is.
+
+    Parameters
+    ----------
+    variant: str
+        Non-null variant string to parse.
+    targetseq: str, optional
+        Target sequence to validate the reference base or amino acid against.
+        Protein variants must be given the translated target sequence.
+
+    Returns
+    -------
+    A `(normalized, prefix, error)` tuple matching that of
+    `_parse_variant_chunk`, or `None` when `variant` is not a simple variant
+    and must be parsed by `mavehgvs`.
+    """
+    match = simple_variant_re.fullmatch(variant)
+    if match is None:
+        return None
+
+    if match.group("nt_prefix") is not None:
+        prefix = match.group("nt_prefix")
+        position = match.group("nt_position")
+        reference = match.group("nt_ref")
+    else:
+        prefix = "p"
+        position = match.group("pro_position")
+        reference = amino_acid_3_to_1.get(match.group("pro_ref"))
+
+    if targetseq is not None and position is not None:
+        position = int(position)
+        if position > len(targetseq):
+            return None, None, "variant coordinate out of bounds"
+        if targetseq[position - 1] != reference:
+            return None, None, "variant reference does not match target"
+
+    return variant, prefix, None
+
+
+class HGVSParseCache:
+    """
+    Bounded least-recently-used cache of parsed HGVS strings. Keys are the
+    tuple `(variant, targetseq, relaxed_ordering)` and values are the
+    `(normalized, prefix, error)` tuples returned by the `mavehgvs` parser.
+
+    A single instance can be passed to the `validate` method of several
+    datasets, such as the scores and counts files of a submission, so that
+    variants common to both are only parsed once.
+    """
+
+    CacheInfo = namedtuple(
+        "CacheInfo", ["hits", "misses", "maxsize", "currsize"]
+    )
+
+    DEFAULT_MAXSIZE: int = 250000
+
+    def __init__(self, maxsize: Optional[int] = None):
+        self.maxsize = self.DEFAULT_MAXSIZE if maxsize is None else maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.info()}>"
+
+    def get(
+        self,
+        variant: str,
+        targetseq: Optional[str] = None,
+        relaxed_ordering: bool = False,
+    ) -> Optional[Tuple[Optional[str], Optional[str], Optional[str]]]:
+        key = (variant, targetseq, relaxed_ordering)
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def set(
+        self,
+        variant: str,
+        targetseq: Optional[str],
+        relaxed_ordering: bool,
+        value: Tuple[Optional[str], Optional[str], Optional[str]],
+    ) -> None:
+        if self.maxsize <= 0:
+            return
+
+        key = (variant, targetseq, relaxed_ordering)
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def info(self) -> "HGVSParseCache.CacheInfo":
+        return self.CacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            maxsize=self.maxsize,
+            currsize=len(self._entries),
+        )
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
 
 class MaveDataset:
     class DatasetType:
@@ -39,58 +269,77 @@ class MaveDataset:
         def options(cls) -> List[str]:
             return []
 
+    # Columns with fewer unique variants than this are always parsed in
+    # serial since the cost of starting a process pool outweighs the gain.
+    PARALLEL_MIN_ROWS: int = 20000
+    PARALLEL_CHUNK_SIZE: int = 5000
+
+    # Rows the CSV parser converts at a time. The whole parsed file is still
+    # kept, so this bounds the parser's working memory rather than the size
+    # of the dataset.
+    PARSE_CHUNK_SIZE: int = 50000
+
+    # Rows validated before the error budget passed to `validate` is first
+    # checked. The block doubles after each check so that hopeless files fail
+    # fast while large valid files are still parsed in big parallel batches.
+    ERROR_BUDGET_BLOCK_SIZE: int = 1000
+
     # ---------------------- Construction------------------------------------ #
     @classmethod
     def for_scores(
-        cls, file: Union[str, TextIO, BinaryIO]
+        cls,
+        file: Union[str, TextIO, BinaryIO],
+        parse_chunk_size: Optional[int] = None,
     ) -> "MaveScoresDataset":
-        return cls._for_type(file=file, dataset_type=cls.DatasetType.SCORES)
+        return cls._for_type(
+            file=file,
+            dataset_type=cls.DatasetType.SCORES,
+            parse_chunk_size=parse_chunk_size,
+        )
 
     @classmethod
     def for_counts(
-        cls, file: Union[str, TextIO, BinaryIO]
+        cls,
+        file: Union[str, TextIO, BinaryIO],
+        parse_chunk_size: Optional[int] = None,
     ) -> "MaveCountsDataset":
-        return cls._for_type(file=file, dataset_type=cls.DatasetType.COUNTS)
+        return cls._for_type(
+            file=file,
+            dataset_type=cls.DatasetType.COUNTS,
+            parse_chunk_size=parse_chunk_size,
+        )
 
     @classmethod
     def _for_type(
-        cls, file: Union[str, TextIO, BinaryIO], dataset_type: str
+        cls,
+        file: Union[str, TextIO, BinaryIO],
+        dataset_type: str,
+        parse_chunk_size: Optional[int] = None,
     ) -> Union["MaveScoresDataset", "MaveCountsDataset"]:
-
+        """
+        Reads a CSV, Parquet or Arrow IPC file into a dataset. The format is
+        inferred from the file contents rather than its name.
+        """
         if isinstance(file, str):
             handle = file
+        elif hasattr(file, "temporary_file_path"):
+            # Large django uploads are spooled to disk so read them directly.
+            handle = file.temporary_file_path()
         elif hasattr(file, "read"):
-            file_contents = file.read()
-            if hasattr(file_contents, "decode"):
-                file_contents = file_contents.decode("utf-8")
-            file_contents = file_contents.strip()
-            handle = StringIO(file_contents)
+            if hasattr(file, "seek"):
+                file.seek(0)
+            handle = file
         else:
             raise TypeError(
                 f"Expected file path or buffer object. "
                 f"Got '{type(file).__name__}'"
             )
 
-        extra_na_values = set(
-            list(null_values_list)
-            + [str(x).lower() for x in null_values_list]
-            + [str(x).upper() for x in null_values_list]
-            + [str(x).capitalize() for x in null_values_list]
-        )
-
-        df = pd.read_csv(
-            filepath_or_buffer=handle,
-            sep=",",
-            encoding="utf-8",
-            quotechar='"',
-            comment="#",
-            na_values=extra_na_values,
-            keep_default_na=True,
-            dtype={
-                **{c: str for c in cls.HGVSColumns.options()},
-                MaveScoresDataset.AdditionalColumns.SCORES: float,
-            },
-        ).replace(null_values_re, np.NaN)
+        file_format = columnar.detect_format(handle)
+        if file_format == columnar.CSV:
+            df = cls._read_csv(handle, parse_chunk_size=parse_chunk_size)
+        else:
+            df = cls._read_columnar(handle, file_format)
 
         if dataset_type == cls.DatasetType.SCORES:
             return MaveScoresDataset(df)
@@ -101,6 +350,101 @@ class MaveDataset:
                 f"'{dataset_type}' is not a recognised dataset type."
             )
 
+    @classmethod
+    def _read_csv(
+        cls,
+        handle: Union[str, TextIO, BinaryIO],
+        parse_chunk_size: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Parses a CSV file straight from its handle or path, without copying
+        the raw contents into a string first. Rows are converted
+        `parse_chunk_size` at a time and null values are normalized on each
+        chunk. The chunks are joined into one dataframe, so memory use grows
+        with the number of rows; the chunk size only bounds the working
+        memory of the parser.
+
+        Column types are inferred for each chunk, so a column can be read as
+        numbers in one chunk and as text in another. Only those columns are
+        parsed again as text, as they would be if the file was read in one
+        chunk.
+        """
+        extra_na_values = set(
+            list(null_values_list)
+            + [str(x).lower() for x in null_values_list]
+            + [str(x).upper() for x in null_values_list]
+            + [str(x).capitalize() for x in null_values_list]
+        )
+
+        dtype = {
+            **{c: str for c in cls.HGVSColumns.options()},
+            MaveScoresDataset.AdditionalColumns.SCORES: float,
+        }
+
+        def read_chunks(text_columns=None) -> List[pd.DataFrame]:
+            reader = pd.read_csv(
+                filepath_or_buffer=handle,
+                sep=",",
+                encoding="utf-8",
+                quotechar='"',
+                comment="#",
+                na_values=extra_na_values,
+                keep_default_na=True,
+                dtype=str if text_columns else dtype,
+                usecols=text_columns,
+                chunksize=parse_chunk_size or cls.PARSE_CHUNK_SIZE,
+            )
+            return [_normalize_null_values(chunk) for chunk in reader]
+
+        chunks = read_chunks()
+        mixed = _mixed_type_columns(chunks)
+        if mixed and (isinstance(handle, str) or hasattr(handle, "seek")):
+            if hasattr(handle, "seek"):
+                handle.seek(0)
+            for (chunk, text) in zip(chunks, read_chunks(mixed)):
+                for column in mixed:
+                    chunk[column] = text[column]
+        elif mixed:
+            # Streams cannot be read again, so numbers are written as text.
+            for chunk in chunks:
+                for column in mixed:
+                    values = chunk[column]
+                    chunk[column] = values.astype(str).where(
+                        pd.notnull(values), np.NaN
+                    )
+        df = pd.concat(chunks, ignore_index=True)
+        # Blank leading lines are skipped by the parser but whitespace at the
+        # start of the header is not, which the file contents used to be
+        # stripped of before parsing.
+        if len(df.columns) and isinstance(df.columns[0], str):
+            df = df.rename(columns={df.columns[0]: df.columns[0].lstrip()})
+        return df
+
+    @classmethod
+    def _read_columnar(
+        cls, handle: Union[str, BinaryIO], file_format: str
+    ) -> pd.DataFrame:
+        """
+        Reads a Parquet or Arrow IPC file, memory-mapping it when on disk.
+        Column types stored in the file are kept so numeric columns are not
+        round-tripped through text. HGVS columns are converted to strings and
+        the score column to floats to match the types used for CSV files.
+        """
+        df = columnar.read_dataframe(handle, file_format)
+
+        for column in cls.HGVSColumns.options():
+            if column in df.columns:
+                values = df[column]
+                df[column] = values.astype(str).where(
+                    pd.notnull(values), np.NaN
+                )
+
+        score_column = MaveScoresDataset.AdditionalColumns.SCORES
+        if score_column in df.columns:
+            df[score_column] = df[score_column].astype(float)
+
+        return _normalize_null_values(df)
+
     # ---------------------- Public ----------------------------------------- #
     @property
     def label(self) -> str:
@@ -122,6 +466,10 @@ class MaveDataset:
     def errors(self) -> Optional[List[str]]:
         return self._errors
 
+    @property
+    def errors_truncated(self) -> bool:
+        return self._errors_truncated
+
     @property
     def is_empty(self) -> bool:
         return self._df.empty
@@ -216,11 +564,52 @@ class MaveDataset:
         targetseq: Optional[str] = None,
         relaxed_ordering: bool = False,
         allow_index_duplicates: bool = False,
+        n_jobs: int = 1,
+        cache: Optional[HGVSParseCache] = None,
+        reference: Optional["MaveDataset"] = None,
+        max_errors: Optional[int] = None,
     ) -> "MaveDataset":
+        """
+        Validates the columns and HGVS variants of this dataset.
 
+        Parameters
+        ----------
+        targetseq: str, optional
+            Target sequence to validate nucleotide and protein variants
+            against.
+        relaxed_ordering: bool
+            Allow variants in a multi-variant to be listed in any order.
+        allow_index_duplicates: bool
+            Allow the same variant to appear in more than one row of the
+            primary column.
+        n_jobs: int
+            Number of processes used to parse HGVS columns with at least
+            `PARALLEL_MIN_ROWS` variants. Values less than 1 use all
+            available cores.
+        cache: HGVSParseCache, optional
+            Cache of previously parsed variants to consult before parsing.
+            Newly parsed variants are added to it.
+        reference: MaveDataset, optional
+            A valid dataset that was validated with the same `targetseq` and
+            `relaxed_ordering`, such as the scores dataset when validating a
+            counts dataset. Rows whose HGVS strings are identical to the
+            reference in the same position reuse its normalized variants
+            instead of being parsed again.
+        max_errors: int, optional
+            Stop validating variants once this many errors have been found.
+            `errors_truncated` is set when rows were left unchecked, in which
+            case the error list is incomplete.
+        """
         self._errors = []
+        self._errors_truncated = False
+        self._max_errors = max_errors
         self._df.index = pd.RangeIndex(start=0, stop=self.n_rows, step=1)
         self._index_column = None
+        self._n_jobs = n_jobs
+        self._cache = cache
+        self._reference = reference
+        self._validated_with = {}
+        self._raw_variants = {}
 
         self._validate_columns()
         # Only attempt to validate variants if columns are valid
@@ -260,6 +649,15 @@ class MaveDataset:
         self._df: pd.DataFrame = pd.DataFrame() if df is None else df
         self._index_column = index_column or None
         self._errors = None if errors is None else list(errors)
+        self._errors_truncated = False
+        self._max_errors = None
+        self._n_jobs = 1
+        self._cache = None
+        self._reference = None
+        # Target sequence and ordering option each HGVS column was validated
+        # with, which differ between columns, along with its raw values.
+        self._validated_with: Dict[str, Tuple[Optional[str], bool]] = {}
+        self._raw_variants: Dict[str, np.ndarray] = {}
 
     def __repr__(self):
         return (
@@ -501,54 +899,216 @@ class MaveDataset:
         prefixes = set()
         errors = []
 
-        def validate_variant(variant: str):
+        # Null values were normalized to `np.NaN` when the file was read.
+        values = self._df[column].values
+        if self._error_budget_spent(errors):
+            self._errors_truncated = self._errors_truncated or len(values) > 0
+            return self._df[column], prefixes, errors
+
+        nulls = pd.isnull(values)
+        reused = self._reusable_variants(
+            column, values, targetseq, relaxed_ordering
+        )
+        parsed = {}
+
+        def validate_variant(
+            variant: str, normalized: Optional[str], null: bool
+        ):
             # TODO: logic mirrors that in validate_hgvs_string, which is kept
             #   as a standalone function for backwards compatibility with
             #   django's model validator field. Merge at some point.
 
-            if is_null(variant):
+            if normalized is not None:
+                # Normalized variants from the reference dataset always start
+                # with their prefix followed by a period.
+                prefix, error = normalized.split(".", 1)[0], None
+            elif null:
                 return np.NaN
+            elif variant.lower() == "_sy":
+                errors.append(
+                    "'_sy' is no longer supported and should be "
+                    "replaced by 'p.(=)'"
+                )
+                return variant
+            elif variant.lower() == "_wt":
+                errors.append(
+                    "'_wt' is no longer supported and should be "
+                    "replaced by one of 'g.=', 'c.=' or 'n.='"
+                )
+                return variant
             else:
-                try:
-                    if variant.lower() == "_sy":
-                        errors.append(
-                            "'_sy' is no longer supported and should be "
-                            "replaced by 'p.(=)'"
-                        )
-                        return variant
-                    elif variant.lower() == "_wt":
-                        errors.append(
-                            "'_wt' is no longer supported and should be "
-                            "replaced by one of 'g.=', 'c.=' or 'n.='"
-                        )
-                        return variant
-
-                    validated = Variant(
-                        variant,
+                normalized, prefix, error = parsed[variant]
+
+            if error is not None:
+                errors.append(f"{variant}: {error}")
+                return np.NaN
+
+            prefixes.add(prefix.lower())
+            prefix_error = self._validate_variant_prefix_for_column(
+                variant=normalized,
+                prefix=prefix,
+                column=column,
+                splice_defined=splice_defined,
+            )
+            if prefix_error:
+                errors.append(prefix_error)
+
+            return normalized
+
+        # Parse each distinct variant once, then map the results back onto
+        # the rows so that errors are reported in row order regardless of
+        # how the parsing was distributed. Without an error budget the whole
+        # column is a single block.
+        results = []
+        if self._max_errors is None:
+            block_size = max(len(values), 1)
+        else:
+            block_size = self.ERROR_BUDGET_BLOCK_SIZE
+        start = 0
+        while start < len(values):
+            block = slice(start, start + block_size)
+            unique_variants = [
+                v
+                for v in pd.unique(
+                    values[block][~nulls[block] & pd.isnull(reused[block])]
+                )
+                if v not in parsed and v.lower() not in ("_sy", "_wt")
+            ]
+            parsed.update(
+                zip(
+                    unique_variants,
+                    self._parse_variants(
+                        unique_variants,
                         targetseq=targetseq,
                         relaxed_ordering=relaxed_ordering,
-                    )
-                    prefix = validated.prefix.lower()
-                    prefixes.add(prefix)
-
-                    prefix_error = self._validate_variant_prefix_for_column(
-                        variant=validated,
-                        prefix=validated.prefix,
-                        column=column,
-                        splice_defined=splice_defined,
-                    )
-                    if prefix_error:
-                        errors.append(prefix_error)
+                    ),
+                )
+            )
+            for (v, r, n) in zip(values[block], reused[block], nulls[block]):
+                results.append(validate_variant(v, r, n))
+                if self._error_budget_spent(errors):
+                    break
+
+            if self._error_budget_spent(errors):
+                self._errors_truncated = len(results) < len(values)
+                break
+
+            start += block_size
+            block_size *= 2
+
+        # Rows left unchecked once the error budget is spent are never written
+        # back to the dataset since it is invalid.
+        results += [np.NaN] * (len(values) - len(results))
+        validated_variants = pd.Series(
+            results,
+            index=self._df.index,
+            name=column,
+            dtype=object,
+        )
+        self._raw_variants[column] = values
+        self._validated_with[column] = (targetseq, relaxed_ordering)
+
+        return validated_variants, prefixes, errors
+
+    def _error_budget_spent(self, errors: List[str]) -> bool:
+        """
+        Returns `True` when the errors found so far, including the pending
+        `errors` of the column being validated, reach `max_errors`.
+        """
+        if self._max_errors is None:
+            return False
+        return len(self._errors) + len(errors) >= self._max_errors
+
+    def _reusable_variants(
+        self,
+        column: str,
+        values: np.ndarray,
+        targetseq: Optional[str],
+        relaxed_ordering: bool,
+    ) -> np.ndarray:
+        """
+        Returns an array holding the reference dataset's normalized variant
+        for each row whose HGVS string is identical to the reference's
+        string in the same row, and `None` for every other row. Nothing is
+        reused unless the reference validated `column` with the same
+        `targetseq` and `relaxed_ordering`.
+        """
+        reused = np.full(len(values), None, dtype=object)
+
+        reference = self._reference
+        if (
+            reference is None
+            or not reference.is_valid
+            or reference._validated_with.get(column, None)
+            != (targetseq, relaxed_ordering)
+            or column not in reference._raw_variants
+            or reference.n_rows != len(values)
+        ):
+            return reused
+
+        matches = (values == reference._raw_variants[column]) & pd.notnull(
+            values
+        )
+        reused[matches] = reference._df[column].values[matches]
+        return reused
 
-                    return str(validated)
+    def _parse_variants(
+        self,
+        variants: List[str],
+        targetseq: Optional[str] = None,
+        relaxed_ordering: bool = False,
+    ) -> List[Tuple[Optional[str], Optional[str], Optional[str]]]:
+        if self._cache is None:
+            return self._parse_uncached_variants(
+                variants, targetseq, relaxed_ordering
+            )
 
-                except MaveHgvsParseError as error:
-                    errors.append(f"{variant}: {str(error)}")
-                    return np.NaN
+        parsed = [
+            self._cache.get(v, targetseq, relaxed_ordering) for v in variants
+        ]
+        missing = [v for (v, p) in zip(variants, parsed) if p is None]
+        newly_parsed = iter(
+            self._parse_uncached_variants(
+                missing, targetseq, relaxed_ordering
+            )
+        )
+        for i, p in enumerate(parsed):
+            if p is None:
+                parsed[i] = next(newly_parsed)
+                self._cache.set(
+                    variants[i], targetseq, relaxed_ordering, parsed[i]
+                )
 
-        validated_variants = self._df[column].apply(validate_variant)
+        return parsed
 
-        return validated_variants, prefixes, errors
+    def _parse_uncached_variants(
+        self,
+        variants: List[str],
+        targetseq: Optional[str] = None,
+        relaxed_ordering: bool = False,
+    ) -> List[Tuple[Optional[str], Optional[str], Optional[str]]]:
+        n_jobs = self._n_jobs
+        if n_jobs < 1:
+            n_jobs = multiprocessing.cpu_count()
+
+        # Daemonic processes such as celery workers cannot create children.
+        if (
+            n_jobs == 1
+            or len(variants) < self.PARALLEL_MIN_ROWS
+            or multiprocessing.current_process().daemon
+        ):
+            return _parse_variant_chunk(variants, targetseq, relaxed_ordering)
+
+        # `map` yields chunk results in submission order, which keeps the
+        # parsed variants aligned with the input.
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            results = executor.map(
+                _parse_variant_chunk,
+                chunks(variants, self.PARALLEL_CHUNK_SIZE),
+                repeat(targetseq),
+                repeat(relaxed_ordering),
+            )
+            return [item for chunk in results for item in chunk]
 
     def _column_is_null(self, column) -> bool:
         return len(self._df[self._df[column].isna()]) == len(self._df)
@@ -560,7 +1120,11 @@ class MaveDataset:
         return len(self._df[self._df[column].isna()]) == 0
 
     def _validate_variant_prefix_for_column(
-        self, variant: Variant, prefix: str, column: str, splice_defined: bool
+        self,
+        variant: Union[str, Variant],
+        prefix: str,
+        column: str,
+        splice_defined: bool,
     ) -> Optional[str]:
         prefix = prefix.lower()
 
@@ -650,3 +1214,126 @@ class MaveCountsDataset(MaveDataset):
     @property
     def label(self) -> str:
         return "counts"
+
+
+class ValidatedDatasetCache:
+    """
+    Cache of valid datasets keyed on a hash of the uploaded file contents
+    along with the `targetseq` and `relaxed_ordering` options they were
+    validated with, so that re-uploading an identical file skips reading and
+    validating it entirely.
+
+    Entries are stored in the django cache named by `alias`. The `TIMEOUT`
+    and `MAX_ENTRIES` options of that cache control when entries expire and
+    are evicted. Datasets with more than `max_rows` rows are not cached
+    since writing them costs more than validating them again.
+    """
+
+    # Bump when the stored value or validation rules change so that entries
+    # written by older releases are not returned.
+    KEY_VERSION: int = 1
+    KEY_PREFIX: str = "validated-dataset"
+
+    READ_BLOCK_SIZE: int = 1024 * 1024
+
+    def __init__(
+        self, alias: str = "validation", max_rows: Optional[int] = None
+    ):
+        self.alias = alias
+        self.max_rows = max_rows
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @classmethod
+    def digest(cls, file: Union[str, TextIO, BinaryIO]) -> str:
+        """
+        Returns the sha256 hex digest of a file path, django upload or open
+        file handle. Handles are returned to position 0.
+        """
+        if isinstance(file, str):
+            with open(file, "rb") as handle:
+                return cls.digest(handle)
+
+        if hasattr(file, "chunks"):
+            blocks = file.chunks(chunk_size=cls.READ_BLOCK_SIZE)
+        else:
+            file.seek(0)
+            blocks = iter(partial(file.read, cls.READ_BLOCK_SIZE), None)
+
+        sha = hashlib.sha256()
+        for block in blocks:
+            if not block:
+                break
+            if isinstance(block, str):
+                block = block.encode()
+            sha.update(block)
+
+        file.seek(0)
+        return sha.hexdigest()
+
+    def key(
+        self,
+        digest: str,
+        dataset_type: str,
+        targetseq: Optional[str] = None,
+        relaxed_ordering: bool = False,
+    ) -> str:
+        # Target sequences can be far longer than the key lengths supported
+        # by some cache backends so the options are hashed as well.
+        options = f"{dataset_type}:{targetseq or ''}:{int(relaxed_ordering)}"
+        options = hashlib.sha256(options.encode()).hexdigest()
+        return f"{self.KEY_PREFIX}:{self.KEY_VERSION}:{digest}:{options}"
+
+    def get(
+        self,
+        digest: str,
+        dataset_type: str,
+        targetseq: Optional[str] = None,
+        relaxed_ordering: bool = False,
+    ) -> Optional[Union["MaveScoresDataset", "MaveCountsDataset"]]:
+        key = self.key(digest, dataset_type, targetseq, relaxed_ordering)
+        try:
+            value = self.backend.get(key)
+        except Exception as error:
+            logger.warning(f"Could not read validated dataset cache: {error}")
+            return None
+
+        if value is None:
+            return None
+
+        df, index_column = value
+        if dataset_type == MaveDataset.DatasetType.SCORES:
+            return MaveScoresDataset(df, index_column=index_column, errors=[])
+        elif dataset_type == MaveDataset.DatasetType.COUNTS:
+            return MaveCountsDataset(df, index_column=index_column, errors=[])
+        else:
+            raise ValueError(
+                f"'{dataset_type}' is not a recognised dataset type."
+            )
+
+    def set(
+        self,
+        digest: str,
+        dataset_type: str,
+        targetseq: Optional[str],
+        relaxed_ordering: bool,
+        dataset: MaveDataset,
+    ) -> bool:
+        """
+        Caches `dataset` if it is valid and has at most `max_rows` rows.
+        Returns `True` if it was cached.
+        """
+        if not dataset.is_valid:
+            return False
+        if self.max_rows is not None and dataset.n_rows > self.max_rows:
+            return False
+
+        key = self.key(digest, dataset_type, targetseq, relaxed_ordering)
+        try:
+            self.backend.set(key, (dataset.data(), dataset.index_column))
+        except Exception as error:
+            logger.warning(f"Could not write validated dataset cache: {error}")
+            return False
+        return True
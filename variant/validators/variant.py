@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Iterable
 
 from django.core.exceptions import ValidationError
 
@@ -6,6 +6,8 @@ from dataset.constants import (
     variant_score_data,
     variant_count_data,
     required_score_column,
+    score_columns,
+    count_columns,
 )
 
 
@@ -29,6 +31,63 @@ def validate_columns_match(variant, scoreset) -> None:
         raise ValidationError(f"Missing key {str(error)}")
 
 
+def validate_all_columns_match(
+    data: Iterable[Dict[str, Dict]], scoreset
+) -> int:
+    """
+    Validate that the data of many children matches the parent's defined
+    columns. Used when loading variants in bulk instead of calling
+    `validate_columns_match` for each variant; the distinct sets of score
+    and count columns are collected first and each is compared once.
+
+    Count data is stored empty when it equals the score data, so empty
+    count data is accepted if the parent's score and count columns are the
+    same.
+
+    Parameters
+    ----------
+    data : Iterable[dict]
+        The `data` of each variant.
+    scoreset : `ScoreSet`
+        The parent of the variants.
+
+    Returns
+    -------
+    int
+        Number of variants validated.
+    """
+    n = 0
+    column_sets = set()
+    try:
+        expected_scores = set(scoreset.dataset_columns[score_columns])
+        expected_counts = set(scoreset.dataset_columns[count_columns])
+        for (n, row) in enumerate(data, start=1):
+            column_sets.add(
+                (
+                    frozenset(row[variant_score_data]),
+                    frozenset(row[variant_count_data]),
+                )
+            )
+    except KeyError as error:
+        raise ValidationError(f"Missing key {str(error)}")
+
+    for (scores, counts) in column_sets:
+        _validate_column_set("score", scores, expected_scores)
+        if counts or expected_counts != expected_scores:
+            _validate_column_set("count", counts, expected_counts)
+    return n
+
+
+def _validate_column_set(dtype: str, columns, expected) -> None:
+    if columns != expected:
+        raise ValidationError(
+            f"Variants define {dtype} columns {sorted(columns)} but "
+            f"parent defines columns {sorted(expected)}. Missing columns "
+            f"{sorted(expected - columns)}, unexpected columns "
+            f"{sorted(columns - expected)}."
+        )
+
+
 def validate_variant_json(data: Dict[str, Dict]) -> None:
     """
     Checks a given dictionary to ensure that it is suitable to be used